@@ -8,11 +8,18 @@ import json
 import pandas as pd
 import os
 
+import gps_index
+
 
 # In[2]:
 
 
-EXIF_JSON = "/home/shuchi-sharma/Desktop/internSHip Poj/EXIF_Extraction/exif_analyze.json"
+# The app passes a per-session JSON path to analyze(); this default is only
+# used when the module is run directly.
+EXIF_JSON = os.environ.get(
+    "EXIF_JSON",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "exif_analyze.json")
+)
 
 
 # In[3]:
@@ -27,12 +34,6 @@ def load_exif_data(json_path):
     return data
 
 
-# In[4]:
-
-
-metadata_dict = load_exif_data(EXIF_JSON)
-
-
 # In[5]:
 
 
@@ -56,13 +57,6 @@ def extract_temporal_metadata(metadata_dict):
     return df
 
 
-# In[6]:
-
-
-def create_google_maps_url(gps_coords):
-    return f"https://maps.google.com/?q={gps_coords["lat"]},{gps_coords["lon"]}"
-
-
 # In[7]:
 
 
@@ -83,22 +77,42 @@ def extract_gps_from_metadata(metadata):
 
 
 def create_google_maps_url(coords):
-    if all(coords.get(k) not in [None, "", "NA"] for k in ["Latitude", "Longitude", "LatitudeRef", "LongitudeRef"]):
-        return f"https://www.google.com/maps?q={coords['Latitude']},{coords['Longitude']}"
-    return "NA"
+    """Map link from the signed LatitudeDecimal/LongitudeDecimal of a GPS record"""
+    return gps_index.map_url(coords.get("LatitudeDecimal"), coords.get("LongitudeDecimal"))
 
 
 # In[9]:
 
 
 def process_all_images_for_gps(metadata_dict):
-    gps_records = []
-    map_urls = {}
-    for image_name, metadata in metadata_dict.items():
-        coords = extract_gps_from_metadata(metadata)
-        gps_records.append({"Image": image_name, **coords})
-        map_urls[image_name] = create_google_maps_url(coords)
-    return pd.DataFrame(gps_records), map_urls
+    gps_records = [{"Image": image_name, **extract_gps_from_metadata(metadata)}
+                   for image_name, metadata in metadata_dict.items()]
+    df_gps = pd.DataFrame(gps_records, columns=["Image", "Latitude", "Longitude", "LatitudeRef", "LongitudeRef"])
+
+    # Apply the N/S and E/W references once for the whole column
+    df_gps["LatitudeDecimal"] = gps_index.signed_degrees(
+        df_gps["Latitude"].where(df_gps["Latitude"] != "NA"), df_gps["LatitudeRef"], 90)
+    df_gps["LongitudeDecimal"] = gps_index.signed_degrees(
+        df_gps["Longitude"].where(df_gps["Longitude"] != "NA"), df_gps["LongitudeRef"], 180)
+    df_gps["Geohash"] = gps_index.geohash(df_gps["LatitudeDecimal"], df_gps["LongitudeDecimal"])
+
+    map_urls = dict(zip(df_gps["Image"], gps_index.map_urls(df_gps["LatitudeDecimal"], df_gps["LongitudeDecimal"])))
+    return df_gps, map_urls
+
+
+# In[ ]:
+
+
+def cluster_image_locations(df_gps, df_time=None, df_device=None, eps_km=1.0, min_images=2):
+    """GeoIndex over the located images and a summary of the places they were taken"""
+    index = gps_index.GeoIndex(df_gps)
+    taken = None
+    if df_time is not None and len(df_time):
+        taken = pd.to_datetime(df_time.set_index("Image")["DateTimeOriginal"].str[:19],
+                               format="%Y:%m:%d %H:%M:%S", errors="coerce")
+    devices = df_device["DeviceModel"] if df_device is not None and len(df_device) else None
+    df_clusters = gps_index.summarize_clusters(index, index.cluster(eps_km, min_images), taken, devices)
+    return index, df_clusters
 
 
 # In[10]:
@@ -192,7 +206,7 @@ def generate_summary_analysis(df_time, df_gps, df_device, df_edited):
 
 
     # GPS analysis
-    images_with_gps = len(df_gps[(df_gps['Latitude'] != 'NA') & (df_gps['Longitude'] != 'NA')])
+    images_with_gps = int((df_gps['LatitudeDecimal'].notna() & df_gps['LongitudeDecimal'].notna()).sum())
     summary.append(f"Images with GPS coordinates: {images_with_gps}/{total_images}")
 
     # Device analysis
@@ -219,9 +233,29 @@ def generate_summary_analysis(df_time, df_gps, df_device, df_edited):
 # In[ ]:
 
 
-df_time = extract_temporal_metadata(metadata_dict)
-df_gps ,map_link=process_all_images_for_gps(metadata_dict)
-df_device=analyze_all_devices_for_analysis(metadata_dict)
-df_edited=check_multiple_images_for_editors(metadata_dict)
-summary_text=generate_summary_analysis(df_time, df_gps, df_device, df_edited)
+def analyze(json_path):
+    """Run every analysis on one exif_analyze.json; no module state is shared"""
+    metadata_dict = load_exif_data(json_path)
+
+    df_time = extract_temporal_metadata(metadata_dict)
+    df_gps ,map_link=process_all_images_for_gps(metadata_dict)
+    df_device=analyze_all_devices_for_analysis(metadata_dict)
+    df_edited=check_multiple_images_for_editors(metadata_dict)
+    gps_locations, df_clusters = cluster_image_locations(df_gps, df_time, df_device)
+    summary_text=generate_summary_analysis(df_time, df_gps, df_device, df_edited)
+
+    return {
+        "df_time": df_time,
+        "df_gps": df_gps,
+        "map_link": map_link,
+        "gps_index": gps_locations,
+        "df_clusters": df_clusters,
+        "df_device": df_device,
+        "df_edited": df_edited,
+        "summary_text": summary_text
+    }
+
+
+if __name__ == "__main__":
+    print(analyze(EXIF_JSON)["summary_text"])
 
@@ -0,0 +1,273 @@
+"""Signed GPS positions, a spatial index and location clusters for EXIF data.
+
+exiftool reports GPS latitude and longitude as unsigned magnitudes with a
+separate ``GPSLatitudeRef`` / ``GPSLongitudeRef`` (N/S, E/W).  With ``-n``
+(pyexiftool's default) the magnitudes are decimal numbers; without it they
+are strings such as ``28 deg 36' 50.04" N``.  ``signed_degrees`` turns
+either form into signed decimal degrees for a whole column at once.
+
+``GeoIndex`` puts the located images on a uniform latitude/longitude grid:
+
+* each image gets one integer cell key, and the keys are sorted once, so
+  the images of a run of cells in one grid row are a contiguous slice
+  found with two ``np.searchsorted`` calls;
+* ``within`` visits only the cells overlapping the query circle's bounding
+  box (wrapping at the antimeridian, every longitude near the poles) and
+  measures haversine distances for those candidates only;
+* ``cluster`` snaps the images to cells ``eps_km`` high (narrower in km
+  away from the equator), links every occupied cell to its occupied
+  neighbours and labels the connected components, so images taken within
+  about ``eps_km`` of each other share a cluster.
+
+Building the index is one sort; a radius query costs a binary search per
+grid row plus the size of its answer, and clustering is linear in the
+number of occupied cells, so 100k-image evidence sets stay interactive.
+``geohash`` gives each position a standard geohash for display and export.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+GEOHASH_ALPHABET = np.array(list("0123456789bcdefghjkmnpqrstuvwxyz"))
+GEOHASH_PRECISION = 7
+
+# "28 deg 36' 50.04\" N", "28 36 50.04", "28.6139", "-0.1278 W"
+DMS_PATTERN = (r"^\s*(?P<deg>-?\d+(?:\.\d+)?)(?:\s*deg)?"
+               r"(?:\s+(?P<min>\d+(?:\.\d+)?)'?)?(?:\s+(?P<sec>\d+(?:\.\d+)?)\"?)?"
+               r"\s*(?P<ref>[NSEW])?\s*$")
+
+
+def signed_degrees(values, refs, limit: float):
+    """Signed decimal degrees from exiftool values and N/S/E/W references (NaN when unusable).
+
+    The reference tag decides the sign, falling back to a direction letter
+    inside the value or a leading minus; values beyond ``limit`` (90 for
+    latitude, 180 for longitude) are treated as missing.
+    """
+    import pandas as pd
+
+    values = pd.Series(values, dtype=object).reset_index(drop=True)
+    numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+    degrees = np.abs(numeric)
+    minus = numeric < 0
+    embedded = pd.Series(pd.NA, index=values.index, dtype="string")
+
+    # Only values that are not plain numbers (the -n output) go through the regex
+    text_rows = np.flatnonzero(np.isnan(numeric) & values.notna().to_numpy())
+    if len(text_rows):
+        text = values.iloc[text_rows].astype("string").str.strip()
+        parts = text.str.extract(DMS_PATTERN)
+        degrees[text_rows] = (pd.to_numeric(parts["deg"], errors="coerce").abs()
+                              + pd.to_numeric(parts["min"], errors="coerce").fillna(0) / 60
+                              + pd.to_numeric(parts["sec"], errors="coerce").fillna(0) / 3600).to_numpy(float)
+        minus[text_rows] = text.str.startswith("-").fillna(False).to_numpy(bool)
+        embedded.iloc[text_rows] = parts["ref"].to_numpy()
+
+    ref = pd.Series(refs, dtype=object).reset_index(drop=True).astype("string").str.strip().str[:1].str.upper()
+    ref = ref.where(ref.isin(["N", "S", "E", "W"]).fillna(False), embedded)
+    negative = ref.isin(["S", "W"]).fillna(False).to_numpy(bool) | minus
+    signed = np.where(negative, -degrees, degrees)
+    signed[~(np.abs(signed) <= limit)] = np.nan
+    return signed
+
+
+def geohash(lat, lon, precision: int = GEOHASH_PRECISION):
+    """Geohash of every position (precision 7 is ~150 m), "NA" where it is unknown."""
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    known = ~(np.isnan(lat) | np.isnan(lon))
+    bits = 5 * precision
+    lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+
+    def quantize(values, low, span, n_bits):
+        scaled = (np.where(known, values, low) - low) / span * (1 << n_bits)
+        return np.clip(scaled, 0, (1 << n_bits) - 1).astype(np.uint64)
+
+    lat_q = quantize(lat, -90.0, 180.0, lat_bits)
+    lon_q = quantize(lon, -180.0, 360.0, lon_bits)
+    # Interleave the bits from the most significant, longitude first
+    code = np.zeros(len(lat), dtype=np.uint64)
+    for bit in range(bits):
+        source, n_bits = (lon_q, lon_bits) if bit % 2 == 0 else (lat_q, lat_bits)
+        shift = np.uint64(n_bits - 1 - bit // 2)
+        code = (code << np.uint64(1)) | ((source >> shift) & np.uint64(1))
+
+    shifts = np.uint64(5) * np.arange(precision - 1, -1, -1, dtype=np.uint64)
+    chars = GEOHASH_ALPHABET[((code[:, None] >> shifts) & np.uint64(31)).astype(np.intp)]
+    hashes = chars.view(f"<U{precision}").ravel().astype(object)
+    hashes[~known] = "NA"
+    return hashes
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km, element-wise."""
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Connected-component label (smallest member index) of each of ``n`` nodes."""
+    labels = np.arange(n)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, left, labels[right])
+        np.minimum.at(updated, right, labels[left])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+class _Grid:
+    """Integer cell keys on a ``cell_deg`` latitude/longitude grid, wrapping in longitude."""
+
+    def __init__(self, cell_deg: float):
+        self.cell_deg = cell_deg
+        self.n_lat = int(np.ceil(180 / cell_deg))
+        self.n_lon = int(np.ceil(360 / cell_deg))
+
+    def row(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90) / self.cell_deg), 0, self.n_lat - 1).astype(np.int64)
+
+    def column(self, lon):
+        return np.floor((np.asarray(lon) + 180) / self.cell_deg).astype(np.int64) % self.n_lon
+
+    def keys(self, lat, lon):
+        return self.row(lat) * self.n_lon + self.column(lon)
+
+
+class GeoIndex:
+    """Grid index over the images that have a signed position."""
+
+    def __init__(self, df_gps, cell_km: float = 5.0):
+        located = df_gps.dropna(subset=["LatitudeDecimal", "LongitudeDecimal"])
+        self.images = located.reset_index(drop=True)
+        self.lat = self.images["LatitudeDecimal"].to_numpy(dtype="float64")
+        self.lon = self.images["LongitudeDecimal"].to_numpy(dtype="float64")
+
+        self.grid = _Grid(cell_km / KM_PER_DEGREE)
+        keys = self.grid.keys(self.lat, self.lon)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Positions of the images in the cells overlapping the circle's bounding box."""
+        grid = self.grid
+        dlat = radius_km / KM_PER_DEGREE
+        first_row, last_row = grid.row(max(lat - dlat, -90.0)), grid.row(min(lat + dlat, 90.0))
+        # Longitude degrees shrink towards the poles; use the circle's widest latitude
+        widest = np.cos(np.radians(min(abs(lat) + dlat, 90.0)))
+        dlon = radius_km / (KM_PER_DEGREE * widest) if widest > 1e-9 else 360.0
+        if dlon >= 180:
+            columns = [(0, grid.n_lon - 1)]
+        else:
+            lo, hi = int(grid.column(lon - dlon)), int(grid.column(lon + dlon))
+            columns = [(lo, hi)] if lo <= hi else [(lo, grid.n_lon - 1), (0, hi)]
+
+        starts, stops = [], []
+        for row in range(int(first_row), int(last_row) + 1):
+            for lo, hi in columns:
+                starts.append(row * grid.n_lon + lo)
+                stops.append(row * grid.n_lon + hi)
+        starts = np.searchsorted(self._keys, starts, side="left")
+        stops = np.searchsorted(self._keys, stops, side="right")
+        spans = [self._order[start:stop] for start, stop in zip(starts, stops) if stop > start]
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+
+    def within(self, lat: float, lon: float, radius_km: float):
+        """Images within ``radius_km`` of (lat, lon), nearest first, with a DistanceKm column."""
+        candidates = self._candidates(lat, lon, radius_km)
+        distance = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        hits = distance <= radius_km
+        result = self.images.iloc[candidates[hits]].assign(DistanceKm=distance[hits].round(3))
+        return result.sort_values(["DistanceKm", "Image"], kind="stable").reset_index(drop=True)
+
+    def cluster(self, eps_km: float = 1.0, min_images: int = 2) -> np.ndarray:
+        """Cluster number per image, largest cluster first; -1 for clusters under ``min_images``.
+
+        Images in touching cells of ``eps_km`` share a cluster, so a chain of
+        nearby images joins into one location.
+        """
+        grid = _Grid(eps_km / KM_PER_DEGREE)
+        cells, members = np.unique(grid.keys(self.lat, self.lon), return_inverse=True)
+        if len(cells) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Link each occupied cell to its occupied neighbours; four directions cover all eight pairs
+        rows, columns = cells // grid.n_lon, cells % grid.n_lon
+        left, right = [], []
+        for d_row, d_column in ((0, 1), (1, -1), (1, 0), (1, 1)):
+            neighbour = (rows + d_row) * grid.n_lon + (columns + d_column) % grid.n_lon
+            position = np.minimum(np.searchsorted(cells, neighbour), len(cells) - 1)
+            found = (cells[position] == neighbour) & (rows + d_row < grid.n_lat)
+            left.append(np.flatnonzero(found))
+            right.append(position[found])
+        labels = _components(len(cells), np.concatenate(left), np.concatenate(right))[members.ravel()]
+
+        sizes = np.bincount(labels, minlength=len(cells))
+        ranked = np.lexsort((np.arange(len(cells)), -sizes))
+        ranked = ranked[sizes[ranked] >= min_images]
+        numbers = np.full(len(cells), -1, dtype=np.int64)
+        numbers[ranked] = np.arange(len(ranked))
+        return numbers[labels]
+
+
+def summarize_clusters(index: GeoIndex, clusters: np.ndarray, taken=None, devices=None):
+    """One row per cluster: image count, centre, spread, geohash, time span and devices.
+
+    ``taken`` and ``devices`` are optional Series keyed by image name.
+    """
+    import pandas as pd
+
+    columns = ["Cluster", "Images", "CenterLatitude", "CenterLongitude", "RadiusKm", "Geohash",
+               "FirstTaken", "LastTaken", "Devices"]
+    images = index.images.assign(Cluster=clusters)
+    images = images[images["Cluster"] >= 0]
+    if images.empty:
+        return pd.DataFrame(columns=columns)
+
+    images = images.assign(
+        Taken=images["Image"].map(taken) if taken is not None else pd.NaT,
+        Device=images["Image"].map(devices) if devices is not None else None,
+    )
+    groups = images.groupby("Cluster")
+    summary = groups.agg(Images=("Image", "size"),
+                         CenterLatitude=("LatitudeDecimal", "mean"),
+                         CenterLongitude=("LongitudeDecimal", "mean"),
+                         FirstTaken=("Taken", "min"),
+                         LastTaken=("Taken", "max"))
+    # Mean positions are fine at city scale; clusters spanning the antimeridian are not expected
+    spread = haversine_km(summary["CenterLatitude"].reindex(images["Cluster"]).to_numpy(),
+                          summary["CenterLongitude"].reindex(images["Cluster"]).to_numpy(),
+                          images["LatitudeDecimal"].to_numpy(), images["LongitudeDecimal"].to_numpy())
+    summary["RadiusKm"] = pd.Series(spread, index=images.index).groupby(images["Cluster"]).max().round(3)
+    summary["Geohash"] = geohash(summary["CenterLatitude"], summary["CenterLongitude"], precision=6)
+    summary["Devices"] = groups["Device"].agg(
+        lambda values: ", ".join(sorted({value for value in values.dropna() if value != "NA"})) or "NA")
+    summary[["CenterLatitude", "CenterLongitude"]] = summary[["CenterLatitude", "CenterLongitude"]].round(6)
+    return summary.reset_index()[columns]
+
+
+def map_url(lat: Optional[float], lon: Optional[float]) -> str:
+    """Google Maps link for a signed position, "NA" when it is unknown."""
+    if lat is None or lon is None or np.isnan(lat) or np.isnan(lon):
+        return "NA"
+    return f"https://www.google.com/maps?q={lat:.6f},{lon:.6f}"
+
+
+def map_urls(lat, lon):
+    """``map_url`` for whole columns at once."""
+    import pandas as pd
+
+    lat = pd.Series(np.asarray(lat, dtype="float64")).round(6)
+    lon = pd.Series(np.asarray(lon, dtype="float64")).round(6)
+    urls = "https://www.google.com/maps?q=" + lat.astype(str) + "," + lon.astype(str)
+    return urls.where(lat.notna() & lon.notna(), "NA").to_numpy(dtype=object)
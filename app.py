@@ -1,14 +1,42 @@
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import base64
 import streamlit as st
 import os
 import subprocess
-import json
-import pandas as pd
 import importlib
 import sys
 import uuid
+import shutil
 from pathlib import Path
 
+from call_sms.adb import AdbError, AdbSession
+from call_sms.jobs import DONE, JobRunner
+from call_sms.domains import feed_paths as domain_feed_paths
+from call_sms.downloads import DOWNLOADS_DIRNAME, build_zip, gzip_file
+from call_sms.result_cache import AnalysisCache, config_version, hash_file
+from call_sms.result_store import ResultStore
+from call_sms.session_storage import SessionStorage, StorageQuotaExceeded
+from call_sms.tracing import TRACE_FILENAME, load_trace
+
+# Heavy modules (pandas, matplotlib, the analysers, exiftool via EXIF_A) are
+# imported through lazy_import() only when a tab actually needs them.
+
+STARTUP_BUDGET_MS = 250
+PAGE_SIZES = [25, 100, 500]
+JOB_POLL_SECONDS = 2
+SESSION_QUOTA_BYTES = 2 * 1024 ** 3
+SESSION_TTL_SECONDS = 24 * 3600
+BACKGROUND_IMAGE = "App_Images/image3.png"
+
+_startup_marks = []
+
+def mark_startup(label):
+    """Record elapsed time since script start for the debug panel"""
+    _startup_marks.append((label, (time.perf_counter() - _STARTUP_T0) * 1000))
+
 # ----------------------------
 # Session Configuration
 # ----------------------------
@@ -18,12 +46,14 @@ if "session_id" not in st.session_state:
 SESSION_ID = st.session_state.session_id
 
 # ----------------------------
-# App Background Styling
+# Cached Assets
 # ----------------------------
-st.set_page_config(page_title="ForAndroid - Forensics Toolkit")
-with open("App_Images/image3.png", "rb") as img_file:
-    img_base64 = base64.b64encode(img_file.read()).decode()
-    st.markdown(f"""
+@st.cache_data(show_spinner=False)
+def load_background_css(image_path):
+    """Read and base64-encode the background image once per server process"""
+    with open(image_path, "rb") as img_file:
+        img_base64 = base64.b64encode(img_file.read()).decode()
+    return f"""
         <style>
         .stApp {{
             background-image: url('data:image/png;base64,{img_base64}');
@@ -32,36 +62,162 @@ with open("App_Images/image3.png", "rb") as img_file:
             background-attachment: fixed;
         }}
         </style>
-    """, unsafe_allow_html=True)
+    """
+
+@st.cache_resource(show_spinner=False)
+def lazy_import(module_name):
+    """Import a heavy module on first use and keep it for later reruns"""
+    return importlib.import_module(module_name)
+
+@st.cache_resource(show_spinner=False)
+def get_analysis_cache():
+    """Analysis results cache shared by every session on this server"""
+    return AnalysisCache("analysis_cache")
+
+@st.cache_resource(show_spinner=False)
+def get_job_runner():
+    """Background job runner shared by every session on this server"""
+    return JobRunner("jobs.db", max_workers=max(2, (os.cpu_count() or 2) // 2))
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_timeline(calls_path, calls_hash, sms_path, sms_hash):
+    """Indexed call + SMS timeline, shared while the same exports are loaded (hashes key the cache)"""
+    timeline = lazy_import("call_sms.timeline")
+    return timeline.Timeline.from_files(calls_path, sms_path)
+
+@st.cache_resource(show_spinner=False)
+def get_session_storage():
+    """Per-session upload/output folders with quota and background GC of expired sessions"""
+    storage = SessionStorage(
+        {"uploads": "call_sms/uploads", "outputs": "analysis_output", "exif": "EXIF_Extraction/sessions"},
+        quota_bytes=SESSION_QUOTA_BYTES,
+        ttl_seconds=SESSION_TTL_SECONDS
+    )
+    storage.gc()
+    storage.start_background_gc()
+    return storage
+
+session_storage = get_session_storage()
+session_storage.touch(SESSION_ID)
+
+# ----------------------------
+# App Background Styling
+# ----------------------------
+st.set_page_config(page_title="ForAndroid - Forensics Toolkit")
+mark_startup("imports + page config")
+st.markdown(load_background_css(BACKGROUND_IMAGE), unsafe_allow_html=True)
+mark_startup("background")
 
 # ----------------------------
 # Helper Functions
 # ----------------------------
-def run_notebook(notebook_path):
-    """Execute notebook and return result"""
+def run_notebook(notebook_path, output_dir, env=None):
+    """Execute notebook into output_dir (leaving the source untouched) and return result"""
     return subprocess.run([
-        "jupyter", "nbconvert", "--to", "notebook", "--execute", "--inplace", notebook_path
-    ], capture_output=True, text=True)
+        "jupyter", "nbconvert", "--to", "notebook", "--execute", notebook_path,
+        "--output", os.path.basename(notebook_path), "--output-dir", output_dir
+    ], capture_output=True, text=True, env={**os.environ, **(env or {})})
 
-def save_uploaded_file(uploaded_file, save_path):
-    """Save uploaded file to specified path"""
-    with open(save_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+def display_download_button(file_path, label, file_name, mime_type="text/plain", key=None, downloads_dir=None):
+    """Display download button if file exists; the file is only read when clicked
 
-def display_download_button(file_path, label, file_name, mime_type="text/plain"):
-    """Display download button if file exists"""
+    With ``downloads_dir`` set and the gzip option enabled, CSVs are served as a
+    compressed copy built on demand in that folder.
+    """
     if os.path.exists(file_path):
-        with open(file_path, "rb") as f:
-            st.download_button(
-                label=label,
-                data=f,
-                file_name=file_name,
-                mime=mime_type,
-                use_container_width=True
-            )
+        if downloads_dir and file_name.endswith(".csv") and st.session_state.get("gzip_downloads"):
+            read_data = lambda: Path(gzip_file(file_path, downloads_dir)).read_bytes()
+            file_name, mime_type = file_name + ".gz", "application/gzip"
+        else:
+            read_data = lambda: Path(file_path).read_bytes()
+        st.download_button(
+            label=label,
+            data=read_data,
+            file_name=file_name,
+            mime=mime_type,
+            key=key,
+            use_container_width=True
+        )
     else:
         st.warning(f"File not found: {file_name}")
 
+def render_job(job):
+    """Show status, progress and the latest log lines of a background job"""
+    status_icon = {"queued": "⏳", "running": "⚙️", "done": "✅", "failed": "❌", "cancelled": "🚫"}
+    st.markdown(f"**{status_icon.get(job.status, '')} {job.label}** — {job.status} ({job.elapsed:.0f}s)")
+    if not job.is_finished:
+        st.progress(min(job.progress, 1.0))
+        if st.button("Cancel", key=f"cancel_{job.id}"):
+            get_job_runner().cancel(job.id)
+    with st.expander("Job log", expanded=False):
+        st.code("\n".join(get_job_runner().logs(job.id, tail=50)) or "(no output yet)")
+
+def render_trace(trace_path):
+    """Show the per-stage timing/memory trace a script wrote next to its outputs"""
+    trace = load_trace(trace_path)
+    if not trace:
+        return
+    with st.expander(f"Performance trace ({trace['total_seconds']:.2f}s)", expanded=False):
+        peak = trace.get("peak_rss_mb")
+        workers = trace.get("workers")
+        st.caption(f"{trace['run']} started {trace['started']}"
+                   + (f" · peak RSS {peak:.0f} MB" if peak is not None else "")
+                   + (f" (incl. {workers} workers, {trace['workers_peak_rss_mb']:.0f} MB)" if workers else ""))
+        rows = []
+        for stage in trace["stages"]:
+            shard = f" [shard {stage['shard']}]" if stage.get("shard") is not None else ""
+            rows.append({
+                "stage": "  " * stage["depth"] + stage["name"] + shard,
+                "seconds": stage["seconds"],
+                "rows in": stage["rows_in"],
+                "rows out": stage["rows_out"],
+                "peak RSS (MB)": stage["peak_rss_mb"],
+                "RSS growth (MB)": stage["rss_growth_mb"],
+                "Python peak (MB)": stage["py_peak_mb"],
+                "error": stage["error"] or ""
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        errors = [stage for stage in trace["stages"] if stage["error"]]
+        for stage in errors:
+            st.warning(f"{stage['name']}: {stage['error']}")
+
+def render_paged_table(store, table, csv_path, sort_columns, search_column=None, filter_column=None):
+    """Show one server-side page of a result CSV with sort, filter and paging controls"""
+    index_columns = sort_columns + [c for c in (search_column, filter_column) if c]
+    store.load_csv(table, csv_path, index_columns=index_columns)
+    columns = store.columns(table)
+
+    controls = st.columns([2, 1, 2, 2, 1])
+    sort_options = [c for c in sort_columns if c in columns] + ["(file order)"]
+    sort_by = controls[0].selectbox("Sort by", sort_options, key=f"{table}_sort")
+    descending = controls[1].checkbox("Desc", value=True, key=f"{table}_desc")
+
+    contains = {}
+    if search_column in columns:
+        contains[search_column] = controls[2].text_input(f"{search_column} contains", key=f"{table}_search")
+
+    equals = {}
+    if filter_column in columns:
+        choices = ["(all)"] + [str(v) for v in store.value_counts(table, filter_column)]
+        choice = controls[3].selectbox(filter_column, choices, key=f"{table}_filter")
+        if choice != "(all)":
+            equals[filter_column] = choice
+
+    page_size = controls[4].selectbox("Rows", PAGE_SIZES, key=f"{table}_page_size")
+
+    total = store.count(table, equals=equals, contains=contains)
+    pages = max(1, -(-total // page_size))
+    page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                  step=1, key=f"{table}_page")
+    frame = store.page(
+        table, page=page_number - 1, page_size=page_size,
+        sort_by=sort_by if sort_by in columns else None, descending=descending,
+        equals=equals, contains=contains
+    )
+    st.dataframe(frame, use_container_width=True)
+    first = (page_number - 1) * page_size
+    st.caption(f"Rows {min(first + 1, total)}–{min(first + page_size, total)} of {total}")
+
 def ensure_directories(*dirs):
     """Create directories if they don't exist"""
     for dir_path in dirs:
@@ -78,16 +234,26 @@ def clear_directory(directory):
 # ----------------------------
 # Tab Layout
 # ----------------------------
-exif_tab, callsms_tab, extractor_tab = st.tabs(["EXIF Metadata Extraction", "Call & SMS Analysis", "SMS & Call Log Extractor"])
+exif_tab, callsms_tab, timeline_tab, extractor_tab = st.tabs(
+    ["EXIF Metadata Extraction", "Call & SMS Analysis", "Communication Timeline", "SMS & Call Log Extractor"])
+mark_startup("tab layout")
 
 # ----------------------------
 # EXIF TAB
 # ----------------------------
 with exif_tab:
-    UPLOAD_DIR = "/home/shuchi-sharma/Desktop/internSHip Poj/images"
-    EXIF_NOTEBOOK = "/home/shuchi-sharma/Desktop/internSHip Poj/EXIF_Extraction/EXIF_E.ipynb"
-    EXIF_JSON = "/home/shuchi-sharma/Desktop/internSHip Poj/EXIF_Extraction/exif_analyze.json"
-    text_file_path = "/home/shuchi-sharma/Desktop/internSHip Poj/EXIF_Extraction/exif_data.txt"
+    EXIF_NOTEBOOK = "EXIF_Extraction/EXIF_E.ipynb"
+
+    # Every session gets its own image folder and output files, so concurrent
+    # EXIF jobs never share (or clear) each other's data
+    EXIF_SESSION_DIR = session_storage.areas["exif"] / SESSION_ID
+    UPLOAD_DIR = str(EXIF_SESSION_DIR / "images")
+    EXIF_JSON = str(EXIF_SESSION_DIR / "exif_analyze.json")
+    text_file_path = str(EXIF_SESSION_DIR / "exif_data.txt")
+    EXIF_ENV = {
+        "EXIF_IMAGE_DIR": os.path.abspath(UPLOAD_DIR),
+        "EXIF_OUTPUT_DIR": os.path.abspath(EXIF_SESSION_DIR)
+    }
 
     st.title("Image Upload and Metadata Extraction")
     uploaded_files = st.file_uploader(
@@ -97,24 +263,37 @@ with exif_tab:
         key="exif_upload"
     )
 
+    exif_upload_ok = True
     if uploaded_files:
-        ensure_directories(UPLOAD_DIR)
-        clear_directory(UPLOAD_DIR)
-        
-        for uploaded_file in uploaded_files:
-            save_path = os.path.join(UPLOAD_DIR, uploaded_file.name)
-            save_uploaded_file(uploaded_file, save_path)
-
+        # Re-save only when the selection changes; stale outputs belong to the old selection
+        upload_ids = [getattr(f, "file_id", None) or f"{f.name}:{f.size}" for f in uploaded_files]
+        if st.session_state.get("exif_saved_uploads") != upload_ids or not os.path.isdir(UPLOAD_DIR):
+            ensure_directories(UPLOAD_DIR)
+            clear_directory(UPLOAD_DIR)
+            clear_directory(str(EXIF_SESSION_DIR))
+            
+            st.session_state.pop("exif_results", None)
+            try:
+                for uploaded_file in uploaded_files:
+                    session_storage.save_upload(SESSION_ID, uploaded_file, area="exif", subdir="images")
+                st.session_state.exif_saved_uploads = upload_ids
+            except StorageQuotaExceeded as e:
+                exif_upload_ok = False
+                st.session_state.pop("exif_saved_uploads", None)
+                st.error(f"{e}. Remove old results or start a new session.")
+
+    if uploaded_files and exif_upload_ok:
         button_cols = st.columns([1, 2, 1])
         with button_cols[1]:
             find_metadata_clicked = st.button("Find Meta Data", use_container_width=True, key="exif_find_btn")
 
         if find_metadata_clicked:
             with st.spinner("Extracting metadata... running EXIF_E.ipynb"):
-                result = run_notebook(EXIF_NOTEBOOK)
+                result = run_notebook(EXIF_NOTEBOOK, output_dir=str(EXIF_SESSION_DIR), env=EXIF_ENV)
 
             if result.returncode == 0:
                 st.toast("Metadata extracted and saved successfully!")
+                render_trace(EXIF_SESSION_DIR / TRACE_FILENAME)
             else:
                 st.error("Execution of EXIF_E.ipynb failed. Refresh and upload again")
 
@@ -123,43 +302,76 @@ with exif_tab:
             run_exif_a_clicked = st.button("Generate Analysis", use_container_width=True, key="exif_gen_btn")
 
         if run_exif_a_clicked:
-            with st.spinner("Generating..."):
-                result_a = run_notebook("EXIF_Extraction/EXIF_E.ipynb")
+            if os.path.exists(EXIF_JSON):
+                result_a = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr="")
+            else:
+                with st.spinner("Generating..."):
+                    result_a = run_notebook(EXIF_NOTEBOOK, output_dir=str(EXIF_SESSION_DIR), env=EXIF_ENV)
             
             if result_a.returncode == 0:
-                sys.path.insert(0, os.path.join(os.getcwd(), 'EXIF_Extraction'))
-                EXIF_A = importlib.import_module("EXIF_A")
-                importlib.reload(EXIF_A)
-                
-                # Display analysis results
-                analysis_sections = [
-                    ("Temporal Analysis Table", EXIF_A.df_time),
-                    ("Geographical Analysis Table", EXIF_A.df_gps),
-                    ("Device Analysis Table", EXIF_A.df_device),
-                    ("Editing Softwares Used", EXIF_A.df_edited)
-                ]
-                
-                for title, df in analysis_sections:
-                    st.markdown(f"### {title}")
-                    st.dataframe(df)
-                
-                # Display map links
-                for image_name, url in EXIF_A.map_link.items():
-                    link_text = f"[View Location on Map]({url})" if url and url != "NA" else "Location not available"
-                    st.markdown(f"**{image_name}**: {link_text}", unsafe_allow_html=True)
-                
-                st.markdown("### Summary Analysis")
-                st.text(EXIF_A.summary_text)
+                if os.path.join(os.getcwd(), 'EXIF_Extraction') not in sys.path:
+                    sys.path.insert(0, os.path.join(os.getcwd(), 'EXIF_Extraction'))
+                EXIF_A = lazy_import("EXIF_A")
+                # Kept for the session so the location query below survives reruns
+                st.session_state.exif_results = EXIF_A.analyze(EXIF_JSON)
             else:
+                st.session_state.pop("exif_results", None)
                 st.write("Return code:", result_a.returncode)
                 st.code(result_a.stderr)
                 st.toast("No temporal metadata found in the images.")
 
+        exif_results = st.session_state.get("exif_results")
+        if exif_results:
+            # Display analysis results
+            analysis_sections = [
+                ("Temporal Analysis Table", exif_results["df_time"]),
+                ("Geographical Analysis Table", exif_results["df_gps"]),
+                ("Location Clusters", exif_results["df_clusters"]),
+                ("Device Analysis Table", exif_results["df_device"]),
+                ("Editing Softwares Used", exif_results["df_edited"])
+            ]
+
+            for title, df in analysis_sections:
+                st.markdown(f"### {title}")
+                st.dataframe(df)
+
+            gps_locations = exif_results["gps_index"]
+            if len(gps_locations):
+                st.markdown("### Images Near a Location")
+                # Start from the busiest location cluster, or the first located image
+                clusters = exif_results["df_clusters"]
+                if len(clusters):
+                    start_lat, start_lon = clusters["CenterLatitude"].iloc[0], clusters["CenterLongitude"].iloc[0]
+                else:
+                    start_lat, start_lon = gps_locations.lat[0], gps_locations.lon[0]
+                near_cols = st.columns(3)
+                with near_cols[0]:
+                    near_lat = st.number_input("Latitude", -90.0, 90.0, float(start_lat),
+                                               format="%.6f", key="exif_near_lat")
+                with near_cols[1]:
+                    near_lon = st.number_input("Longitude", -180.0, 180.0, float(start_lon),
+                                               format="%.6f", key="exif_near_lon")
+                with near_cols[2]:
+                    near_km = st.number_input("Radius (km)", 0.01, 20000.0, 1.0, key="exif_near_km")
+                nearby = gps_locations.within(near_lat, near_lon, near_km)
+                st.caption(f"{len(nearby)} of {len(gps_locations)} located images within {near_km:g} km")
+                st.dataframe(nearby)
+
+            # Display map links
+            for image_name, url in exif_results["map_link"].items():
+                link_text = f"[View Location on Map]({url})" if url and url != "NA" else "Location not available"
+                st.markdown(f"**{image_name}**: {link_text}", unsafe_allow_html=True)
+
+            st.markdown("### Summary Analysis")
+            st.text(exif_results["summary_text"])
+
         if find_metadata_clicked:
             download_cols = st.columns([1, 2, 1])
             with download_cols[1]:
                 display_download_button(text_file_path, "Download Metadata", "exif_data.txt")
 
+mark_startup("EXIF tab")
+
 # ----------------------------
 # CALL/SMS TAB
 # ----------------------------
@@ -167,8 +379,32 @@ with callsms_tab:
     CALL_ANALYSER_SCRIPT = "call_sms/analysers/call.py"
     SMS_ANALYSER_SCRIPT = "call_sms/analysers/sms.py"
 
-    CALL_SMS_UPLOAD_DIR = f"call_sms/uploads/{SESSION_ID}"
-    SESSION_OUTPUT_DIR = f"analysis_output/{SESSION_ID}"
+    # Lines the analysers print at each stage, used to estimate job progress
+    ANALYSIS_PROGRESS_MARKERS = {
+        "Call Records": ["[*] Loading", "[*] Analyzing call patterns", "[*] Detecting potential spoof",
+                         "[*] Generating summary", "[*] Complete analysis saved"],
+        "SMS Records": ["File loaded successfully", "Categorizing messages", "Analyzing URLs",
+                        "Detecting anomalies", "Clustering campaigns", "Searching for keywords"]
+    }
+
+    SMS_CONFIG_PATH = os.environ.get("SMS_ANALYSER_CONFIG", "call_sms/analysers/sms_config.json")
+
+    # Files whose contents change analysis output; part of the cache key
+    ANALYSER_CONFIG_FILES = {
+        "Call Records": [CALL_ANALYSER_SCRIPT, "call_sms/columnar.py", "call_sms/phone.py", "call_sms/shards.py"],
+        "SMS Records": [SMS_ANALYSER_SCRIPT, SMS_CONFIG_PATH, "call_sms/columnar.py",
+                        "call_sms/phone.py", "call_sms/domains.py", "call_sms/campaigns.py", "call_sms/shards.py"]
+    }
+
+    def analyser_config_files(analysis_type):
+        """ANALYSER_CONFIG_FILES plus the blocklist feeds the SMS config currently points at"""
+        if analysis_type == "SMS Records":
+            return ANALYSER_CONFIG_FILES[analysis_type] + domain_feed_paths(SMS_CONFIG_PATH)
+        return ANALYSER_CONFIG_FILES[analysis_type]
+
+    CALL_SMS_UPLOAD_DIR = str(session_storage.areas["uploads"] / SESSION_ID)
+    SESSION_OUTPUT_DIR = str(session_storage.areas["outputs"] / SESSION_ID)
+    SESSION_DOWNLOADS_DIR = os.path.join(SESSION_OUTPUT_DIR, DOWNLOADS_DIRNAME)
 
     # Output file paths
     CALL_OUTPUT_FILES = {
@@ -182,107 +418,325 @@ with callsms_tab:
         "Anomalies": os.path.join(SESSION_OUTPUT_DIR, "sms", "anomalies.csv"),
         "Categorized Messages": os.path.join(SESSION_OUTPUT_DIR, "sms", "categorized_messages.csv"),
         "Keyword Matches": os.path.join(SESSION_OUTPUT_DIR, "sms", "keyword_matches.csv"),
-        "URLs Found": os.path.join(SESSION_OUTPUT_DIR, "sms", "url_analysis.csv")
+        "URLs Found": os.path.join(SESSION_OUTPUT_DIR, "sms", "url_analysis.csv"),
+        "Campaigns": os.path.join(SESSION_OUTPUT_DIR, "sms", "campaigns.csv")
+    }
+
+    # Result tables are paged from an indexed SQLite copy of each output CSV
+    SMS_TABLE_OPTIONS = {
+        "Anomalies": {"table": "anomalies",
+                      "view": {"sort_columns": ["Date"], "search_column": "Sender", "filter_column": "Reason"}},
+        "Categorized Messages": {"table": "categorized",
+                                 "view": {"sort_columns": ["Date"], "search_column": "Sender", "filter_column": "Category"}},
+        "Keyword Matches": {"table": "keywords",
+                            "view": {"sort_columns": ["Date"], "search_column": "Sender", "filter_column": "MatchedKeyword"}},
+        "URLs Found": {"table": "urls",
+                       "view": {"sort_columns": ["Date", "Domain"], "search_column": "Domain", "filter_column": "Suspicious"}},
+        "Campaigns": {"table": "campaigns",
+                      "view": {"sort_columns": ["Messages", "Senders", "FirstSeen"], "search_column": "Representative"}}
     }
 
     st.title("Calllogs , SMS Upload and Analysis")
     analysis_type = st.selectbox("Select Analysis Type", ["Call Records", "SMS Records"], key="analysis_selector")
-    uploaded_csv = st.file_uploader("Upload CSV file for analysis", type=["csv"], key="csv_uploader")
+    uploaded_csv = st.file_uploader(
+        "Upload CSV, Parquet or Arrow export for analysis",
+        type=["csv", "parquet", "arrow"],
+        key="csv_uploader"
+    )
 
     if uploaded_csv:
-        ensure_directories(CALL_SMS_UPLOAD_DIR, 
-                          os.path.join(SESSION_OUTPUT_DIR, "calls"), 
+        ensure_directories(os.path.join(SESSION_OUTPUT_DIR, "calls"), 
                           os.path.join(SESSION_OUTPUT_DIR, "sms"))
 
-        saved_path = os.path.join(CALL_SMS_UPLOAD_DIR, uploaded_csv.name)
-        save_uploaded_file(uploaded_csv, saved_path)
-        st.success(f"File '{uploaded_csv.name}' uploaded successfully.")
-
-        run_analysis = st.button(f"Run {analysis_type} Analysis", use_container_width=True, key="run_button")
+        saved_path = os.path.join(CALL_SMS_UPLOAD_DIR, os.path.basename(uploaded_csv.name))
+        # Only write the upload once, not on every rerun of the script
+        upload_id = getattr(uploaded_csv, "file_id", None) or f"{uploaded_csv.name}:{uploaded_csv.size}"
+        upload_ok = True
+        if st.session_state.get("saved_upload") != upload_id or not os.path.exists(saved_path):
+            try:
+                saved_path = str(session_storage.save_upload(SESSION_ID, uploaded_csv, area="uploads"))
+                st.session_state.saved_upload = upload_id
+            except StorageQuotaExceeded as e:
+                upload_ok = False
+                st.error(f"{e}. Remove old results or start a new session.")
+        if upload_ok:
+            st.success(f"File '{uploaded_csv.name}' uploaded successfully.")
+
+        # One analysis at a time: a second run would clear and refill the folder the
+        # running job still writes to, and cache the mix under the new upload's key
+        running_job = st.session_state.get("analysis_job") and get_job_runner().get(st.session_state.analysis_job)
+        analysis_running = bool(running_job) and not running_job.is_finished
+        run_analysis = upload_ok and st.button(
+            f"Run {analysis_type} Analysis", use_container_width=True, key="run_button",
+            disabled=analysis_running,
+            help="Wait for the running analysis to finish" if analysis_running else None
+        )
 
         if run_analysis:
-            with st.spinner("Running analysis..."):
-                script_path = CALL_ANALYSER_SCRIPT if analysis_type == "Call Records" else SMS_ANALYSER_SCRIPT
+            script_path = CALL_ANALYSER_SCRIPT if analysis_type == "Call Records" else SMS_ANALYSER_SCRIPT
+            analysis_subdir = os.path.join(SESSION_OUTPUT_DIR, "calls" if analysis_type == "Call Records" else "sms")
 
-                try:
-                    result = subprocess.run(
-                        ["python", script_path, saved_path, SESSION_OUTPUT_DIR],
-                        capture_output=True, text=True
+            try:
+                analysis_cache = get_analysis_cache()
+                cache_key = AnalysisCache.make_key(
+                    hash_file(saved_path),
+                    analysis_type,
+                    config_version(analyser_config_files(analysis_type))
+                )
+
+                # Start from an empty output folder so no stale files from a previous upload remain
+                shutil.rmtree(analysis_subdir, ignore_errors=True)
+                session_storage.check_quota(SESSION_ID)
+
+                if analysis_cache.restore(cache_key, analysis_subdir):
+                    st.toast("Loaded cached analysis results.")
+                    st.session_state.analysis_view = analysis_type
+                    st.session_state.pop("analysis_job", None)
+                else:
+                    ensure_directories(analysis_subdir)
+                    st.session_state.analysis_job = get_job_runner().submit(
+                        kind="analysis",
+                        label=f"{analysis_type} analysis of {uploaded_csv.name}",
+                        command=[sys.executable, script_path, saved_path, SESSION_OUTPUT_DIR],
+                        session_id=SESSION_ID,
+                        progress_markers=ANALYSIS_PROGRESS_MARKERS[analysis_type],
+                        outputs={
+                            "analysis_type": analysis_type,
+                            "output_dir": analysis_subdir,
+                            "cache_key": cache_key,
+                            "source_name": uploaded_csv.name
+                        }
                     )
+                    st.session_state.analysis_view = None
+            except StorageQuotaExceeded as e:
+                st.error(f"{e}. Remove old results or start a new session.")
+            except Exception as e:
+                st.error(f"Exception occurred: {e}")
+
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def analysis_job_panel():
+        job_id = st.session_state.get("analysis_job")
+        if not job_id:
+            return
+        job = get_job_runner().get(job_id)
+        if job is None:
+            st.session_state.pop("analysis_job", None)
+            return
+
+        render_job(job)
+        if not job.is_finished:
+            return
+
+        st.session_state.pop("analysis_job", None)
+        if job.status == DONE:
+            get_analysis_cache().store(
+                job.outputs["cache_key"], job.outputs["output_dir"],
+                analysis_type=job.outputs["analysis_type"],
+                source_name=job.outputs["source_name"]
+            )
+            st.session_state.analysis_view = job.outputs["analysis_type"]
+            st.toast("Analysis complete.")
+        else:
+            st.session_state.analysis_error = "\n".join(get_job_runner().logs(job.id))
+        st.rerun()
 
-                    if result.returncode == 0:
-                        st.toast("Analysis complete.")
-
-                        if analysis_type == "Call Records":
-                            # Display call analysis results
-                            if os.path.exists(CALL_OUTPUT_FILES["complete"]):
-                                df = pd.read_csv(CALL_OUTPUT_FILES["complete"])
-                                st.markdown("### Suspicious Call Records")
-                                st.dataframe(df)
-                                display_download_button(
-                                    CALL_OUTPUT_FILES["complete"], 
-                                    "Download Call Analysis CSV", 
-                                    "complete_call_analysis.csv", 
-                                    "text/csv"
-                                )
-                            else:
-                                st.error("Call analysis output file not found.")
-                            
-                            # Display spoof calls
-                            if os.path.exists(CALL_OUTPUT_FILES["spoof"]):
-                                st.markdown("### 🎭 Potential Spoof or Scam Calls")
-                                df_spoof = pd.read_csv(CALL_OUTPUT_FILES["spoof"])
-                                st.dataframe(df_spoof)
-                                display_download_button(
-                                    CALL_OUTPUT_FILES["spoof"], 
-                                    "Download Spoof Calls CSV", 
-                                    "potential_spoof_calls.csv", 
-                                    "text/csv"
-                                )
-                            else:
-                                st.warning("Spoof calls file not found.")
-
-                            # Display summary
-                            if os.path.exists(CALL_OUTPUT_FILES["summary"]):
-                                st.markdown("### Call Analysis Summary")
-                                with open(CALL_OUTPUT_FILES["summary"], "r") as f:
-                                    summary_text = f.read()
-                                    st.text_area("Summary", summary_text, height=300)
-                                
-                                st.download_button(
-                                    label="Download Summary Report",
-                                    data=summary_text,
-                                    file_name="call_analysis_summary.txt",
-                                    mime="text/plain",
-                                    use_container_width=True
-                                )
-                            else:
-                                st.warning("Call summary report not found.")
-
-                        else:
-                            # SMS Analysis Results
-                            from call_sms.analysers.sms import create_category_pie_chart, create_keyword_pie_chart
-                            
-                            for label, path in SMS_OUTPUT_FILES.items():
-                                if os.path.exists(path):
-                                    st.markdown(f"### {label}")
-                                    df = pd.read_csv(path)
-                                    st.dataframe(df)
-                                    
-                                    # Display charts for specific categories
-                                    if label == "Categorized Messages":
-                                        st.pyplot(create_category_pie_chart(df))
-                                    elif label == "Keyword Matches":
-                                        st.pyplot(create_keyword_pie_chart(df))
-                                    
-                                    display_download_button(path, f"Download {label} CSV", os.path.basename(path), "text/csv")
-                                else:
-                                    st.warning(f"{label} file not found: {path}")
-                    else:
-                        st.error("Analysis script failed.")
-                        st.code(result.stderr)
-                except Exception as e:
-                    st.error(f"Exception occurred: {e}")
+    analysis_job_panel()
+
+    if st.session_state.get("analysis_error"):
+        st.error("Analysis script failed.")
+        st.code(st.session_state.pop("analysis_error"))
+
+    analysis_view = st.session_state.get("analysis_view")
+    result_store = ResultStore(os.path.join(SESSION_OUTPUT_DIR, "results.db")) if analysis_view else None
+
+    if analysis_view:
+        bundle_cols = st.columns([2, 1])
+        with bundle_cols[0]:
+            # The zip is streamed to disk only when this button is clicked
+            st.download_button(
+                label="Download all results (zip)",
+                data=lambda: Path(build_zip(SESSION_OUTPUT_DIR)).read_bytes(),
+                file_name=f"analysis_results_{SESSION_ID[:8]}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+        with bundle_cols[1]:
+            st.checkbox("gzip CSV downloads", key="gzip_downloads")
+
+    if analysis_view == "Call Records":
+        # Display call analysis results
+        if os.path.exists(CALL_OUTPUT_FILES["complete"]):
+            st.markdown("### Suspicious Call Records")
+            render_paged_table(
+                result_store, "complete_calls", CALL_OUTPUT_FILES["complete"],
+                sort_columns=["spoof_score", "risk_score", "total_calls_from_number", "duration"],
+                search_column="number"
+            )
+            display_download_button(
+                CALL_OUTPUT_FILES["complete"], 
+                "Download Call Analysis CSV", 
+                "complete_call_analysis.csv", 
+                "text/csv",
+                downloads_dir=SESSION_DOWNLOADS_DIR
+            )
+        else:
+            st.error("Call analysis output file not found.")
+        
+        # Display spoof calls
+        if os.path.exists(CALL_OUTPUT_FILES["spoof"]):
+            st.markdown("### 🎭 Potential Spoof or Scam Calls")
+            render_paged_table(
+                result_store, "spoof_calls", CALL_OUTPUT_FILES["spoof"],
+                sort_columns=["spoof_score", "total_calls", "missed_calls"],
+                search_column="number"
+            )
+            display_download_button(
+                CALL_OUTPUT_FILES["spoof"], 
+                "Download Spoof Calls CSV", 
+                "potential_spoof_calls.csv", 
+                "text/csv",
+                downloads_dir=SESSION_DOWNLOADS_DIR
+            )
+        else:
+            st.warning("Spoof calls file not found.")
+
+        # Display summary
+        if os.path.exists(CALL_OUTPUT_FILES["summary"]):
+            st.markdown("### Call Analysis Summary")
+            with open(CALL_OUTPUT_FILES["summary"], "r") as f:
+                st.text_area("Summary", f.read(), height=300)
+            
+            display_download_button(
+                CALL_OUTPUT_FILES["summary"],
+                "Download Summary Report",
+                "call_analysis_summary.txt",
+                "text/plain"
+            )
+        else:
+            st.warning("Call summary report not found.")
+
+        render_trace(os.path.join(SESSION_OUTPUT_DIR, "calls", TRACE_FILENAME))
+
+    elif analysis_view == "SMS Records":
+        # SMS Analysis Results
+        sms_analyser = lazy_import("call_sms.analysers.sms")
+        create_category_pie_chart = sms_analyser.create_category_pie_chart
+        create_keyword_pie_chart = sms_analyser.create_keyword_pie_chart
+        
+        for label, path in SMS_OUTPUT_FILES.items():
+            if os.path.exists(path):
+                st.markdown(f"### {label}")
+                table_options = SMS_TABLE_OPTIONS[label]
+                render_paged_table(result_store, table_options["table"], path, **table_options["view"])
+                
+                # Charts are drawn from counts computed in SQL, not from the full table
+                if label == "Categorized Messages":
+                    st.pyplot(create_category_pie_chart(result_store.value_counts("categorized", "Category")))
+                elif label == "Keyword Matches":
+                    st.pyplot(create_keyword_pie_chart(result_store.value_counts("keywords", "MatchedKeyword")))
+                
+                display_download_button(path, f"Download {label} CSV", os.path.basename(path), "text/csv",
+                                        downloads_dir=SESSION_DOWNLOADS_DIR)
+            else:
+                st.warning(f"{label} file not found: {path}")
+
+        render_trace(os.path.join(SESSION_OUTPUT_DIR, "sms", TRACE_FILENAME))
+
+mark_startup("Call & SMS tab")
+
+# ----------------------------
+# COMMUNICATION TIMELINE TAB
+# ----------------------------
+with timeline_tab:
+    TIMELINE_EVENT_LIMIT = 1000
+
+    st.title("Communication Timeline")
+    st.caption("Calls and SMS on one time axis; numbers are matched across both exports in any format.")
+    upload_cols = st.columns(2)
+    timeline_uploads = {
+        "calls": upload_cols[0].file_uploader("Call log export", type=["csv", "parquet", "arrow"],
+                                              key="timeline_calls"),
+        "sms": upload_cols[1].file_uploader("SMS export", type=["csv", "parquet", "arrow"],
+                                            key="timeline_sms"),
+    }
+
+    timeline_paths = {}
+    for kind, uploaded in timeline_uploads.items():
+        if uploaded is None:
+            continue
+        saved_path = session_storage.session_dir("uploads", SESSION_ID) / "timeline" / kind / uploaded.name
+        upload_id = getattr(uploaded, "file_id", None) or f"{uploaded.name}:{uploaded.size}"
+        try:
+            if st.session_state.get(f"timeline_saved_{kind}") != upload_id or not saved_path.exists():
+                saved_path = session_storage.save_upload(SESSION_ID, uploaded, area="uploads",
+                                                         subdir=os.path.join("timeline", kind))
+                st.session_state[f"timeline_saved_{kind}"] = upload_id
+            timeline_paths[kind] = str(saved_path)
+        except StorageQuotaExceeded as e:
+            st.error(f"{e}. Remove old results or start a new session.")
+
+    if timeline_paths:
+        calls_path, sms_path = timeline_paths.get("calls"), timeline_paths.get("sms")
+        try:
+            with st.spinner("Indexing events..."):
+                timeline = load_timeline(calls_path, calls_path and hash_file(calls_path),
+                                         sms_path, sms_path and hash_file(sms_path))
+        except Exception as e:
+            timeline = None
+            st.error(f"Could not build the timeline: {e}")
+
+        if timeline is not None and len(timeline) == 0:
+            st.warning("No events with a readable date in the uploaded exports.")
+        elif timeline is not None:
+            pd = lazy_import("pandas")
+            first_day = pd.Timestamp(timeline.times[0]).date()
+            last_day = pd.Timestamp(timeline.times[-1]).date()
+
+            filter_cols = st.columns([2, 2, 1, 1])
+            day_range = filter_cols[0].date_input("Date range", value=(first_day, last_day),
+                                                  min_value=first_day, max_value=last_day, key="timeline_range")
+            contact_text = filter_cols[1].text_input("Contact (any number format)", key="timeline_contact")
+            kinds = filter_cols[2].multiselect("Kinds", ["call", "sms"], default=["call", "sms"],
+                                               key="timeline_kinds")
+            bucket = filter_cols[3].selectbox("Histogram", ["day", "hour", "week"], key="timeline_bucket")
+
+            if isinstance(day_range, (tuple, list)) and len(day_range) == 2:
+                start_day, end_day = day_range
+            else:
+                start_day = end_day = day_range[0] if isinstance(day_range, (tuple, list)) else day_range
+            start = pd.Timestamp(start_day)
+            end = pd.Timestamp(end_day) + pd.Timedelta(days=1)
+
+            contact = None
+            if contact_text.strip():
+                contact = timeline.contact_key(contact_text.strip())
+                if contact is None:
+                    st.warning(f"No calls or messages with {contact_text.strip()}.")
+
+            if not contact_text.strip() or contact is not None:
+                selected_kinds = kinds or ["call", "sms"]
+                metric_cols = st.columns(3)
+                metric_cols[0].metric("Events", f"{timeline.count(start, end, contact, selected_kinds):,}")
+                metric_cols[1].metric("Calls", f"{timeline.count(start, end, contact, ['call']):,}")
+                metric_cols[2].metric("SMS", f"{timeline.count(start, end, contact, ['sms']):,}")
+
+                st.markdown(f"### Activity per {bucket}" + (f" with {contact}" if contact else ""))
+                histogram = timeline.histogram(bucket, start, end, contact)
+                st.bar_chart(histogram[[kind for kind in selected_kinds if kind in histogram.columns]])
+
+                st.markdown("### Events")
+                events = timeline.between(start, end, contact, selected_kinds, limit=TIMELINE_EVENT_LIMIT)
+                st.dataframe(events, use_container_width=True, hide_index=True)
+                if len(events) == TIMELINE_EVENT_LIMIT:
+                    st.caption(f"First {TIMELINE_EVENT_LIMIT:,} events in time order; "
+                               "narrow the range or pick a contact to see more.")
+
+                if contact is None:
+                    st.markdown("### Contacts in range")
+                    st.dataframe(timeline.contact_summary(start, end, top=200), use_container_width=True,
+                                 hide_index=True)
+
+mark_startup("Timeline tab")
 
 # ----------------------------
 # SMS & CALL LOG EXTRACTOR TAB
@@ -365,17 +819,12 @@ with extractor_tab:
     if connect_device_clicked:
         with st.spinner("Checking device connection..."):
             try:
-                # Check if ADB is available and device is connected
-                result = subprocess.run(
-                    ["adb", "devices"],
-                    capture_output=True, 
-                    text=True,
-                    timeout=10
-                )
+                # Check if ADB is available and device is connected (via the adb server socket when running)
+                adb_session = AdbSession(timeout=10)
                 
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')[1:]  # Skip header
-                    connected_devices = [line for line in lines if line.strip() and not line.endswith('offline')]
+                if adb_session.available():
+                    devices = adb_session.devices()
+                    connected_devices = [serial for serial, state in devices.items() if state != "offline"]
                     
                     if connected_devices:
                         st.success("Device connected successfully!")
@@ -384,14 +833,14 @@ with extractor_tab:
                         st.error("No devices found. Please check USB debugging is enabled.")
                         st.session_state.device_connected = False
                 else:
-                    st.error("ADB not available or device connection failed.")
+                    st.error("ADB not found. Please install Android SDK Platform Tools.")
                     st.session_state.device_connected = False
                     
-            except subprocess.TimeoutExpired:
+            except TimeoutError:
                 st.error("Connection check timed out.")
                 st.session_state.device_connected = False
-            except FileNotFoundError:
-                st.error("ADB not found. Please install Android SDK Platform Tools.")
+            except AdbError:
+                st.error("ADB not available or device connection failed.")
                 st.session_state.device_connected = False
             except Exception as e:
                 st.error(f"Connection error: {e}")
@@ -411,6 +860,13 @@ with extractor_tab:
         ["Call Logs Only", "SMS Logs Only"],
         key="extraction_selector"
     )
+    export_format = st.selectbox(
+        "Export format",
+        ["csv", "parquet", "arrow"],
+        key="export_format_selector",
+        help="Parquet/Arrow keep typed columns and load much faster in the analysers"
+    )
+    EXPORT_MIME = {"csv": "text/csv", "parquet": "application/octet-stream", "arrow": "application/octet-stream"}
 
     start_extraction_clicked = st.button("Start Extraction", use_container_width=True, key="start_extraction_btn")
 
@@ -418,74 +874,104 @@ with extractor_tab:
         if "device_connected" not in st.session_state or not st.session_state.device_connected:
             st.error("❌ Please connect device first using the 'Connect Device' button above.")
         else:
+            # Every job writes into its own folder under the session's outputs, so
+            # concurrent extractions never overwrite (or serve) each other's data
+            extraction_dir = os.path.join(
+                str(session_storage.areas["outputs"] / SESSION_ID), "extractions", uuid.uuid4().hex)
             if extraction_type == "Call Logs Only":
-                with st.spinner("📱 Extracting call logs from device..."):
-                    try:
-                        # Run the call.py script in background  
-                        result = subprocess.run(
-                            [sys.executable, "call_sms/scrapers/call.py"],
-                            capture_output=True, 
-                            text=True,
-                            timeout=60
-                        )
-                        
-                        if result.returncode == 0:
-                            st.success("✅ Extraction completed successfully!")
-                            if result.stdout:
-                                st.code(result.stdout)
-                            
-                            # Check if output file was created and provide download
-                            output_file = Path("call_exports/call_exports.csv")
-                            if output_file.exists():
-                                with open(output_file, "rb") as file:
-                                    st.download_button(
-                                        label="Download Call Logs",
-                                        data=file,
-                                        file_name="call_logs.csv",
-                                        mime="text/csv"
-                                    )
-                        else:
-                            st.error("❌ Extraction failed!")
-                            if result.stderr:
-                                st.error(f"Error: {result.stderr}")
-                                
-                    except subprocess.TimeoutExpired:
-                        st.error("❌ Extraction timed out. Please try again.")
-                    except Exception as e:
-                        st.error(f"❌ Extraction error: {e}")
-            
-            elif extraction_type == "SMS Logs Only":
-                with st.spinner("📱 Extracting SMS logs from device..."):
-                    try:
-                        # Run the sms.py script in background  
-                        result = subprocess.run(
-                            [sys.executable, "call_sms/scrapers/sms.py"],
-                            capture_output=True, 
-                            text=True,
-                            timeout=60
-                        )
-                        
-                        if result.returncode == 0:
-                            st.success("✅ SMS extraction completed successfully!")
-                            if result.stdout:
-                                st.code(result.stdout)
-                            
-                            # Check if output file was created and provide download
-                            output_file = Path("sms_exports/sms_export.csv")
-                            if output_file.exists():
-                                with open(output_file, "rb") as file:
-                                    st.download_button(
-                                        label="Download SMS Logs",
-                                        data=file,
-                                        file_name="sms_logs.csv",
-                                        mime="text/csv"
-                                    )
-                        else:
-                            st.error("❌ SMS extraction failed!")
-                            if result.stderr:
-                                st.error(f"Error: {result.stderr}")
-                                
-                    except subprocess.TimeoutExpired:
-                        st.error("❌ SMS extraction timed out. Please try again.")
-                    except Exception as e:
-                        st.error(f"❌ SMS extraction error: {e}")
\ No newline at end of file
+                extraction_cmd = [sys.executable, "call_sms/scrapers/call.py", "--format", export_format,
+                                  "--output-dir", extraction_dir]
+                extraction_outputs = {
+                    "file": os.path.join(extraction_dir, f"call_exports.{export_format}"),
+                    "output_dir": extraction_dir,
+                    "label": "Download Call Logs",
+                    "file_name": f"call_logs.{export_format}",
+                    "mime": EXPORT_MIME[export_format]
+                }
+            else:
+                extraction_cmd = [sys.executable, "call_sms/scrapers/sms.py", "--format", export_format,
+                                  "--output-dir", extraction_dir]
+                extraction_outputs = {
+                    "file": os.path.join(extraction_dir, f"sms_export.{export_format}"),
+                    "output_dir": extraction_dir,
+                    "label": "Download SMS Logs",
+                    "file_name": f"sms_logs.{export_format}",
+                    "mime": EXPORT_MIME[export_format]
+                }
+
+            try:
+                # Runs in the background job pool; no timeout, progress is polled below
+                job_id = get_job_runner().submit(
+                    kind="extraction",
+                    label=f"{extraction_type} ({export_format})",
+                    command=extraction_cmd,
+                    session_id=SESSION_ID,
+                    outputs=extraction_outputs
+                )
+                st.session_state.setdefault("extraction_jobs", []).insert(0, job_id)
+                st.toast("📱 Extraction started in the background.")
+            except Exception as e:
+                st.error(f"❌ Extraction error: {e}")
+
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def extraction_jobs_panel():
+        job_ids = st.session_state.get("extraction_jobs", [])
+        if not job_ids:
+            return
+        st.markdown("### Extraction Jobs")
+        for job_id in job_ids:
+            job = get_job_runner().get(job_id)
+            if job is None:
+                continue
+            render_job(job)
+            if job.status == DONE:
+                if Path(job.outputs["file"]).exists():
+                    display_download_button(
+                        job.outputs["file"],
+                        job.outputs["label"],
+                        job.outputs["file_name"],
+                        job.outputs["mime"],
+                        key=f"download_{job.id}"
+                    )
+                else:
+                    st.warning("Extraction finished but produced no output file.")
+            if job.is_finished:
+                render_trace(Path(job.outputs.get("output_dir") or Path(job.outputs["file"]).parent) / TRACE_FILENAME)
+
+    extraction_jobs_panel()
+
+mark_startup("Extractor tab")
+
+# ----------------------------
+# Background Jobs Overview
+# ----------------------------
+@st.fragment(run_every=JOB_POLL_SECONDS * 2)
+def jobs_sidebar():
+    with st.sidebar.expander("Background jobs", expanded=False):
+        show_all = st.checkbox("Include other sessions", key="jobs_show_all")
+        jobs = get_job_runner().list_jobs(None if show_all else SESSION_ID, limit=20)
+        if not jobs:
+            st.caption("No jobs yet.")
+        for job in jobs:
+            progress = "" if job.is_finished else f" {job.progress:.0%}"
+            st.text(f"{job.status:<10}{progress:>5} {job.label}")
+
+jobs_sidebar()
+
+# ----------------------------
+# Startup Debug Panel
+# ----------------------------
+if st.sidebar.checkbox("Show startup timings", key="debug_startup"):
+    total_ms = _startup_marks[-1][1] if _startup_marks else 0.0
+    with st.sidebar.expander("Startup budget", expanded=True):
+        previous = 0.0
+        for label, elapsed in _startup_marks:
+            st.text(f"{label:<24}{elapsed - previous:8.1f} ms")
+            previous = elapsed
+        st.text(f"{'total':<24}{total_ms:8.1f} ms / {STARTUP_BUDGET_MS} ms")
+        if total_ms > STARTUP_BUDGET_MS:
+            st.warning("Startup budget exceeded")
+        st.caption("Loaded heavy modules: " + ", ".join(
+            name for name in ("pandas", "matplotlib", "exiftool", "call_sms.analysers.sms")
+            if name in sys.modules
+        ))
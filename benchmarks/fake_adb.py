@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""A fake ``adb`` executable backed by synthetic SQLite databases.
+
+The scrapers shell out to ``adb``; pointing their ``adb_path`` at this
+script lets extraction be load-tested and benchmarked without a phone::
+
+    python -m benchmarks.fake_adb setup /tmp/device --calls 100000 --sms 100000
+    python call_sms/scrapers/call.py --adb-path /tmp/device/adb
+
+``setup`` writes a device folder: ``device.json`` (serial, root, latency,
+throughput), a fake filesystem under ``fs/`` holding ``calllog.db`` and
+``mmssms.db`` at their on-device paths, and an ``adb`` wrapper script that
+runs this file against that device.
+
+Supported commands (enough for the scrapers, and deliberately strict about
+quoting: shell arguments are joined with spaces and re-split like the
+device shell does):
+
+* ``version``, ``devices [-l]``, ``get-state``, ``-s SERIAL ...``
+* ``shell``/``exec-out`` running ``content query --uri URI [--projection
+  a:b] [--where CLAUSE] [--sort ORDER]``, ``su -c CMD``, ``id``, ``cat``,
+  ``cp``, ``rm``, ``echo`` and ``gzip -c``, optionally piped (``... | gzip -c``)
+  and sequenced with ``;`` (``$?`` expands to the previous exit code)
+* ``pull REMOTE LOCAL``
+
+Paths under ``/data`` are only readable through ``su`` on a rooted device.
+Every invocation sleeps ``latency_ms`` first and all output (including
+pulled files) is throttled to ``throughput_bps``.
+
+``serve DEVICE_DIR [--port 5037]`` instead runs a fake adb *server* that
+speaks the socket protocol used by ``call_sms.adb.SocketTransport``
+(``host:version``/``devices``/``features``, ``host:transport:SERIAL`` and
+the ``shell,v2,raw:``, ``shell:``, ``exec:`` and ``sync:`` services), with
+``latency_ms`` charged once per service request.
+"""
+
+import gzip
+import json
+import os
+import shlex
+import shutil
+import socketserver
+import sqlite3
+import stat
+import struct
+import sys
+import time
+from pathlib import Path
+
+DEVICE_ENV = "FAKE_ADB_DEVICE"
+WRITE_CHUNK = 64 * 1024
+
+TELEPHONY_DB = "/data/data/com.android.providers.telephony/databases/mmssms.db"
+CALLLOG_DB = "/data/data/com.android.providers.contacts/databases/calllog.db"
+# content URI -> (database path on the device, table, extra where clause)
+PROVIDERS = {
+    "content://call_log/calls": (CALLLOG_DB, "calls", None),
+    "content://sms": (TELEPHONY_DB, "sms", None),
+    "content://sms/inbox": (TELEPHONY_DB, "sms", "type = 1"),
+    "content://sms/sent": (TELEPHONY_DB, "sms", "type = 2"),
+}
+DEFAULT_SORT = "date DESC"
+
+CALLS_SCHEMA = """
+CREATE TABLE calls (
+    _id INTEGER PRIMARY KEY, number TEXT, date INTEGER, duration INTEGER, type INTEGER,
+    name TEXT, countryiso TEXT, presentation INTEGER, geocoded_location TEXT,
+    formatted_number TEXT, normalized_number TEXT
+)"""
+SMS_SCHEMA = """
+CREATE TABLE sms (
+    _id INTEGER PRIMARY KEY, thread_id INTEGER, address TEXT, body TEXT, date INTEGER,
+    date_sent INTEGER, read INTEGER, type INTEGER, status INTEGER DEFAULT -1,
+    locked INTEGER DEFAULT 0, sub_id INTEGER DEFAULT -1
+)"""
+
+
+class ShellError(Exception):
+    def __init__(self, message, returncode=1):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+class ThrottledWriter:
+    """Writes bytes no faster than ``bytes_per_second`` (unlimited when falsy)."""
+
+    def __init__(self, stream, bytes_per_second=None):
+        self.stream = stream
+        self.bytes_per_second = bytes_per_second
+        self.written = 0
+        self.start = time.monotonic()
+
+    def write(self, data: bytes) -> None:
+        for offset in range(0, len(data), WRITE_CHUNK):
+            chunk = data[offset:offset + WRITE_CHUNK]
+            self.stream.write(chunk)
+            self.written += len(chunk)
+            if self.bytes_per_second:
+                ahead = self.written / self.bytes_per_second - (time.monotonic() - self.start)
+                if ahead > 0:
+                    self.stream.flush()
+                    time.sleep(ahead)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class FakeDevice:
+    def __init__(self, config_path):
+        self.config_path = Path(config_path).resolve()
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.serial = config.get("serial", "FAKE0001")
+        self.state = config.get("state", "device")
+        self.root = bool(config.get("root", True))
+        self.latency = config.get("latency_ms", 0) / 1000
+        self.throughput = config.get("throughput_bps") or None
+        self.fs_root = self.config_path.parent / config.get("fs", "fs")
+
+    # -- filesystem ----------------------------------------------------------
+
+    def local_path(self, device_path: str, as_root: bool) -> Path:
+        if not device_path.startswith("/"):
+            device_path = "/sdcard/" + device_path
+        if device_path.startswith("/data") and not as_root:
+            raise ShellError(f"{device_path}: Permission denied")
+        path = (self.fs_root / device_path.lstrip("/")).resolve()
+        if self.fs_root.resolve() not in path.parents and path != self.fs_root.resolve():
+            raise ShellError(f"{device_path}: No such file or directory")
+        return path
+
+    # -- shell ---------------------------------------------------------------
+
+    @staticmethod
+    def _parse(command: str):
+        """Split a command line into ``;``-separated statements of ``|`` pipeline stages."""
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=";|")
+        lexer.whitespace_split = True
+        statements, stages, argv = [], [], []
+        try:
+            for token in lexer:
+                if token in (";", "|"):
+                    stages.append(argv)
+                    argv = []
+                    if token == ";":
+                        statements.append(stages)
+                        stages = []
+                else:
+                    argv.append(token)
+        except ValueError as exc:
+            raise ShellError(f"syntax error: {exc}", 2)
+        stages.append(argv)
+        statements.append(stages)
+        return [stages for stages in statements if any(stages)]
+
+    def run_shell(self, command: str, out: ThrottledWriter, as_root=False, err=None) -> int:
+        statements = self._parse(command)
+        code = 0
+        for index, stages in enumerate(statements):
+            stages = [[arg.replace("$?", str(code)) for arg in argv] for argv in stages]
+            try:
+                code = self._run_pipeline(stages, out, as_root, err)
+            except ShellError as exc:
+                # The last statement's error is the command's error; earlier ones only print
+                if index == len(statements) - 1:
+                    raise
+                if err is not None:
+                    err.write(f"{exc}\n".encode())
+                code = exc.returncode
+        return code
+
+    def _run_pipeline(self, stages, out, as_root, err) -> int:
+        if len(stages) == 1:
+            return self._run(stages[0], out, as_root, err)
+
+        # Pipelines: only gzip/cat filters are supported after the first command
+        buffer = _Buffer()
+        code = self._run(stages[0], buffer, as_root, err)
+        data = buffer.getvalue()
+        for argv in stages[1:]:
+            if argv[:1] == ["gzip"]:
+                data = gzip.compress(data, compresslevel=6)
+            elif argv != ["cat"]:
+                raise ShellError(f"/system/bin/sh: {argv[0] if argv else ''}: inaccessible or not found", 127)
+        out.write(data)
+        return code
+
+    def _run(self, argv, out, as_root, err=None) -> int:
+        if not argv:
+            return 0
+        name, args = argv[0], argv[1:]
+
+        if name == "su":
+            if not self.root:
+                raise ShellError("/system/bin/sh: su: inaccessible or not found", 127)
+            if args[:1] == ["-c"]:
+                # A single argument is the command line itself (su -c 'cmd args'), otherwise join the words
+                command = args[1] if len(args) == 2 else " ".join(shlex.quote(a) for a in args[1:])
+                return self.run_shell(command, out, as_root=True, err=err)
+            return 0
+        if name == "echo":
+            out.write((" ".join(args) + "\n").encode("utf-8"))
+            return 0
+        if name == "id":
+            out.write(b"uid=0(root) gid=0(root) groups=0(root)\n" if as_root
+                      else b"uid=2000(shell) gid=2000(shell) groups=2000(shell)\n")
+            return 0
+        if name == "content":
+            return self._content(args, out)
+        if name == "cat":
+            for device_path in args:
+                self._copy_out(self.local_path(device_path, as_root), out, device_path)
+            return 0
+        if name == "gzip":
+            files = [a for a in args if not a.startswith("-")]
+            if "-c" not in args or len(files) != 1:
+                raise ShellError("gzip: only 'gzip -c FILE' is supported")
+            path = self.local_path(files[0], as_root)
+            if not path.is_file():
+                raise ShellError(f"gzip: {files[0]}: No such file or directory")
+            with open(path, "rb") as f:
+                out.write(gzip.compress(f.read(), compresslevel=6))
+            return 0
+        if name == "cp":
+            if len(args) != 2:
+                raise ShellError("cp: need SOURCE and DEST")
+            src = self.local_path(args[0], as_root)
+            if not src.is_file():
+                raise ShellError(f"cp: {args[0]}: No such file or directory")
+            dest = self.local_path(args[1], as_root)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, dest)
+            return 0
+        if name == "rm":
+            for device_path in (a for a in args if not a.startswith("-")):
+                path = self.local_path(device_path, as_root)
+                if path.is_file():
+                    path.unlink()
+                elif "-f" not in args:
+                    raise ShellError(f"rm: {device_path}: No such file or directory")
+            return 0
+        raise ShellError(f"/system/bin/sh: {name}: inaccessible or not found", 127)
+
+    def _copy_out(self, path: Path, out, device_path: str) -> None:
+        if not path.is_file():
+            raise ShellError(f"cat: {device_path}: No such file or directory")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(WRITE_CHUNK), b""):
+                out.write(chunk)
+
+    def _content(self, args, out) -> int:
+        if args[:1] != ["query"]:
+            raise ShellError("content: only 'query' is supported")
+        options = {}
+        it = iter(args[1:])
+        for flag in it:
+            if flag not in ("--uri", "--projection", "--where", "--sort", "--user"):
+                raise ShellError(f"Unsupported argument: {flag}")
+            try:
+                options[flag] = next(it)
+            except StopIteration:
+                raise ShellError(f"Argument expected after \"{flag}\"")
+        uri = options.get("--uri")
+        if uri not in PROVIDERS:
+            raise ShellError(f"Error while accessing provider:{uri}")
+        db_path, table, implicit_where = PROVIDERS[uri]
+
+        conn = sqlite3.connect(f"file:{self.local_path(db_path, True)}?mode=ro", uri=True)
+        try:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            projection = columns
+            if "--projection" in options:
+                projection = [c for c in options["--projection"].replace(",", ":").split(":") if c]
+                unknown = [c for c in projection if c not in columns]
+                if unknown:
+                    raise ShellError(f"Error while accessing provider:{uri}\n"
+                                     f"java.lang.IllegalArgumentException: Invalid column {unknown[0]}")
+            where = [w for w in (implicit_where, options.get("--where")) if w]
+            sql = f"SELECT {', '.join(projection)} FROM {table}"
+            if where:
+                sql += " WHERE " + " AND ".join(f"({w})" for w in where)
+            sql += f" ORDER BY {options.get('--sort', DEFAULT_SORT)}"
+            try:
+                cursor = conn.execute(sql)
+            except sqlite3.Error as exc:
+                raise ShellError(f"Error while accessing provider:{uri}\nandroid.database.sqlite.SQLiteException: {exc}")
+
+            count = 0
+            for count, row in enumerate(cursor, 1):
+                fields = ", ".join(f"{c}={'NULL' if v is None else v}" for c, v in zip(projection, row))
+                out.write(f"Row: {count - 1} {fields}\n".encode("utf-8"))
+            if count == 0:
+                out.write(b"No result found.\n")
+        finally:
+            conn.close()
+        return 0
+
+
+class _Buffer:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data: bytes) -> None:
+        self.parts.append(data)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+
+# --------------------------------------------------------------------------- #
+#  adb command line                                                           #
+# --------------------------------------------------------------------------- #
+
+def adb_main(device: FakeDevice, argv) -> int:
+    out = ThrottledWriter(sys.stdout.buffer, device.throughput)
+    err = sys.stderr
+
+    serial = None
+    while argv and argv[0] in ("-s", "-d", "-e"):
+        if argv[0] == "-s":
+            serial, argv = argv[1], argv[2:]
+        else:
+            argv = argv[1:]
+    if not argv:
+        err.write("adb: usage: no command specified\n")
+        return 1
+
+    command, args = argv[0], argv[1:]
+    if command == "version":
+        out.write(b"Android Debug Bridge version 1.0.41\nVersion 34.0.5-fake\n")
+        return 0
+    if command == "devices":
+        suffix = " product:fake model:Fake_Device device:fake" if "-l" in args else ""
+        out.write(f"List of devices attached\n{device.serial}\t{device.state}{suffix}\n\n".encode())
+        return 0
+    if command == "start-server":
+        return 0
+
+    if serial is not None and serial != device.serial:
+        err.write(f"adb: device '{serial}' not found\n")
+        return 1
+    if command == "get-state":
+        out.write(f"{device.state}\n".encode())
+        return 0 if device.state == "device" else 1
+    if device.state != "device":
+        err.write(f"adb: device {device.state}\n")
+        return 1
+
+    try:
+        if command in ("shell", "exec-out"):
+            code = device.run_shell(" ".join(args), out, err=sys.stderr.buffer)
+        elif command == "pull":
+            if len(args) != 2:
+                raise ShellError("adb: usage: adb pull REMOTE LOCAL")
+            start = time.monotonic()
+            source = device.local_path(args[0], as_root=False)
+            if not source.is_file():
+                raise ShellError(f"adb: error: failed to stat remote object '{args[0]}': No such file or directory")
+            local = Path(args[1])
+            if local.is_dir():
+                local = local / source.name
+            with open(local, "wb") as f:
+                writer = ThrottledWriter(f, device.throughput)
+                device._copy_out(source, writer, args[0])
+            elapsed = max(time.monotonic() - start, 1e-6)
+            size = writer.written
+            out.write(f"{args[0]}: 1 file pulled, 0 skipped. {size / elapsed / 1e6:.1f} MB/s "
+                      f"({size} bytes in {elapsed:.3f}s)\n".encode())
+            code = 0
+        else:
+            err.write(f"adb: unknown command {command}\n")
+            return 1
+    except ShellError as exc:
+        out.flush()
+        err.write(f"{exc}\n")
+        return exc.returncode
+    out.flush()
+    return code
+
+
+# --------------------------------------------------------------------------- #
+#  adb server socket protocol                                                 #
+# --------------------------------------------------------------------------- #
+
+class _SocketStream:
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data: bytes) -> None:
+        self.sock.sendall(data)
+
+    def flush(self) -> None:
+        pass
+
+
+class _ShellV2Stream:
+    """Frames written bytes as shell protocol v2 stdout (1) or stderr (2) packets."""
+
+    def __init__(self, sock, packet_id=1):
+        self.sock = sock
+        self.packet_id = packet_id
+
+    def write(self, data: bytes) -> None:
+        self.sock.sendall(bytes([self.packet_id]) + struct.pack("<I", len(data)) + data)
+
+    def flush(self) -> None:
+        pass
+
+
+class AdbServerHandler(socketserver.BaseRequestHandler):
+    device: FakeDevice = None
+
+    def _read_exact(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _read_request(self):
+        length = int(self._read_exact(4), 16)
+        return self._read_exact(length).decode("utf-8")
+
+    def _okay(self, payload=None):
+        self.request.sendall(b"OKAY")
+        if payload is not None:
+            data = payload.encode("utf-8")
+            self.request.sendall(b"%04x" % len(data) + data)
+
+    def _fail(self, message):
+        data = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + b"%04x" % len(data) + data)
+
+    def handle(self):
+        device = self.device
+        try:
+            service = self._read_request()
+            if service == "host:version":
+                return self._okay("0029")
+            if service in ("host:devices", "host:devices-l"):
+                return self._okay(f"{device.serial}\t{device.state}\n")
+            if service == "host:features" or service.startswith("host-serial:"):
+                return self._okay("shell_v2,cmd,stat_v2")
+            if service.startswith("host:transport:"):
+                if service.split(":", 2)[2] != device.serial:
+                    return self._fail(f"device '{service.split(':', 2)[2]}' not found")
+            elif service != "host:transport-any":
+                return self._fail(f"unknown host service {service}")
+            if device.state != "device":
+                return self._fail(f"device {device.state}")
+            self._okay()
+
+            service = self._read_request()
+            if device.latency:
+                time.sleep(device.latency)
+            if service.startswith("shell,v2,raw:"):
+                self._okay()
+                self._shell_v2(service.split(":", 1)[1])
+            elif service.startswith("shell:") or service.startswith("exec:"):
+                self._okay()
+                out = ThrottledWriter(_SocketStream(self.request), device.throughput)
+                try:
+                    device.run_shell(service.split(":", 1)[1], out, err=out)
+                except ShellError as exc:
+                    out.write(f"{exc}\n".encode())
+            elif service == "sync:":
+                self._okay()
+                self._sync()
+            else:
+                self._fail(f"unknown service {service}")
+        except (ConnectionError, ValueError):
+            pass
+
+    def _shell_v2(self, command):
+        out = ThrottledWriter(_ShellV2Stream(self.request), self.device.throughput)
+        try:
+            code = self.device.run_shell(command, out, err=_ShellV2Stream(self.request, 2))
+        except ShellError as exc:
+            message = f"{exc}\n".encode()
+            self.request.sendall(bytes([2]) + struct.pack("<I", len(message)) + message)
+            code = exc.returncode
+        self.request.sendall(bytes([3]) + struct.pack("<I", 1) + bytes([code & 0xFF]))
+
+    def _sync(self):
+        while True:
+            header = self._read_exact(8)
+            kind, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if kind == b"QUIT":
+                return
+            path = self._read_exact(length).decode("utf-8")
+            if kind != b"RECV":
+                return self._sync_fail(f"unsupported sync request {kind!r}")
+            try:
+                source = self.device.local_path(path, as_root=False)
+            except ShellError as exc:
+                self._sync_fail(str(exc))
+                continue
+            if not source.is_file():
+                self._sync_fail(f"remote object '{path}' does not exist")
+                continue
+            out = ThrottledWriter(_SocketStream(self.request), self.device.throughput)
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(WRITE_CHUNK), b""):
+                    out.write(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            self.request.sendall(b"DONE" + struct.pack("<I", int(source.stat().st_mtime)))
+
+    def _sync_fail(self, message):
+        data = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + struct.pack("<I", len(data)) + data)
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(device_config, host="127.0.0.1", port=5037):
+    """Create (but do not start) a fake adb server for ``device_config``."""
+    handler = type("Handler", (AdbServerHandler,), {"device": FakeDevice(device_config)})
+    return FakeAdbServer((host, port), handler)
+
+
+# --------------------------------------------------------------------------- #
+#  Device setup                                                               #
+# --------------------------------------------------------------------------- #
+
+def create_databases(fs_root, calls, sms, seed):
+    """Fill calllog.db/mmssms.db with generator data (imports pandas/numpy lazily)."""
+    repo_root = Path(__file__).resolve().parents[1]
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    from benchmarks import generators
+
+    call_columns = ["_id", "number", "date", "duration", "type", "name", "countryiso", "presentation",
+                    "geocoded_location", "formatted_number", "normalized_number"]
+    sms_columns = ["_id", "thread_id", "address", "body", "date", "date_sent", "read", "type", "status"]
+
+    for device_path, schema, table, rows, frames, columns in (
+        (CALLLOG_DB, CALLS_SCHEMA, "calls", calls, generators.call_frame, call_columns),
+        (TELEPHONY_DB, SMS_SCHEMA, "sms", sms, generators.sms_frame, sms_columns),
+    ):
+        path = Path(fs_root) / device_path.lstrip("/")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()
+        conn = sqlite3.connect(path)
+        conn.execute(schema)
+        pool = generators.call_number_pool(rows, seed) if table == "calls" else generators.sms_sender_pool(rows, seed)
+        for start, size in generators._chunks(rows):
+            frame = frames(size, seed, start, pool)[columns]
+            frame = frame.astype(object).where(frame.notna(), None)
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                frame.itertuples(index=False, name=None)
+            )
+        conn.execute(f"CREATE INDEX {table}_date ON {table}(date)")
+        conn.commit()
+        conn.close()
+
+
+def setup_device(device_dir, calls=10_000, sms=10_000, seed=42, root=True,
+                 latency_ms=0, throughput_bps=None, serial="FAKE0001"):
+    """Create a fake device folder and return the path of its ``adb`` wrapper."""
+    device_dir = Path(device_dir).resolve()
+    device_dir.mkdir(parents=True, exist_ok=True)
+    (device_dir / "fs" / "sdcard").mkdir(parents=True, exist_ok=True)
+    create_databases(device_dir / "fs", calls, sms, seed)
+
+    config = {"serial": serial, "state": "device", "root": root, "latency_ms": latency_ms,
+              "throughput_bps": throughput_bps, "fs": "fs"}
+    with open(device_dir / "device.json", "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    wrapper = device_dir / "adb"
+    wrapper.write_text(
+        "#!/bin/sh\n"
+        f"exec {shlex.quote(sys.executable)} {shlex.quote(str(Path(__file__).resolve()))} "
+        f"--device {shlex.quote(str(device_dir / 'device.json'))} \"$@\"\n"
+    )
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return wrapper
+
+
+def _parse_size(text):
+    units = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    if argv[:1] == ["setup"]:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="fake_adb setup", description="Create a fake ADB device")
+        parser.add_argument("device_dir")
+        parser.add_argument("--calls", type=int, default=10_000)
+        parser.add_argument("--sms", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--no-root", action="store_true", help="Device without su")
+        parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every adb invocation")
+        parser.add_argument("--throughput", default=None,
+                            help="Output/pull limit in bytes per second, e.g. 500k or 20m")
+        parser.add_argument("--serial", default="FAKE0001")
+        args = parser.parse_args(argv[1:])
+        wrapper = setup_device(
+            args.device_dir, args.calls, args.sms, args.seed, not args.no_root,
+            args.latency_ms, _parse_size(args.throughput) if args.throughput else None, args.serial
+        )
+        print(wrapper)
+        return 0
+
+    if argv[:1] == ["serve"]:
+        import argparse
+
+        parser = argparse.ArgumentParser(prog="fake_adb serve", description="Run a fake adb server")
+        parser.add_argument("device_dir")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=5037)
+        args = parser.parse_args(argv[1:])
+        server = serve(Path(args.device_dir) / "device.json", args.host, args.port)
+        print(f"fake adb server listening on {args.host}:{server.server_address[1]}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    config = os.environ.get(DEVICE_ENV)
+    if argv[:1] == ["--device"]:
+        config, argv = argv[1], argv[2:]
+    if not config:
+        sys.stderr.write(f"fake adb: pass --device DEVICE_JSON or set {DEVICE_ENV}\n")
+        return 1
+
+    device = FakeDevice(config)
+    if device.latency:
+        time.sleep(device.latency)
+    return adb_main(device, argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
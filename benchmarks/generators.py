@@ -0,0 +1,484 @@
+"""Seeded synthetic data for the benchmarks.
+
+Everything here is deterministic for a given ``seed`` and row count, so two
+benchmark runs (or two machines) time exactly the same input.  The shapes
+follow what the scrapers produce:
+
+* call logs look like a ``content://call_log/calls`` export (epoch-ms dates,
+  ``presentation``/``countryiso`` columns, sorted keys as written by
+  ``scrapers/call.py``).  Callers follow a Zipf distribution, a few percent
+  are foreign, and a small set of sequential "neighbour spoofing" numbers
+  place bursts of short calls at night;
+* SMS exports match ``scrapers/sms.py`` CSV output (formatted dates,
+  ``read`` as Yes/No, ``type`` as text) with skewed senders, OTP/bank/promo
+  traffic, phishing links and sender bursts;
+* ``*_query_lines`` render the same records as raw ``adb shell content
+  query`` output for the scraper parsers;
+* EXIF data is available both as exiftool-style JSON (``-G -n`` keys, as
+  EXIF_E.ipynb writes it) and as real JPEG files with EXIF and GPS IFDs.
+
+Large outputs are produced in chunks so 10M-row files never sit in memory.
+"""
+
+import base64
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 500_000
+START_MS = 1_704_067_200_000  # 2024-01-01 00:00:00 UTC
+SPAN_MS = 180 * 24 * 3600 * 1000
+
+CALL_COLUMNS = ["_id", "_row_id", "countryiso", "date", "duration", "formatted_number",
+                "geocoded_location", "name", "normalized_number", "number", "presentation", "type"]
+SMS_COLUMNS = ["id", "thread_id", "address", "body", "date", "date_sent", "read", "type", "status"]
+
+FOREIGN_PREFIXES = [
+    ("+44", "GB", "United Kingdom"),
+    ("+1", "US", "United States"),
+    ("+234", "NG", "Nigeria"),
+    ("+92", "PK", "Pakistan"),
+    ("+880", "BD", "Bangladesh"),
+    ("+971", "AE", "United Arab Emirates"),
+    ("+63", "PH", "Philippines"),
+]
+CONTACT_NAMES = ["Amit", "Priya", "Rahul", "Neha", "Mom", "Dad", "Office", "Ravi", "Sneha", "Karan"]
+
+# Android CallLog.Calls.TYPE: 1 incoming, 2 outgoing, 3 missed, 5 rejected, 6 blocked
+CALL_TYPES = np.array([1, 2, 3, 5, 6])
+CALL_TYPE_WEIGHTS = np.array([0.45, 0.35, 0.12, 0.05, 0.03])
+# Rough diurnal profile: quiet nights, busy late mornings and evenings
+HOUR_WEIGHTS = np.array([1, 0.5, 0.3, 0.3, 0.3, 0.6, 1.5, 3, 5, 6, 7, 7,
+                         6, 6, 6, 6, 6, 7, 8, 8, 7, 5, 3, 2], dtype=float)
+
+SMS_SENDERS = ["VM-HDFCBK", "AD-ICICIB", "JD-AMAZON", "VK-FLPKRT", "BZ-SWIGGY", "AX-AIRTEL",
+               "TM-PAYTM", "VM-SBIINB", "JM-ZOMATO", "AD-JIOINF"]
+SMS_TEMPLATES = {
+    "otp": [
+        "{n} is your OTP for login. Do not share it with anyone.",
+        "Your verification code is {n}. Valid for 10 minutes.",
+    ],
+    "bank": [
+        "Rs.{amt} debited from A/c XX{n4} on {day}. Avl bal Rs.{bal}.",
+        "Rs.{amt} credited to A/c XX{n4}. Info: UPI/{n}.",
+        "Dear customer, your bank statement for XX{n4} is ready at https://www.{bank}.com/stmt",
+    ],
+    "promo": [
+        "Big sale! Flat {pct}% off today only. Shop now https://www.{shop}.com/deals",
+        "Win a prize worth Rs.{amt}! Offer ends tonight.",
+        "Recharge with Rs.{amt} and get {pct}GB extra data.",
+    ],
+    "phishing": [
+        "Your KYC is pending. Update now or your account will be blocked: http://{bad}/{n4}",
+        "Rs.{amt} sent to your wallet. Claim here http://{bad}/r{n}",
+        "URGENT: your bank account is suspended. Verify at https://{bad}/login",
+    ],
+    "personal": [
+        "Hey, are we still on for {day}?",
+        "Call me when you are free",
+        "Reached home, talk later",
+        "Happy birthday! Have a great day",
+    ],
+}
+SMS_KIND_WEIGHTS = {"otp": 0.2, "bank": 0.25, "promo": 0.25, "phishing": 0.05, "personal": 0.25}
+BANKS = ["hdfcbank", "icicibank", "onlinesbi", "axisbank"]
+SHOPS = ["amazon", "flipkart", "myntra", "swiggy"]
+BAD_DOMAINS = ["bit.ly", "tinyurl.com", "kyc-update.xyz", "secure-bank-verify.top", "rewards-claim.info"]
+
+# Config for the SMS analyser when benchmarking (the real sms_config.json is site-specific)
+BENCH_SMS_CONFIG = {
+    "keywords_to_search": ["otp", "bank", "prize", "kyc", "urgent", "verify"],
+    "categories": {
+        "Banking": ["bank", "debited", "credited", "a/c"],
+        "OTP": ["otp", "verification code"],
+        "Promo": ["sale", "win", "prize", "offer", "recharge"],
+    },
+    "suspicious_domains": ["bit.ly", "tinyurl.com", ".xyz", ".top", ".info"],
+}
+
+# 8x8 grey baseline JPEG; the EXIF segment is spliced in after SOI
+_BASE_JPEG = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDABsSFBcUERsXFhceHBsgKEIrKCUlKFE6PTBCYFVlZF9VXVtq"
+    "eJmBanGQc1tdhbWGkJ6jq62rZ4C8ybqmx5moq6T/2wBDARweHigjKE4rK06kbl1upKSkpKSkpKSkpKSk"
+    "pKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKSkpKT/wAARCAAIAAgDASIAAhEBAxEB/8QA"
+    "HwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIh"
+    "MUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVW"
+    "V1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXG"
+    "x8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQF"
+    "BgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAV"
+    "YnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOE"
+    "hYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq"
+    "8vP09fb3+Pn6/9oADAMBAAIRAxEAPwAoooqiT//Z"
+)
+CAMERAS = [("samsung", "SM-G991B"), ("Google", "Pixel 7"), ("Apple", "iPhone 13"),
+           ("motorola", "moto g54 5G"), ("Xiaomi", "Redmi Note 12")]
+EDITORS = ["", "", "", "", "Adobe Photoshop 24.1", "Snapseed 2.0", "GIMP 2.10"]
+# Cities the GPS fixes cluster around (lat, lon)
+GPS_CENTERS = [(28.6139, 77.2090), (19.0760, 72.8777), (12.9716, 77.5946),
+               (51.5074, -0.1278), (40.7128, -74.0060)]
+
+
+def _chunks(rows, chunk_rows=CHUNK_ROWS):
+    for start in range(0, rows, chunk_rows):
+        yield start, min(chunk_rows, rows - start)
+
+
+def _zipf_index(rng, size, pool, exponent=0.9):
+    """Zipf-like indexes into a pool: a few entries dominate, with a long tail."""
+    weights = 1.0 / np.arange(1, pool + 1) ** exponent
+    return rng.choice(pool, size, p=weights / weights.sum())
+
+
+def _timestamps(rng, size):
+    """Epoch-ms times spread over SPAN_MS, following HOUR_WEIGHTS within a day."""
+    days = rng.integers(0, SPAN_MS // 86_400_000, size)
+    hours = rng.choice(24, size, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    within = rng.integers(0, 3_600_000, size)
+    return START_MS + days * 86_400_000 + hours * 3_600_000 + within
+
+
+def _date_strings(ms):
+    # UTC rather than local time so files are identical on every machine
+    return pd.to_datetime(ms, unit="ms").dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# --------------------------------------------------------------------------- #
+#  Call logs                                                                  #
+# --------------------------------------------------------------------------- #
+
+def call_number_pool(rows, seed=0):
+    """Numbers, ISO codes, locations and contact names callers are drawn from."""
+    rng = np.random.default_rng(seed)
+    size = max(200, rows // 40)
+    n_foreign = max(5, size // 20)
+    n_spoof = max(5, size // 50)
+    n_domestic = size - n_foreign - n_spoof
+
+    numbers, iso, location, names = [], [], [], []
+    for value in rng.integers(6_000_000_000, 9_999_999_999, n_domestic):
+        numbers.append(f"+91{value}")
+        iso.append("IN")
+        location.append("India")
+        names.append(CONTACT_NAMES[value % len(CONTACT_NAMES)] if value % 3 == 0 else "")
+    for i, value in enumerate(rng.integers(100_000_000, 999_999_999, n_foreign)):
+        prefix, code, country = FOREIGN_PREFIXES[i % len(FOREIGN_PREFIXES)]
+        numbers.append(f"{prefix}{value}")
+        iso.append(code)
+        location.append(country)
+        names.append("")
+    # Neighbour spoofing: consecutive numbers sharing the victim's prefix
+    base = int(rng.integers(7_000_000_000, 9_999_000_000))
+    for i in range(n_spoof):
+        numbers.append(f"+91{base + i}")
+        iso.append("IN")
+        location.append("India")
+        names.append("")
+
+    order = rng.permutation(n_domestic + n_foreign)
+    # Spoof numbers stay at the tail so they only show up through bursts
+    keep = np.concatenate([order, np.arange(n_domestic + n_foreign, size)])
+    pick = lambda values: np.array(values, dtype=object)[keep]
+    return {
+        "number": pick(numbers), "countryiso": pick(iso), "geocoded_location": pick(location),
+        "name": pick(names), "regular": n_domestic + n_foreign, "spoof": n_spoof,
+    }
+
+
+def call_frame(rows, seed=0, start_id=0, pool=None):
+    """One chunk of a call-log export as a DataFrame (raw values, epoch-ms dates)."""
+    rng = np.random.default_rng([seed, start_id])
+    pool = pool or call_number_pool(rows, seed)
+
+    burst_rows = rows // 50
+    regular_rows = rows - burst_rows
+    caller = _zipf_index(rng, regular_rows, pool["regular"])
+    dates = _timestamps(rng, regular_rows)
+
+    # Night bursts: a spoof number rings 5-20 times within a few minutes after midnight
+    burst_caller, burst_dates = [], []
+    remaining = burst_rows
+    while remaining > 0:
+        size = int(min(remaining, rng.integers(5, 21)))
+        center = START_MS + int(rng.integers(0, SPAN_MS // 86_400_000)) * 86_400_000 \
+            + int(rng.integers(0, 5)) * 3_600_000
+        burst_caller.append(np.full(size, pool["regular"] + rng.integers(0, pool["spoof"])))
+        burst_dates.append(center + np.sort(rng.integers(0, 300_000, size)))
+        remaining -= size
+    if burst_caller:
+        caller = np.concatenate([caller, *burst_caller])
+        dates = np.concatenate([dates, *burst_dates])
+
+    call_type = rng.choice(CALL_TYPES, rows, p=CALL_TYPE_WEIGHTS)
+    duration = np.clip(rng.lognormal(4.0, 1.3, rows), 1, 4 * 3600).astype(np.int64)
+    duration[np.isin(call_type, [3, 5, 6])] = 0
+    duration[regular_rows:] = rng.integers(0, 6, burst_rows)
+    presentation = rng.choice([1, 2, 3], rows, p=[0.97, 0.02, 0.01])
+
+    numbers = pool["number"][caller]
+    frame = pd.DataFrame({
+        "_id": np.arange(start_id + 1, start_id + rows + 1),
+        "_row_id": np.arange(start_id, start_id + rows),
+        "countryiso": pool["countryiso"][caller],
+        "date": dates,
+        "duration": duration,
+        "formatted_number": numbers,
+        "geocoded_location": pool["geocoded_location"][caller],
+        "name": pool["name"][caller],
+        "normalized_number": numbers,
+        "number": numbers,
+        "presentation": presentation,
+        "type": call_type,
+    })
+    frame["name"] = frame["name"].replace("", None)
+    return frame.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def write_calls_csv(path, rows, seed=0):
+    pool = call_number_pool(rows, seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for start, size in _chunks(rows):
+            call_frame(size, seed, start, pool).to_csv(f, index=False, header=start == 0)
+    return Path(path)
+
+
+def call_query_lines(rows, seed=0):
+    """The same call records as ``adb shell content query`` output lines."""
+    pool = call_number_pool(rows, seed)
+    lines = []
+    for start, size in _chunks(rows):
+        frame = call_frame(size, seed, start, pool).drop(columns=["_row_id"]).fillna("NULL")
+        records = frame.astype(str).to_dict("records")
+        for i, record in enumerate(records, start):
+            lines.append(f"Row: {i} " + ", ".join(f"{k}={v}" for k, v in record.items()))
+    return lines
+
+
+# --------------------------------------------------------------------------- #
+#  SMS                                                                        #
+# --------------------------------------------------------------------------- #
+
+def sms_sender_pool(rows, seed=0):
+    rng = np.random.default_rng([seed, 1])
+    size = max(100, rows // 100)
+    phones = [f"+91{value}" for value in rng.integers(6_000_000_000, 9_999_999_999, size - len(SMS_SENDERS))]
+    return np.array(SMS_SENDERS + phones, dtype=object)
+
+
+def _sms_body(rng, kind):
+    template = SMS_TEMPLATES[kind][int(rng.integers(0, len(SMS_TEMPLATES[kind])))]
+    return template.format(
+        n=int(rng.integers(100000, 999999)), n4=int(rng.integers(1000, 9999)),
+        amt=int(rng.integers(10, 50000)), bal=int(rng.integers(100, 500000)),
+        pct=int(rng.integers(5, 80)), day=["Monday", "Friday", "Sunday"][int(rng.integers(0, 3))],
+        bank=BANKS[int(rng.integers(0, len(BANKS)))], shop=SHOPS[int(rng.integers(0, len(SHOPS)))],
+        bad=BAD_DOMAINS[int(rng.integers(0, len(BAD_DOMAINS)))]
+    )
+
+
+def sms_frame(rows, seed=0, start_id=0, senders=None):
+    """Raw SMS records (epoch-ms dates, numeric read/type) for one chunk."""
+    rng = np.random.default_rng([seed, 2, start_id])
+    senders = senders if senders is not None else sms_sender_pool(rows, seed)
+
+    # Pre-render a bank of bodies and sample from it; formatting 10M strings one by one is slow
+    kinds = list(SMS_KIND_WEIGHTS)
+    weights = np.array([SMS_KIND_WEIGHTS[k] for k in kinds])
+    bank_size = min(rows, 20_000)
+    bank_kinds = rng.choice(len(kinds), bank_size, p=weights / weights.sum())
+    body_bank = np.array([_sms_body(rng, kinds[k]) for k in bank_kinds], dtype=object)
+
+    burst_rows = rows // 40
+    regular_rows = rows - burst_rows
+    sender = _zipf_index(rng, regular_rows, len(senders))
+    dates = _timestamps(rng, regular_rows)
+    burst_sender, burst_dates = [], []
+    remaining = burst_rows
+    while remaining > 0:
+        size = int(min(remaining, rng.integers(6, 30)))
+        burst_sender.append(np.full(size, rng.integers(len(SMS_SENDERS), len(senders))))
+        burst_dates.append(int(_timestamps(rng, 1)[0]) + np.sort(rng.integers(0, 600_000, size)))
+        remaining -= size
+    if burst_sender:
+        sender = np.concatenate([sender, *burst_sender])
+        dates = np.concatenate([dates, *burst_dates])
+
+    body = body_bank[rng.integers(0, bank_size, rows)]
+    msg_type = rng.choice([1, 2], rows, p=[0.85, 0.15])
+    return pd.DataFrame({
+        "_id": np.arange(start_id + 1, start_id + rows + 1),
+        "thread_id": (sender % 5000) + 1,
+        "address": senders[sender],
+        "body": body,
+        "date": dates,
+        "date_sent": np.where(msg_type == 1, dates - rng.integers(500, 20_000, rows), 0),
+        "read": rng.choice([0, 1], rows, p=[0.2, 0.8]),
+        "type": msg_type,
+        "status": -1,
+    }).sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def write_sms_csv(path, rows, seed=0):
+    """An SMS export laid out like ``scrapers/sms.py`` CSV output."""
+    senders = sms_sender_pool(rows, seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for start, size in _chunks(rows):
+            raw = sms_frame(size, seed, start, senders)
+            frame = pd.DataFrame({
+                "id": raw["_id"],
+                "thread_id": raw["thread_id"],
+                "address": raw["address"],
+                "body": raw["body"],
+                "date": _date_strings(raw["date"]),
+                "date_sent": _date_strings(raw["date_sent"]),
+                "read": np.where(raw["read"] == 1, "Yes", "No"),
+                "type": np.where(raw["type"] == 1, "Received", "Sent"),
+                "status": raw["status"],
+            })
+            frame.to_csv(f, index=False, header=start == 0)
+    return Path(path)
+
+
+def sms_query_lines(rows, seed=0):
+    """The same messages as ``adb shell content query --uri content://sms`` output."""
+    senders = sms_sender_pool(rows, seed)
+    lines = []
+    for start, size in _chunks(rows):
+        records = sms_frame(size, seed, start, senders).astype(str).to_dict("records")
+        for i, record in enumerate(records, start):
+            lines.append(f"Row: {i} " + ", ".join(f"{k}={v}" for k, v in record.items()))
+    return lines
+
+
+# --------------------------------------------------------------------------- #
+#  EXIF                                                                       #
+# --------------------------------------------------------------------------- #
+
+def _exif_fields(rng, index):
+    """Metadata for one synthetic photo; None values are left out of the file."""
+    make, model = CAMERAS[int(rng.integers(0, len(CAMERAS)))]
+    taken_ms = int(_timestamps(rng, 1)[0])
+    taken = pd.Timestamp(taken_ms, unit="ms").strftime("%Y:%m:%d %H:%M:%S")
+    software = EDITORS[int(rng.integers(0, len(EDITORS)))]
+    # Edited photos usually get a later ModifyDate
+    modified = pd.Timestamp(taken_ms + (86_400_000 if software else 0), unit="ms").strftime("%Y:%m:%d %H:%M:%S")
+    fields = {
+        "make": make, "model": model, "software": software or None,
+        "taken": taken, "modified": modified, "subsec": f"{index % 1000:03d}",
+        "serial": f"SN{int(rng.integers(10**7, 10**8))}" if rng.random() < 0.3 else None,
+        "gps": None,
+    }
+    if rng.random() < 0.7:
+        lat0, lon0 = GPS_CENTERS[int(rng.integers(0, len(GPS_CENTERS)))]
+        fields["gps"] = (lat0 + rng.normal(0, 0.05), lon0 + rng.normal(0, 0.05))
+    return fields
+
+
+def exif_metadata(images, seed=0):
+    """exiftool ``-j -G -n`` style metadata keyed by file name, as EXIF_E.ipynb stores it."""
+    rng = np.random.default_rng([seed, 3])
+    metadata = {}
+    for i in range(images):
+        name = f"IMG_{i:07d}.jpg"
+        fields = _exif_fields(rng, i)
+        meta = {
+            "SourceFile": name,
+            "File:FileName": name,
+            "EXIF:Make": fields["make"],
+            "EXIF:Model": fields["model"],
+            "EXIF:DateTimeOriginal": fields["taken"],
+            "EXIF:CreateDate": fields["taken"],
+            "EXIF:ModifyDate": fields["modified"],
+            "EXIF:SubSecTimeOriginal": fields["subsec"],
+        }
+        if fields["software"]:
+            meta["EXIF:Software"] = fields["software"]
+        if fields["serial"]:
+            meta["EXIF:SerialNumber"] = fields["serial"]
+        if fields["gps"]:
+            lat, lon = fields["gps"]
+            meta.update({
+                "EXIF:GPSLatitudeRef": "N" if lat >= 0 else "S",
+                "EXIF:GPSLatitude": round(abs(lat), 6),
+                "EXIF:GPSLongitudeRef": "E" if lon >= 0 else "W",
+                "EXIF:GPSLongitude": round(abs(lon), 6),
+            })
+        metadata[name] = meta
+    return metadata
+
+
+def write_exif_json(path, images, seed=0):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(exif_metadata(images, seed), f)
+    return Path(path)
+
+
+def _ascii(text):
+    return 2, len(text) + 1, text.encode("ascii") + b"\0"
+
+
+def _dms(value):
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round(((value - degrees) * 60 - minutes) * 60 * 1000)
+    return 5, 3, struct.pack("<6L", degrees, 1, minutes, 1, seconds, 1000)
+
+
+def _ifd(entries, offset):
+    """Serialise one little-endian TIFF IFD placed at ``offset``."""
+    entries = sorted(entries)
+    data_offset = offset + 2 + 12 * len(entries) + 4
+    head, data = struct.pack("<H", len(entries)), b""
+    for tag, (kind, count, payload) in entries:
+        if len(payload) <= 4:
+            head += struct.pack("<HHL", tag, kind, count) + payload.ljust(4, b"\0")
+        else:
+            head += struct.pack("<HHLL", tag, kind, count, data_offset + len(data))
+            data += payload + (b"\0" if len(payload) % 2 else b"")
+    return head + struct.pack("<L", 0) + data
+
+
+def exif_segment(fields):
+    """APP1 segment with IFD0, Exif and GPS IFDs for ``fields`` from ``_exif_fields``."""
+    ifd0 = [(0x010F, _ascii(fields["make"])), (0x0110, _ascii(fields["model"])),
+            (0x0132, _ascii(fields["modified"]))]
+    if fields["software"]:
+        ifd0.append((0x0131, _ascii(fields["software"])))
+    exif = [(0x9003, _ascii(fields["taken"])), (0x9004, _ascii(fields["taken"])),
+            (0x9291, _ascii(fields["subsec"]))]
+    if fields["serial"]:
+        exif.append((0xA431, _ascii(fields["serial"])))
+    gps = []
+    if fields["gps"]:
+        lat, lon = fields["gps"]
+        gps = [(0x0000, (1, 4, bytes([2, 3, 0, 0]))),
+               (0x0001, _ascii("N" if lat >= 0 else "S")), (0x0002, _dms(abs(lat))),
+               (0x0003, _ascii("E" if lon >= 0 else "W")), (0x0004, _dms(abs(lon)))]
+
+    pointer = lambda tag, value: (tag, (4, 1, struct.pack("<L", value)))
+    pointers = [pointer(0x8769, 0)] + ([pointer(0x8825, 0)] if gps else [])
+    exif_offset = 8 + len(_ifd(ifd0 + pointers, 8))
+    exif_ifd = _ifd(exif, exif_offset)
+    gps_offset = exif_offset + len(exif_ifd)
+    pointers = [pointer(0x8769, exif_offset)] + ([pointer(0x8825, gps_offset)] if gps else [])
+
+    tiff = b"II*\0" + struct.pack("<L", 8) + _ifd(ifd0 + pointers, 8) + exif_ifd
+    if gps:
+        tiff += _ifd(gps, gps_offset)
+    payload = b"Exif\0\0" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+def write_jpegs(out_dir, images, seed=0):
+    """Small JPEG files carrying EXIF/GPS tags, for the exiftool extraction benchmark."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng([seed, 3])
+    for i in range(images):
+        segment = exif_segment(_exif_fields(rng, i))
+        with open(os.path.join(out_dir, f"IMG_{i:07d}.jpg"), "wb") as f:
+            f.write(_BASE_JPEG[:2] + segment + _BASE_JPEG[2:])
+    return out_dir
@@ -0,0 +1,365 @@
+"""Benchmark the analysers, scrapers and EXIF analysis on synthetic data.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.run                        # all cases at 10k rows
+    python -m benchmarks.run --scale 10k,1m --cases call,sms
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+
+Inputs come from ``benchmarks.generators`` with a fixed seed and are cached
+under ``benchmarks/data``.  Every case runs in a fresh process so peak RSS
+is its own, and is timed with ``call_sms.tracing``, so results include the
+per-stage breakdown (rows in/out, time, memory) the scripts already trace.
+Results are written as JSON; ``--compare`` checks them against an earlier
+file and exits non-zero when a case got slower than ``--tolerance``.
+
+The ``*_extract`` scraper cases run the real extraction code against a
+``benchmarks.fake_adb`` device holding the same number of rows;
+``--adb-latency-ms``/``--adb-throughput`` emulate a slow USB link and
+``--adb-compression`` selects the scrapers' on-device gzip mode.
+
+EXIF cases use fewer items than the row scale (1/100 for the analysis of
+exiftool JSON, 1/1000 JPEGs for the exiftool extraction, which is skipped
+when exiftool is not installed).
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks import fake_adb, generators
+from call_sms import tracing
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_DATA_DIR = REPO_ROOT / "benchmarks" / "data"
+DEFAULT_RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+EXIF_JSON_DIVISOR = 100
+EXIF_JPEG_DIVISOR = 1000
+EXIF_BATCH_SIZE = 50
+# Read by the *_extract cases; set in the parent so spawned workers inherit it
+ADB_COMPRESSION_ENV = "BENCH_ADB_COMPRESSION"
+
+
+# --------------------------------------------------------------------------- #
+#  Inputs (generated once per rows/seed and cached)                           #
+# --------------------------------------------------------------------------- #
+
+def prepare_inputs(case, rows, seed, data_dir):
+    # Absolute, because cases run with their own temporary working directory
+    data_dir = Path(data_dir).resolve()
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    def cached(name, write):
+        path = data_dir / name
+        if not path.exists():
+            tmp_path = path.with_name(path.name + ".tmp")
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        return str(path)
+
+    if case == "call":
+        return cached(f"calls_{rows}_{seed}.csv", lambda p: generators.write_calls_csv(p, rows, seed))
+    if case == "sms":
+        cached("sms_config.json", lambda p: p.write_text(json.dumps(generators.BENCH_SMS_CONFIG)))
+        return cached(f"sms_{rows}_{seed}.csv", lambda p: generators.write_sms_csv(p, rows, seed))
+    if case == "exif_analyze":
+        images = max(1, rows // EXIF_JSON_DIVISOR)
+        return cached(f"exif_{images}_{seed}.json", lambda p: generators.write_exif_json(p, images, seed))
+    if case == "exif_extract":
+        images = max(10, rows // EXIF_JPEG_DIVISOR)
+        path = data_dir / f"jpegs_{images}_{seed}"
+        if not path.exists():
+            generators.write_jpegs(str(path) + ".tmp", images, seed)
+            os.replace(str(path) + ".tmp", path)
+        return str(path)
+    if case in ("call_extract", "sms_extract"):
+        device_dir = data_dir / f"device_{rows}_{seed}"
+        wrapper = device_dir / "adb"
+        if not wrapper.exists():
+            fake_adb.setup_device(device_dir, calls=rows, sms=rows, seed=seed)
+        return str(wrapper)
+    # Parser cases parse generated lines in memory; nothing to cache on disk
+    return None
+
+
+def configure_fake_device(wrapper, latency_ms, throughput_bps):
+    config_path = Path(wrapper).with_name("device.json")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.update(latency_ms=latency_ms, throughput_bps=throughput_bps)
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+# --------------------------------------------------------------------------- #
+#  Cases (each runs inside a fresh worker process)                            #
+# --------------------------------------------------------------------------- #
+
+def bench_call(tracer, rows, seed, input_path, workdir):
+    from call_sms.analysers.call import process_call_log
+
+    with tracer.stage("process_call_log", rows_in=rows):
+        process_call_log(input_path, os.path.join(workdir, "calls"))
+
+
+def bench_sms(tracer, rows, seed, input_path, workdir):
+    os.environ["SMS_ANALYSER_CONFIG"] = str(Path(input_path).with_name("sms_config.json"))
+    from call_sms.analysers import sms
+
+    sms.set_output_paths(os.path.join(workdir, "sms"))
+    df = sms.load_messages(input_path)
+    with tracer.stage("clean", rows_in=len(df)):
+        df['body'] = df['body'].fillna("").astype(str)
+        df['address'] = df['address'].fillna("Unknown")
+        df['date'] = df['date'].fillna("Unknown")
+    sms.flag_foreign_numbers(df)
+    sms.categorize_messages(df)
+    sms.analyze_urls(df)
+    sms.detect_anomalies(df)
+    sms.cluster_campaigns(df)
+    sms.search_keywords(df, sms.KEYWORDS_TO_SEARCH)
+
+
+def bench_call_parser(tracer, rows, seed, input_path, workdir):
+    from call_sms.scrapers.call import ADBCallLogExtractor, Config
+
+    lines = generators.call_query_lines(rows, seed)
+    extractor = ADBCallLogExtractor(Config(output_dir=workdir))
+    extractor.parse_call_log_data(lines)
+
+
+def bench_sms_parser(tracer, rows, seed, input_path, workdir):
+    from call_sms.scrapers.sms import AndroidSMSExtractor, Config
+
+    lines = generators.sms_query_lines(rows, seed)
+    extractor = AndroidSMSExtractor(Config(output_dir=workdir))
+    extractor.parse_content_query(lines)
+
+
+def bench_call_extract(tracer, rows, seed, input_path, workdir):
+    from call_sms.scrapers.call import ADBCallLogExtractor, Config
+
+    compression = os.environ.get(ADB_COMPRESSION_ENV, "auto")
+    extractor = ADBCallLogExtractor(Config(adb_path=input_path, output_dir=workdir, compression=compression))
+    with tracer.stage("extract_call_logs", rows_in=rows):
+        extractor.extract_call_logs()
+
+
+def bench_sms_extract(tracer, rows, seed, input_path, workdir):
+    from call_sms.scrapers.sms import AndroidSMSExtractor, Config
+
+    compression = os.environ.get(ADB_COMPRESSION_ENV, "auto")
+    extractor = AndroidSMSExtractor(Config(adb_path=input_path, output_dir=workdir, compression=compression))
+    with tracer.stage("run_extraction", rows_in=rows):
+        extractor.run_extraction()
+
+
+def bench_exif_analyze(tracer, rows, seed, input_path, workdir):
+    sys.path.insert(0, str(REPO_ROOT / "EXIF_Extraction"))
+    import EXIF_A
+
+    with tracer.stage("load_exif_data") as stage:
+        metadata = EXIF_A.load_exif_data(input_path)
+        stage.rows_out = len(metadata)
+    with tracer.stage("extract_temporal_metadata", rows_in=len(metadata)):
+        df_time = EXIF_A.extract_temporal_metadata(metadata)
+    with tracer.stage("process_all_images_for_gps", rows_in=len(metadata)):
+        df_gps, _ = EXIF_A.process_all_images_for_gps(metadata)
+    with tracer.stage("cluster_image_locations", rows_in=len(df_gps)) as stage:
+        _, df_clusters = EXIF_A.cluster_image_locations(df_gps)
+        stage.rows_out = len(df_clusters)
+    with tracer.stage("analyze_all_devices_for_analysis", rows_in=len(metadata)):
+        df_device = EXIF_A.analyze_all_devices_for_analysis(metadata)
+    with tracer.stage("check_multiple_images_for_editors", rows_in=len(metadata)):
+        df_edited = EXIF_A.check_multiple_images_for_editors(metadata)
+    with tracer.stage("generate_summary_analysis", rows_in=len(metadata)):
+        EXIF_A.generate_summary_analysis(df_time, df_gps, df_device, df_edited)
+
+
+def bench_exif_extract(tracer, rows, seed, input_path, workdir):
+    import exiftool
+
+    files = sorted(os.listdir(input_path))
+    # Same batching as EXIF_E.ipynb: one exiftool process per batch of images
+    for start in range(0, len(files), EXIF_BATCH_SIZE):
+        batch = files[start:start + EXIF_BATCH_SIZE]
+        with tracer.stage("exif_batch", rows_in=len(batch)) as stage:
+            with exiftool.ExifTool() as et:
+                for name in batch:
+                    json.loads(et.execute("-j", os.path.join(input_path, name)))
+                    stage.count(1)
+
+
+def _exiftool_available():
+    try:
+        import exiftool  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which("exiftool") is not None
+
+
+CASES = {
+    "call": bench_call,
+    "sms": bench_sms,
+    "call_parser": bench_call_parser,
+    "sms_parser": bench_sms_parser,
+    "call_extract": bench_call_extract,
+    "sms_extract": bench_sms_extract,
+    "exif_analyze": bench_exif_analyze,
+    "exif_extract": bench_exif_extract,
+}
+
+
+def run_case(case, rows, seed, input_path, trace_malloc=False):
+    """Worker-process entry point: time one case and return its result record."""
+    workdir = tempfile.mkdtemp(prefix=f"bench_{case}_")
+    cwd = os.getcwd()
+    # The call analyser writes one of its files to the working directory
+    os.chdir(workdir)
+    try:
+        tracer = tracing.start_trace(f"{case}@{rows}", trace_malloc=trace_malloc)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            CASES[case](tracer, rows, seed, input_path, workdir)
+        trace = tracer.to_dict()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    # Input preparation inside a case is not timed; only its top-level stages count
+    seconds = sum(stage["seconds"] for stage in trace["stages"] if stage["depth"] == 0)
+    return {
+        "case": case,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": trace["peak_rss_mb"],
+        "stages": trace["stages"],
+    }
+
+
+# --------------------------------------------------------------------------- #
+#  Results                                                                    #
+# --------------------------------------------------------------------------- #
+
+def _git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print old/new timings per case; returns the cases slower than ``tolerance``."""
+    previous = {(r["case"], r["rows"]): r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'case':<14}{'rows':>10}{'baseline s':>12}{'current s':>12}{'ratio':>8}")
+    for result in results:
+        old = previous.get((result["case"], result["rows"]))
+        if old is None or result.get("skipped") or old.get("skipped"):
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(result)
+            flag = "  SLOWER"
+        print(f"{result['case']:<14}{result['rows']:>10}{old['seconds']:>12.3f}"
+              f"{result['seconds']:>12.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ForAndroid benchmark suite")
+    parser.add_argument("--scale", default="10k",
+                        help=f"Comma-separated row scales ({', '.join(SCALES)}) or row counts")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help=f"Comma-separated cases ({', '.join(CASES)})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR),
+                        help="Where generated inputs are cached")
+    parser.add_argument("--output", default=None,
+                        help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown ratio before --compare fails (0.25 = 25%%)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also record peak Python heap per stage (slower)")
+    parser.add_argument("--adb-latency-ms", type=float, default=0,
+                        help="Per-command latency of the fake device in the *_extract cases")
+    parser.add_argument("--adb-throughput", default=None,
+                        help="Fake device output limit in bytes/s for *_extract cases, e.g. 20m")
+    parser.add_argument("--adb-compression", choices=["auto", "gzip", "none"], default="auto",
+                        help="On-device gzip mode of the scrapers in *_extract cases")
+    args = parser.parse_args()
+
+    scales = [SCALES.get(s.strip().lower()) or int(s) for s in args.scale.split(",") if s.strip()]
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    throughput = fake_adb._parse_size(args.adb_throughput) if args.adb_throughput else None
+    os.environ[ADB_COMPRESSION_ENV] = args.adb_compression
+
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for rows in scales:
+        for case in cases:
+            if case == "exif_extract" and not _exiftool_available():
+                print(f"[-] {case} @ {rows}: skipped (exiftool not installed)")
+                results.append({"case": case, "rows": rows, "skipped": "exiftool not installed"})
+                continue
+
+            print(f"[*] {case} @ {rows}: preparing input...", flush=True)
+            input_path = prepare_inputs(case, rows, args.seed, args.data_dir)
+            if case.endswith("_extract") and case != "exif_extract":
+                configure_fake_device(input_path, args.adb_latency_ms, throughput)
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                result = pool.submit(run_case, case, rows, args.seed, input_path, args.tracemalloc).result()
+            results.append(result)
+            print(f"[+] {case} @ {rows}: {result['seconds']:.3f}s, peak RSS {result['peak_rss_mb']} MB")
+
+    report = {
+        "meta": {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "seed": args.seed,
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "adb_latency_ms": args.adb_latency_ms,
+            "adb_throughput_bps": throughput,
+            "adb_compression": args.adb_compression,
+        },
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else \
+        DEFAULT_RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[*] Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,574 @@
+"""ADB access for the scrapers without one ``adb`` process per command.
+
+``AdbSession`` talks to the local adb server over its socket protocol
+(``host:version``, ``host:devices``, ``host:transport:<serial>`` followed by
+``shell,v2,raw:``/``shell:``, ``exec:`` and ``sync:`` services) instead of
+spawning the ``adb`` client for every step.  Each service still opens a
+short localhost TCP stream, as the protocol requires, but the server
+multiplexes them over the single USB transport it already holds, so
+nothing is forked and no new device connection is made.  On top of that a
+session:
+
+* caches device state, feature list and root capability for its lifetime
+  (``get_session`` keeps one session per adb path/serial per process);
+* runs several shell commands in one round trip with ``shell_batch``;
+* streams ``exec-out`` output and pulls files over the sync protocol;
+* optionally compresses bulk output on the device (``... | gzip -c``) and
+  inflates it on the host as it arrives (``read_lines``/``pull_gzip``),
+  falling back to plain transfers when the device has no ``gzip``.
+
+When no adb server is reachable (or ``transport="subprocess"``, or a
+custom ``adb_path`` such as the fake device is configured) the same API
+falls back to running the ``adb`` executable.
+
+``content_query`` and ``sql_where`` build ``content query`` command lines
+with projection and predicate pushdown, so the provider only serialises
+the rows and columns that were asked for.
+"""
+
+import argparse
+import codecs
+import gzip
+import os
+import re
+import shlex
+import socket
+import struct
+import subprocess
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_SERVER = ("127.0.0.1", 5037)
+CHUNK_SIZE = 64 * 1024
+SYNC_DATA_MAX = 64 * 1024
+EXIT_MARKER = "__adb_exit__"
+COMPRESSION_MODES = ("auto", "gzip", "none")
+
+# Shell protocol v2 packet ids
+_STDOUT, _STDERR, _EXIT = 1, 2, 3
+
+Command = Union[str, Sequence[str]]
+
+
+class AdbError(Exception):
+    pass
+
+
+# A gzip stream from the device that is corrupt (no real gzip there) or cut short
+# (the link dropped); callers retry such transfers uncompressed
+COMPRESSED_TRANSFER_ERRORS = (zlib.error, EOFError, AdbError)
+
+
+@dataclass
+class ShellResult:
+    stdout: str
+    stderr: str
+    returncode: int
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def _command_line(command: Command) -> str:
+    # adb itself joins shell arguments with spaces; the device shell re-splits them
+    return command if isinstance(command, str) else " ".join(command)
+
+
+def server_address() -> Tuple[str, int]:
+    """adb server address, honouring ADB_SERVER_SOCKET / ANDROID_ADB_SERVER_PORT."""
+    spec = os.environ.get("ADB_SERVER_SOCKET", "")
+    if spec.startswith("tcp:"):
+        host, _, port = spec[4:].rpartition(":")
+        return host or DEFAULT_SERVER[0], int(port)
+    port = os.environ.get("ANDROID_ADB_SERVER_PORT")
+    return DEFAULT_SERVER[0], int(port) if port else DEFAULT_SERVER[1]
+
+
+def parse_address(text: Optional[str]) -> Tuple[str, int]:
+    if not text:
+        return server_address()
+    host, _, port = text.rpartition(":")
+    return host or DEFAULT_SERVER[0], int(port)
+
+
+def parse_devices(text: str) -> Dict[str, str]:
+    devices = {}
+    for line in text.splitlines():
+        if not line.strip() or line.startswith("List of devices") or line.startswith("*"):
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            devices[parts[0]] = parts[1]
+    return devices
+
+
+# --------------------------------------------------------------------------- #
+#  Content provider queries                                                   #
+# --------------------------------------------------------------------------- #
+
+def epoch_ms(value: Union[int, str], end_of_day: bool = False) -> int:
+    """Epoch milliseconds from an int, a digit string or an ISO date/datetime (local time).
+
+    With ``end_of_day`` a bare date means its last millisecond, for inclusive upper bounds.
+    """
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if text.isdigit():
+        return int(text)
+    ms = int(datetime.fromisoformat(text).timestamp() * 1000)
+    if end_of_day and len(text) == 10:
+        ms += 24 * 3600 * 1000 - 1
+    return ms
+
+
+def date_argument(end_of_day: bool = False):
+    """argparse ``type=`` for --since/--until: epoch ms, or a usage error for a malformed date."""
+    def parse(value: str) -> int:
+        try:
+            return epoch_ms(value, end_of_day)
+        except (ValueError, OverflowError, OSError) as exc:
+            raise argparse.ArgumentTypeError(
+                f"invalid date {value!r} ({exc}); expected YYYY-MM-DD[THH:MM] or epoch ms")
+    return parse
+
+
+def int_list_argument(value: str) -> List[int]:
+    """argparse ``type=`` for comma-separated type codes such as --call-type 1,3."""
+    try:
+        return [int(item) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid code list {value!r}; expected comma-separated integers such as 1,3")
+
+
+COLUMN_NAME = re.compile(r"^\w+$")
+
+
+def column_list_argument(value: str) -> List[str]:
+    """argparse ``type=`` for comma-separated provider column names such as --projection."""
+    columns = [item.strip() for item in value.split(",") if item.strip()]
+    for column in columns:
+        if not COLUMN_NAME.match(column):
+            raise argparse.ArgumentTypeError(f"invalid column name {column!r}; expected letters, digits and _")
+    return columns
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_where(date_from: Optional[Union[int, str]] = None, date_to: Optional[Union[int, str]] = None,
+              types: Optional[Iterable[int]] = None, numbers: Optional[Iterable[str]] = None,
+              number_column: str = "number", extra: Optional[str] = None) -> Optional[str]:
+    """Provider selection for a date range (inclusive, epoch ms), type codes and numbers."""
+    clauses = []
+    if date_from is not None:
+        clauses.append(f"date >= {epoch_ms(date_from)}")
+    if date_to is not None:
+        clauses.append(f"date <= {epoch_ms(date_to, end_of_day=True)}")
+    if types:
+        clauses.append(f"type IN ({','.join(str(int(t)) for t in types)})")
+    if numbers:
+        clauses.append(f"{number_column} IN ({','.join(_sql_literal(n) for n in numbers)})")
+    if extra:
+        clauses.append(f"({extra})")
+    return " AND ".join(clauses) or None
+
+
+def content_query(uri: str, projection: Optional[Sequence[str]] = None, where: Optional[str] = None,
+                  sort: Optional[str] = None) -> List[str]:
+    """``content query`` arguments, quoted for the device shell that re-splits them."""
+    cmd = ["content", "query", "--uri", uri]
+    if projection:
+        cmd += ["--projection", shlex.quote(":".join(projection))]
+    if where:
+        cmd += ["--where", shlex.quote(where)]
+    if sort:
+        cmd += ["--sort", shlex.quote(sort)]
+    return cmd
+
+
+# --------------------------------------------------------------------------- #
+#  Transports                                                                 #
+# --------------------------------------------------------------------------- #
+
+class SocketTransport:
+    """Speaks the adb server protocol directly."""
+
+    name = "socket"
+
+    def __init__(self, address: Optional[Tuple[str, int]] = None, timeout: float = 30):
+        self.address = address or server_address()
+        self.timeout = timeout
+
+    # -- wire helpers --------------------------------------------------------
+
+    def _connect(self, timeout: Optional[float] = None) -> socket.socket:
+        sock = socket.create_connection(self.address, timeout=timeout or self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _read_exact(sock: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise AdbError("adb server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _send_request(self, sock: socket.socket, payload: str) -> None:
+        data = payload.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = self._read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            length = int(self._read_exact(sock, 4), 16)
+            raise AdbError(self._read_exact(sock, length).decode("utf-8", "replace"))
+        raise AdbError(f"unexpected adb server response {status!r}")
+
+    def _read_length_prefixed(self, sock: socket.socket) -> str:
+        length = int(self._read_exact(sock, 4), 16)
+        return self._read_exact(sock, length).decode("utf-8", "replace")
+
+    def host_query(self, service: str) -> str:
+        with self._connect() as sock:
+            self._send_request(sock, service)
+            return self._read_length_prefixed(sock)
+
+    def open_service(self, serial: Optional[str], service: str, timeout: Optional[float] = None) -> socket.socket:
+        sock = self._connect(timeout)
+        try:
+            self._send_request(sock, f"host:transport:{serial}" if serial else "host:transport-any")
+            self._send_request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    # -- transport API -------------------------------------------------------
+
+    def available(self) -> bool:
+        try:
+            self.host_query("host:version")
+            return True
+        except (OSError, AdbError):
+            return False
+
+    def devices(self) -> Dict[str, str]:
+        return parse_devices(self.host_query("host:devices"))
+
+    def features(self, serial: Optional[str]) -> List[str]:
+        service = f"host-serial:{serial}:features" if serial else "host:features"
+        try:
+            return [f for f in self.host_query(service).split(",") if f]
+        except AdbError:
+            return []
+
+    def shell(self, serial, command: str, timeout=None, shell_v2=True) -> ShellResult:
+        if shell_v2:
+            with self.open_service(serial, f"shell,v2,raw:{command}", timeout) as sock:
+                return self._read_shell_v2(sock)
+
+        # Legacy shell: stdout and stderr arrive merged and the exit code is echoed
+        with self.open_service(serial, f"shell:{command}; echo {EXIT_MARKER}$?", timeout) as sock:
+            output = b"".join(iter(lambda: sock.recv(CHUNK_SIZE), b"")).decode("utf-8", "replace")
+        body, _, code = output.rstrip("\r\n").rpartition(EXIT_MARKER)
+        try:
+            returncode = int(code.strip())
+        except ValueError:
+            body, returncode = output, -1
+        return ShellResult(body.replace("\r\n", "\n"), "", returncode)
+
+    def _read_shell_v2(self, sock: socket.socket) -> ShellResult:
+        stdout, stderr, returncode = bytearray(), bytearray(), -1
+        while True:
+            try:
+                header = self._read_exact(sock, 5)
+            except AdbError:
+                break
+            packet_id, length = header[0], struct.unpack("<I", header[1:])[0]
+            data = self._read_exact(sock, length)
+            if packet_id == _STDOUT:
+                stdout += data
+            elif packet_id == _STDERR:
+                stderr += data
+            elif packet_id == _EXIT:
+                returncode = data[0]
+                break
+        return ShellResult(stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace"), returncode)
+
+    def exec_out(self, serial, command: str, timeout=None) -> Iterator[bytes]:
+        with self.open_service(serial, f"exec:{command}", timeout) as sock:
+            for chunk in iter(lambda: sock.recv(CHUNK_SIZE), b""):
+                yield chunk
+
+    def pull(self, serial, remote: str, local: str, timeout=None) -> int:
+        path = remote.encode("utf-8")
+        size = 0
+        with self.open_service(serial, "sync:", timeout) as sock, open(local, "wb") as f:
+            sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+            while True:
+                header = self._read_exact(sock, 8)
+                kind, length = header[:4], struct.unpack("<I", header[4:])[0]
+                if kind == b"DATA":
+                    data = self._read_exact(sock, length)
+                    f.write(data)
+                    size += len(data)
+                elif kind == b"DONE":
+                    break
+                elif kind == b"FAIL":
+                    raise AdbError(self._read_exact(sock, length).decode("utf-8", "replace"))
+                else:
+                    raise AdbError(f"unexpected sync response {kind!r}")
+            sock.sendall(b"QUIT" + struct.pack("<I", 0))
+        return size
+
+
+class SubprocessTransport:
+    """Fallback that runs the ``adb`` executable for each request."""
+
+    name = "subprocess"
+
+    def __init__(self, adb_path: str = "adb", timeout: float = 30):
+        self.adb_path = adb_path
+        self.timeout = timeout
+
+    def _argv(self, serial, *args) -> List[str]:
+        return [self.adb_path] + (["-s", serial] if serial else []) + list(args)
+
+    def _run(self, argv, timeout=None) -> subprocess.CompletedProcess:
+        try:
+            return subprocess.run(argv, capture_output=True, text=True, encoding="utf-8",
+                                  errors="replace", timeout=timeout or self.timeout)
+        except FileNotFoundError as exc:
+            raise AdbError(f"adb executable not found: {self.adb_path}") from exc
+        except subprocess.TimeoutExpired as exc:
+            raise AdbError(f"adb timed out: {' '.join(argv[1:])}") from exc
+
+    def available(self) -> bool:
+        try:
+            return self._run([self.adb_path, "version"], timeout=5).returncode == 0
+        except AdbError:
+            return False
+
+    def devices(self) -> Dict[str, str]:
+        result = self._run([self.adb_path, "devices"], timeout=10)
+        if result.returncode != 0:
+            raise AdbError(result.stderr.strip() or "adb devices failed")
+        return parse_devices(result.stdout)
+
+    def features(self, serial) -> List[str]:
+        result = self._run(self._argv(serial, "features"), timeout=10)
+        return result.stdout.split() if result.returncode == 0 else []
+
+    def shell(self, serial, command: str, timeout=None, shell_v2=True) -> ShellResult:
+        result = self._run(self._argv(serial, "shell", command), timeout)
+        return ShellResult(result.stdout, result.stderr, result.returncode)
+
+    def exec_out(self, serial, command: str, timeout=None) -> Iterator[bytes]:
+        try:
+            process = subprocess.Popen(self._argv(serial, "exec-out", command),
+                                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except FileNotFoundError as exc:
+            raise AdbError(f"adb executable not found: {self.adb_path}") from exc
+        try:
+            for chunk in iter(lambda: process.stdout.read(CHUNK_SIZE), b""):
+                yield chunk
+        finally:
+            process.stdout.close()
+            if process.wait() != 0:
+                raise AdbError(f"adb exec-out exited with {process.returncode}")
+
+    def pull(self, serial, remote: str, local: str, timeout=None) -> int:
+        result = self._run(self._argv(serial, "pull", remote, local), timeout)
+        if result.returncode != 0:
+            raise AdbError(result.stderr.strip() or f"adb pull {remote} failed")
+        return os.path.getsize(local)
+
+
+# --------------------------------------------------------------------------- #
+#  Sessions                                                                   #
+# --------------------------------------------------------------------------- #
+
+class AdbSession:
+    """One device, one transport, with state and root capability cached."""
+
+    def __init__(self, adb_path: str = "adb", serial: Optional[str] = None,
+                 transport: str = "auto", server: Optional[str] = None, timeout: float = 30):
+        self.adb_path = adb_path
+        self.serial = serial
+        self.timeout = timeout
+        self.transport = self._select_transport(transport, server)
+        self._available: Optional[bool] = None
+        self._state: Optional[str] = None
+        self._features: Optional[List[str]] = None
+        self._root: Optional[bool] = None
+        self._gzip: Optional[bool] = None
+
+    def _select_transport(self, transport: str, server: Optional[str]):
+        if transport == "subprocess":
+            return SubprocessTransport(self.adb_path, self.timeout)
+        socket_transport = SocketTransport(parse_address(server), self.timeout)
+        if transport == "socket":
+            return socket_transport
+        # auto: a custom adb_path (e.g. a fake device) must not be bypassed via a real server
+        if self.adb_path == "adb" and socket_transport.available():
+            return socket_transport
+        return SubprocessTransport(self.adb_path, self.timeout)
+
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = self.transport.available()
+        return self._available
+
+    def devices(self) -> Dict[str, str]:
+        return self.transport.devices()
+
+    def state(self, refresh: bool = False) -> Optional[str]:
+        """State of this session's device; picks the first attached device if none was given."""
+        if self._state is None or refresh:
+            if not self.available():
+                return None
+            try:
+                devices = self.devices()
+            except (OSError, AdbError):
+                return None
+            if self.serial is None:
+                ready = [serial for serial, state in devices.items() if state == "device"]
+                self.serial = ready[0] if ready else next(iter(devices), None)
+            self._state = devices.get(self.serial)
+        return self._state
+
+    def is_connected(self) -> bool:
+        return self.state() == "device"
+
+    def features(self) -> List[str]:
+        if self._features is None:
+            self._features = self.transport.features(self.serial) if self.is_connected() else []
+        return self._features
+
+    def shell(self, command: Command, timeout: Optional[float] = None) -> ShellResult:
+        shell_v2 = self.transport.name != "socket" or "shell_v2" in self.features()
+        return self.transport.shell(self.serial, _command_line(command), timeout, shell_v2)
+
+    def shell_batch(self, commands: Sequence[Command], timeout: Optional[float] = None) -> List[ShellResult]:
+        """Run several commands in one shell round trip, each with its own exit code."""
+        markers = [f"{EXIT_MARKER}{i}:" for i in range(len(commands))]
+        script = "; ".join(f"{_command_line(cmd)}; echo {marker}$?" for cmd, marker in zip(commands, markers))
+        combined = self.shell(script, timeout)
+
+        results, rest = [], combined.stdout
+        for marker in markers:
+            body, found, rest = rest.partition(marker)
+            if not found:
+                results.append(ShellResult(body, combined.stderr, combined.returncode or -1))
+                rest = ""
+                continue
+            code, _, rest = rest.partition("\n")
+            results.append(ShellResult(body, "", int(code.strip() or -1)))
+        if results and combined.stderr:
+            results[-1].stderr = combined.stderr
+        return results
+
+    def has_root(self) -> bool:
+        if self._root is None:
+            try:
+                result = self.shell("su -c id", timeout=15)
+                self._root = result.ok and "uid=0" in result.stdout
+            except (OSError, AdbError):
+                self._root = False
+        return self._root
+
+    def exec_out(self, command: Command, timeout: Optional[float] = None) -> Iterator[bytes]:
+        return self.transport.exec_out(self.serial, _command_line(command), timeout)
+
+    def pull(self, remote: str, local: str, timeout: Optional[float] = None) -> int:
+        return self.transport.pull(self.serial, remote, local, timeout)
+
+    def has_gzip(self) -> bool:
+        """Whether the device can gzip a stream (toybox gzip on Android 7+)."""
+        if self._gzip is None:
+            try:
+                data = b"".join(self.exec_out("echo gzip-probe | gzip -c", timeout=15))
+                self._gzip = gzip.decompress(data).strip() == b"gzip-probe"
+            except (OSError, EOFError, zlib.error, AdbError):
+                self._gzip = False
+        return self._gzip
+
+    def use_gzip(self, compression: str) -> bool:
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"compression must be one of {COMPRESSION_MODES}, not {compression!r}")
+        return compression == "gzip" or (compression == "auto" and self.has_gzip())
+
+    def exec_out_gunzip(self, command: Command, timeout: Optional[float] = None) -> Iterator[bytes]:
+        """Run ``command | gzip -c`` on the device and inflate the stream chunk by chunk."""
+        decompressor = zlib.decompressobj(wbits=31)
+        for chunk in self.exec_out(f"{_command_line(command)} | gzip -c", timeout):
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+        if not decompressor.eof:
+            raise AdbError("compressed stream from device was truncated")
+
+    def read_lines(self, command: Command, compression: str = "auto",
+                   timeout: Optional[float] = None) -> Iterator[str]:
+        """Stream the output lines of ``command`` via exec-out, gzipped on the device if possible."""
+        if self.use_gzip(compression):
+            chunks = self.exec_out_gunzip(command, timeout)
+        else:
+            chunks = self.exec_out(command, timeout)
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        pending = ""
+        for chunk in chunks:
+            pending += decoder.decode(chunk)
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending.rstrip("\r")
+
+    def pull_gzip(self, remote: str, local: str, as_root: bool = False,
+                  timeout: Optional[float] = None) -> int:
+        """Copy a device file gzipped over exec-out, inflating it into ``local`` as it streams."""
+        command = f"gzip -c {shlex.quote(remote)}"
+        if as_root:
+            command = f"su -c {shlex.quote(command)}"
+        decompressor = zlib.decompressobj(wbits=31)
+        size = 0
+        with open(local, "wb") as f:
+            for chunk in self.exec_out(command, timeout):
+                data = decompressor.decompress(chunk)
+                f.write(data)
+                size += len(data)
+            tail = decompressor.flush()
+            f.write(tail)
+            size += len(tail)
+        if not decompressor.eof:
+            raise AdbError(f"compressed copy of {remote} was truncated")
+        return size
+
+
+_sessions: Dict[tuple, AdbSession] = {}
+
+
+def get_session(adb_path: str = "adb", serial: Optional[str] = None, transport: str = "auto",
+                server: Optional[str] = None, timeout: float = 30) -> AdbSession:
+    """Process-wide session per adb path/device, so state and root checks run once."""
+    key = (adb_path, serial, transport, server)
+    if key not in _sessions:
+        _sessions[key] = AdbSession(adb_path, serial, transport, server, timeout)
+    return _sessions[key]
@@ -1,9 +1,16 @@
+import argparse
 import pandas as pd
 from datetime import datetime, timedelta
 import sys
 from collections import Counter
 import numpy as np
 import os
+from pathlib import Path
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from call_sms import columnar, phone, shards, tracing
 
 def parse_datetime_safe(s):
     try:
@@ -11,10 +18,48 @@ def parse_datetime_safe(s):
     except Exception:
         return pd.NaT
 
+def parse_dates(values):
+    """Parse call dates given either as text or as raw epoch milliseconds"""
+    if pd.api.types.is_numeric_dtype(values):
+        return columnar.epoch_ms_to_local(values)
+    return values.apply(parse_datetime_safe)
+
+# Feature flags are 0/1, so int8 instead of int64; is_unknown_number stays bool (printed True/False)
+FLAG_COLUMNS = [
+    "is_known_contact", "is_zero_duration", "is_short_call", "is_long_call", "is_late_night",
+    "is_foreign", "is_hidden_number", "is_missed_call", "is_incoming", "is_outgoing",
+]
+CATEGORY_COLUMNS = [
+    "number", "name", "countryiso", "geocoded_location", "formatted_number", "normalized_number", "day",
+]
+
+def compact_dtypes(df):
+    """Shrink an enriched frame without changing how any column is written to CSV"""
+    for col in FLAG_COLUMNS:
+        df[col] = df[col].astype("int8")
+    df["call_hour"] = df["call_hour"].astype("int8")
+    # Integer columns (duration, type, ids, ...) print the same at any width; floats are left alone
+    for col in df.columns:
+        if col not in FLAG_COLUMNS and pd.api.types.is_integer_dtype(df[col]) \
+                and not pd.api.types.is_extension_array_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Categories in order of first appearance keep value_counts() ties in the same order
+            df[col] = pd.Categorical(df[col], categories=pd.unique(df[col].dropna()))
+    return df
+
+def top_counts(values, n=10):
+    """``value_counts().head(n)`` with ties in first-appearance order, as for object columns"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    return values.value_counts().head(n)
+
+@tracing.traced()
 def enrich_features(df):
     df = df.copy()
     df = df.dropna(subset=["number", "date"])
-    df["parsed_date"] = df["date"].apply(parse_datetime_safe)
+    df["parsed_date"] = parse_dates(df["date"])
     df = df.dropna(subset=["parsed_date"])
     df["duration"] = pd.to_numeric(df["duration"], errors="coerce").fillna(0)
     df["call_hour"] = df["parsed_date"].dt.hour
@@ -24,49 +69,112 @@ def enrich_features(df):
     df["is_short_call"] = (df["duration"] < 10).astype(int)
     df["is_long_call"] = (df["duration"] > 1800).astype(int)  # Calls longer than 30 minutes
     df["is_late_night"] = df["call_hour"].between(0, 5).astype(int)
-    df["is_foreign"] = df["countryiso"].fillna("").ne(df["countryiso"].mode().iloc[0]).astype(int)
+    # Resolve the country from the number itself; countryiso is often blank
+    home = phone.home_region(df["countryiso"])
+    region = phone.normalize_series(df["number"], home)["region"]
+    region = region.fillna(df["countryiso"].astype("string").str.upper()).fillna(home)
+    df["is_foreign"] = region.ne(home).astype(int)
     df["is_hidden_number"] = pd.to_numeric(df["presentation"], errors="coerce").fillna(1).eq(0).astype(int)
     df["is_unknown_number"] = df["is_known_contact"].eq(0)
-    df["is_missed_call"] = df["type"].eq(6).astype(int)  # Type 6 is typically missed calls
-    df["is_incoming"] = df["type"].isin([1, 6]).astype(int)  # Type 1 = incoming, 6 = missed
-    df["is_outgoing"] = df["type"].eq(2).astype(int)  # Type 2 = outgoing
-    
-    # Short calls from different numbers on same day (potential bot-like behavior)
-    short_calls = df[df["is_short_call"] & df["is_unknown_number"]]
-    short_calls_count = short_calls.groupby("day")["number"].nunique().rename("short_unknown_calls_today")
-    df = df.merge(short_calls_count, on="day", how="left")
-    df["short_unknown_calls_today"] = df["short_unknown_calls_today"].fillna(0)
+    call_type = pd.to_numeric(df["type"], errors="coerce").astype("float64")
+    df["is_missed_call"] = call_type.eq(6).astype(int)  # Type 6 is typically missed calls
+    df["is_incoming"] = call_type.isin([1, 6]).astype(int)  # Type 1 = incoming, 6 = missed
+    df["is_outgoing"] = call_type.eq(2).astype(int)  # Type 2 = outgoing
+    
+    df.index = pd.RangeIndex(len(df))
+    
+    # Short calls from different numbers on same day (potential bot-like behavior),
+    # counted per day and taken back to the rows by day code instead of a merge
+    day_codes, days = pd.factorize(df["day"])
+    number_codes, _ = pd.factorize(df["number"])
+    short_unknown = (df["is_short_call"] == 1).to_numpy() & df["is_unknown_number"].to_numpy()
+    per_day = pd.Series(number_codes[short_unknown]).groupby(day_codes[short_unknown]).nunique()
+    per_day = per_day.reindex(range(len(days))).fillna(0)
+    df["short_unknown_calls_today"] = per_day.to_numpy()[day_codes]
     # Remove the date column as requested
     df = df.drop(columns=["date"])
     
-    return df
+    return compact_dtypes(df)
+
+class NumberStats:
+    """Per-number aggregates, computed once and shared by the pattern/spoof detectors and summary
+    
+    ``codes`` maps every row of the frame to its number's position in ``table``
+    (numbers in order of first appearance), so per-number values are attached to
+    rows with a positional take instead of a merge.
+    """
+    
+    def __init__(self, df):
+        self.codes, numbers = pd.factorize(df['number'])
+        groups = df.groupby(self.codes, sort=True)
+        first = df.iloc[np.unique(self.codes, return_index=True)[1]]
+        
+        table = pd.DataFrame(index=pd.Index(numbers, name='number'))
+        table['total_calls'] = groups.size().to_numpy()
+        table['total_duration'] = groups['duration'].sum().to_numpy()
+        table['avg_duration'] = groups['duration'].mean().to_numpy()
+        for col, name in (('is_missed_call', 'missed_calls'), ('is_incoming', 'incoming_calls'),
+                          ('is_outgoing', 'outgoing_calls')):
+            # int8 flags would overflow when summed as int8
+            table[name] = df[col].astype('int64').groupby(self.codes).sum().to_numpy()
+        table['missed_ratio'] = groups['is_missed_call'].mean().to_numpy()
+        table['short_ratio'] = groups['is_short_call'].mean().to_numpy()
+        table['night_ratio'] = groups['is_late_night'].mean().to_numpy()
+        table['first_call'] = groups['parsed_date'].min().to_numpy()
+        table['last_call'] = groups['parsed_date'].max().to_numpy()
+        # Per-number attributes as seen on the number's first row
+        for col in ('is_unknown_number', 'is_hidden_number', 'is_foreign'):
+            table[col] = first[col].to_numpy()
+        self.table = table
+    
+    @classmethod
+    def from_tables(cls, df, tables):
+        """Stats of ``df`` assembled from per-shard tables that each cover a disjoint set of numbers"""
+        stats = cls.__new__(cls)
+        stats.codes, numbers = pd.factorize(df['number'])
+        table = pd.concat(tables)
+        stats.table = table.iloc[table.index.get_indexer(numbers)]
+        return stats
+    
+    def take(self, column, codes=None):
+        """Broadcast a per-number column back to rows (of the frame, or of ``codes``)"""
+        return self.table[column].to_numpy()[self.codes if codes is None else codes]
+
+@tracing.traced()
+def find_frequent_callers(df, stats=None):
+    """Numbers with 3+ calls that each came within an hour of the number's previous call"""
+    stats = stats or NumberStats(df)
+    order = np.lexsort((df['parsed_date'].to_numpy(), stats.codes))
+    codes = stats.codes[order]
+    dates = df['parsed_date'].to_numpy()[order]
+    same_number = np.r_[False, codes[1:] == codes[:-1]]
+    rapid = same_number & np.r_[False, np.diff(dates) <= np.timedelta64(1, 'h')]
+    rapid_counts = np.bincount(codes[rapid], minlength=len(stats.table))
+    # is_known as on the number's earliest call
+    earliest = order[~same_number]
+    is_known = df['is_known_contact'].to_numpy()[earliest]
+    
+    table = stats.table
+    frequent_callers = []
+    for code in np.flatnonzero((table['total_calls'].to_numpy() >= 3) & (rapid_counts >= 3)):
+        frequent_callers.append({
+            'number': table.index[code],
+            'rapid_calls_count': int(rapid_counts[code]),
+            'total_calls': int(table['total_calls'].iloc[code]),
+            'is_known': is_known[code],
+            'avg_duration': table['avg_duration'].iloc[code]
+        })
+    
+    return frequent_callers
 
-def detect_call_patterns(df):
+@tracing.traced()
+def detect_call_patterns(df, stats=None, frequent_callers=None):
     """Detect various suspicious call patterns"""
     patterns = {}
     
     # 1. Frequent calls from same number within short time
-    df_sorted = df.sort_values(['number', 'parsed_date'])
-    frequent_callers = []
-    
-    for number in df['number'].unique():
-        number_calls = df_sorted[df_sorted['number'] == number].copy()
-        if len(number_calls) < 3:
-            continue
-            
-        # Check for calls within 1 hour windows
-        number_calls['time_diff'] = number_calls['parsed_date'].diff()
-        rapid_calls = number_calls[number_calls['time_diff'] <= timedelta(hours=1)]
-        
-        if len(rapid_calls) >= 3:
-            frequent_callers.append({
-                'number': number,
-                'rapid_calls_count': len(rapid_calls),
-                'total_calls': len(number_calls),
-                'is_known': number_calls['is_known_contact'].iloc[0],
-                'avg_duration': number_calls['duration'].mean()
-            })
-    
+    if frequent_callers is None:
+        frequent_callers = find_frequent_callers(df, stats)
     patterns['frequent_callers'] = frequent_callers
     
     # 2. Very long or very short call durations
@@ -75,17 +183,17 @@ def detect_call_patterns(df):
     
     patterns['very_short_calls'] = {
         'count': len(very_short),
-        'numbers': very_short['number'].value_counts().head(10).to_dict()
+        'numbers': top_counts(very_short['number']).to_dict()
     }
     
     patterns['very_long_calls'] = {
         'count': len(very_long),
-        'numbers': very_long['number'].value_counts().head(10).to_dict()
+        'numbers': top_counts(very_long['number']).to_dict()
     }
     
     # 3. Missed/dropped calls frequency
     missed_calls = df[df['is_missed_call'] == 1]
-    missed_patterns = missed_calls['number'].value_counts().head(20)
+    missed_patterns = top_counts(missed_calls['number'], 20)
     
     patterns['frequent_missed_calls'] = {
         'total_missed': len(missed_calls),
@@ -96,99 +204,81 @@ def detect_call_patterns(df):
     night_calls = df[df['is_late_night'] == 1]
     patterns['night_calls'] = {
         'count': len(night_calls),
-        'numbers': night_calls['number'].value_counts().head(10).to_dict()
+        'numbers': top_counts(night_calls['number']).to_dict()
     }
     
     return patterns
 
-def detect_spoof_calls(df):
+@tracing.traced()
+def detect_spoof_calls(df, stats=None):
     """Detect potential spoof or scam calls"""
-    spoof_indicators = []
+    stats = stats or NumberStats(df)
+    table = stats.table
+    total = table['total_calls']
     
-    # Analyze each number's behavior
-    for number in df['number'].unique():
-        number_calls = df[df['number'] == number]
-        
-        # Calculate spoof score based on multiple factors
-        spoof_score = 0
-        reasons = []
-        
+    # Score each number's behavior from the shared per-number table
+    factors = [
         # Factor 1: Unknown number with multiple calls
-        if number_calls['is_unknown_number'].iloc[0] == 1:
-            spoof_score += 1
-            if len(number_calls) > 1:
-                spoof_score += 1
-                reasons.append("Multiple calls from unknown number")
-        
+        (table['is_unknown_number'] == 1, 1, None),
+        ((table['is_unknown_number'] == 1) & (total > 1), 1,
+         lambda row: "Multiple calls from unknown number"),
         # Factor 2: Only incoming calls, no outgoing (never called back)
-        incoming_count = number_calls['is_incoming'].sum()
-        outgoing_count = number_calls['is_outgoing'].sum()
-        
-        if incoming_count > 0 and outgoing_count == 0 and incoming_count > 2:
-            spoof_score += 2
-            reasons.append("Multiple incoming calls, never called back")
-        
+        ((table['incoming_calls'] > 2) & (table['outgoing_calls'] == 0), 2,
+         lambda row: "Multiple incoming calls, never called back"),
         # Factor 3: High percentage of missed calls
-        missed_ratio = number_calls['is_missed_call'].mean()
-        if missed_ratio > 0.7 and len(number_calls) > 2:
-            spoof_score += 2
-            reasons.append(f"High missed call ratio ({missed_ratio:.1%})")
-        
+        ((table['missed_ratio'] > 0.7) & (total > 2), 2,
+         lambda row: f"High missed call ratio ({row.missed_ratio:.1%})"),
         # Factor 4: Very short or zero duration calls
-        short_ratio = number_calls['is_short_call'].mean()
-        if short_ratio > 0.8 and len(number_calls) > 1:
-            spoof_score += 1
-            reasons.append(f"High short call ratio ({short_ratio:.1%})")
-        
+        ((table['short_ratio'] > 0.8) & (total > 1), 1,
+         lambda row: f"High short call ratio ({row.short_ratio:.1%})"),
         # Factor 5: Calls at unusual hours
-        night_ratio = number_calls['is_late_night'].mean()
-        if night_ratio > 0.5:
-            spoof_score += 1
-            reasons.append(f"Frequent late night calls ({night_ratio:.1%})")
-        
+        (table['night_ratio'] > 0.5, 1,
+         lambda row: f"Frequent late night calls ({row.night_ratio:.1%})"),
         # Factor 6: Hidden number presentation
-        if number_calls['is_hidden_number'].iloc[0] == 1:
-            spoof_score += 1
-            reasons.append("Hidden number presentation")
-        
+        (table['is_hidden_number'] == 1, 1, lambda row: "Hidden number presentation"),
         # Factor 7: Foreign number (if applicable)
-        if number_calls['is_foreign'].iloc[0] == 1:
-            spoof_score += 1
-            reasons.append("Foreign number")
-        
-        if spoof_score >= 3:  # Threshold for potential spoof
-            spoof_indicators.append({
-                'number': number,
-                'spoof_score': spoof_score,
-                'total_calls': len(number_calls),
-                'missed_calls': number_calls['is_missed_call'].sum(),
-                'avg_duration': number_calls['duration'].mean(),
-                'reasons': reasons,
-                'first_call': number_calls['parsed_date'].min(),
-                'last_call': number_calls['parsed_date'].max()
-            })
+        (table['is_foreign'] == 1, 1, lambda row: "Foreign number"),
+    ]
+    spoof_score = sum(mask.to_numpy().astype(int) * weight for mask, weight, _ in factors)
+    
+    spoof_indicators = []
+    for code in np.flatnonzero(spoof_score >= 3):  # Threshold for potential spoof
+        row = table.iloc[code]
+        reasons = [reason(row) for mask, _, reason in factors if reason and mask.iloc[code]]
+        spoof_indicators.append({
+            'number': table.index[code],
+            'spoof_score': int(spoof_score[code]),
+            'total_calls': int(row.total_calls),
+            'missed_calls': row.missed_calls,
+            'avg_duration': row.avg_duration,
+            'reasons': reasons,
+            'first_call': row.first_call,
+            'last_call': row.last_call
+        })
     
     return sorted(spoof_indicators, key=lambda x: x['spoof_score'], reverse=True)
 
-def generate_summary(df, patterns, spoof_calls):
+@tracing.traced()
+def generate_summary(df, patterns, spoof_calls, stats=None):
     """Generate comprehensive analysis summary"""
+    stats = stats or NumberStats(df)
     summary = {}
     
     # Basic statistics
     summary['total_calls'] = len(df)
-    summary['unique_numbers'] = df['number'].nunique()
+    summary['unique_numbers'] = len(stats.table)
     summary['known_contacts'] = df['is_known_contact'].sum()
     summary['unknown_numbers'] = df['is_unknown_number'].sum()
     summary['missed_calls'] = df['is_missed_call'].sum()
     summary['total_duration_hours'] = df['duration'].sum() / 3600
     
     # Call trends
-    summary['most_active_contacts'] = df[df['is_known_contact'] == 1]['name'].value_counts().head(10).to_dict()
-    summary['most_frequent_numbers'] = df['number'].value_counts().head(10).to_dict()
+    summary['most_active_contacts'] = top_counts(df[df['is_known_contact'] == 1]['name']).to_dict()
+    summary['most_frequent_numbers'] = top_counts(df['number']).to_dict()
     
     # Time patterns
     summary['calls_by_hour'] = df['call_hour'].value_counts().sort_index().to_dict()
-    summary['calls_by_day'] = df['day'].value_counts().head(10).to_dict()
+    summary['calls_by_day'] = top_counts(df['day']).to_dict()
     
     # Suspicious activity summary
     summary['suspicious_patterns'] = {
@@ -213,6 +303,42 @@ def compute_risk_score(row):
     if row["is_long_call"]: score += 1
     return score
 
+def analyse_number_shard(df):
+    """Per-number work for the numbers in ``df``: stats table, rapid callers, spoof calls and row risk scores"""
+    with tracing.stage("number_stats", rows_in=len(df)) as stage:
+        stats = NumberStats(df)
+        stage.rows_out = len(stats.table)
+    frequent_callers = find_frequent_callers(df, stats)
+    spoof_calls = detect_spoof_calls(df, stats)
+    with tracing.stage("compute_risk_score", rows_in=len(df)):
+        risk_scores = df.apply(compute_risk_score, axis=1)
+    return stats, frequent_callers, spoof_calls, risk_scores
+
+def analyse_numbers(df, pool=None):
+    """``analyse_number_shard`` over the whole frame, or over number-hash shards in the pool
+    
+    Every row of a number lands in the same shard, and the frame-wide features
+    (home region, per-day counts) are already columns of each row, so the
+    shard results merge back into exactly what one pass over ``df`` returns.
+    """
+    if pool is None:
+        return analyse_number_shard(df)
+    
+    with tracing.stage("number_shards", rows_in=len(df)) as stage:
+        results = pool.map(analyse_number_shard, shards.hash_shards(df, 'number', pool.shard_count))
+        stats = NumberStats.from_tables(df, [result[0].table for result in results])
+        stage.rows_out = len(stats.table)
+    
+    # Per-number lists in first-appearance order of the number, as a single pass yields them
+    position = {number: code for code, number in enumerate(stats.table.index)}
+    frequent_callers = sorted((caller for result in results for caller in result[1]),
+                              key=lambda caller: position[caller['number']])
+    spoof_calls = sorted((call for result in results for call in result[2]),
+                         key=lambda call: position[call['number']])
+    spoof_calls = sorted(spoof_calls, key=lambda x: x['spoof_score'], reverse=True)
+    risk_scores = pd.concat([result[3] for result in results]).reindex(df.index)
+    return stats, frequent_callers, spoof_calls, risk_scores
+
 def print_analysis_report(patterns, spoof_calls, summary):
     """Print detailed analysis report"""
     print("\n" + "="*80)
@@ -290,31 +416,35 @@ def print_analysis_report(patterns, spoof_calls, summary):
     
     print("\n" + "="*80)
 
-def process_call_log(file_path, output_dir, risk_threshold=5):
+def process_call_log(file_path, output_dir, risk_threshold=5, pool=None):
     print(f"[*] Loading: {file_path}")
     os.makedirs(output_dir, exist_ok=True)
-    df = pd.read_csv(file_path)
+    with tracing.stage("load") as stage:
+        df = columnar.read_table(file_path)
+        stage.rows_out = len(df)
     
     # Enrich features
     df = enrich_features(df)
     
-    # Detect patterns
+    # Detect patterns; the per-number detectors and risk scores run together, by number shard
     print("[*] Analyzing call patterns...")
-    patterns = detect_call_patterns(df)
+    stats, frequent_callers, spoof_calls, risk_scores = analyse_numbers(df, pool)
+    patterns = detect_call_patterns(df, stats, frequent_callers)
     
-    # Detect spoof calls
+    # Detect spoof calls (scored per number above)
     print("[*] Detecting potential spoof calls...")
-    spoof_calls = detect_spoof_calls(df)
     
     # Generate summary
     print("[*] Generating summary...")
-    summary = generate_summary(df, patterns, spoof_calls)
-    
-    # Compute risk scores
-    df["risk_score"] = df.apply(compute_risk_score, axis=1)
+    summary = generate_summary(df, patterns, spoof_calls, stats)
     
-    # Filter suspicious calls
-    suspicious = df[df["risk_score"] >= risk_threshold].sort_values("risk_score", ascending=False)
+    # Attach risk scores
+    with tracing.stage("filter_suspicious", rows_in=len(df)) as stage:
+        df["risk_score"] = risk_scores
+        
+        # Filter suspicious calls
+        suspicious = df[df["risk_score"] >= risk_threshold].sort_values("risk_score", ascending=False)
+        stage.rows_out = len(suspicious)
     
     # Print analysis report
     print_analysis_report(patterns, spoof_calls, summary)
@@ -343,78 +473,76 @@ def process_call_log(file_path, output_dir, risk_threshold=5):
         spoof_df.to_csv(os.path.join(output_dir, "potential_spoof_calls.csv"), index=False)
         print("[*] Potential spoof calls saved to potential_spoof_calls.csv")
     
-    # Save complete analyzed data to CSV
-    # Add spoof scores to main dataframe
-    spoof_score_dict = {item['number']: item['spoof_score'] for item in spoof_calls}
-    spoof_reasons_dict = {item['number']: '; '.join(item['reasons']) for item in spoof_calls}
-    
-    df['spoof_score'] = df['number'].map(spoof_score_dict).fillna(0)
-    df['spoof_reasons'] = df['number'].map(spoof_reasons_dict).fillna('')
-    df = df.sort_values(by='spoof_score', ascending=False)
+    with tracing.stage("build_complete_analysis", rows_in=len(df)) as stage:
+        # Save complete analyzed data to CSV
+        # Add spoof scores to main dataframe
+        spoof_score_dict = {item['number']: item['spoof_score'] for item in spoof_calls}
+        spoof_reasons_dict = {item['number']: '; '.join(item['reasons']) for item in spoof_calls}
+    
+        df['spoof_score'] = df['number'].map(spoof_score_dict).fillna(0)
+        df['spoof_reasons'] = df['number'].map(spoof_reasons_dict).fillna('')
+        df = df.sort_values(by='spoof_score', ascending=False)
+        # The frame keeps its positional index from enrich_features, so it maps rows to number codes
+        codes = stats.codes[df.index.to_numpy()]
 
     
-    # Add pattern indicators
-    frequent_caller_numbers = {caller['number'] for caller in patterns['frequent_callers']}
-    df['is_frequent_caller'] = df['number'].isin(frequent_caller_numbers).astype(int)
-    
-    very_short_numbers = set(patterns['very_short_calls']['numbers'].keys())
-    df['has_very_short_calls'] = df['number'].isin(very_short_numbers).astype(int)
-    
-    very_long_numbers = set(patterns['very_long_calls']['numbers'].keys())
-    df['has_very_long_calls'] = df['number'].isin(very_long_numbers).astype(int)
-    
-    night_caller_numbers = set(patterns['night_calls']['numbers'].keys())
-    df['is_night_caller'] = df['number'].isin(night_caller_numbers).astype(int)
-    
-    frequent_missed_numbers = set(patterns['frequent_missed_calls']['top_numbers'].keys())
-    df['has_frequent_missed'] = df['number'].isin(frequent_missed_numbers).astype(int)
-    
-    # Calculate per-number statistics
-    number_stats = df.groupby('number').agg({
-        'duration': ['count', 'mean', 'sum'],
-        'is_missed_call': 'sum',
-        'is_short_call': 'mean',
-        'is_incoming': 'sum',
-        'is_outgoing': 'sum'
-    }).round(2)
-    
-    number_stats.columns = ['total_calls_from_number', 'avg_duration_from_number', 
-                           'total_duration_from_number', 'total_missed_from_number',
-                           'short_call_ratio_from_number', 'incoming_calls_from_number',
-                           'outgoing_calls_from_number']
-    
-    df = df.merge(number_stats, left_on='number', right_index=True, how='left')
-    
-    # Define columns for complete analysis CSV - REMOVED 'date', 'day', and 'parsed_date' columns
-    complete_analysis_cols = [
-        # Original data columns (excluding 'date')
-        'number', 'name', 'duration', 'type', 'countryiso', 
-        'geocoded_location', 'presentation', 'formatted_number',
+        # Add pattern indicators
+        frequent_caller_numbers = {caller['number'] for caller in patterns['frequent_callers']}
+        df['is_frequent_caller'] = df['number'].isin(frequent_caller_numbers).astype("int8")
+    
+        very_short_numbers = set(patterns['very_short_calls']['numbers'].keys())
+        df['has_very_short_calls'] = df['number'].isin(very_short_numbers).astype("int8")
+    
+        very_long_numbers = set(patterns['very_long_calls']['numbers'].keys())
+        df['has_very_long_calls'] = df['number'].isin(very_long_numbers).astype("int8")
+    
+        night_caller_numbers = set(patterns['night_calls']['numbers'].keys())
+        df['is_night_caller'] = df['number'].isin(night_caller_numbers).astype("int8")
+    
+        frequent_missed_numbers = set(patterns['frequent_missed_calls']['top_numbers'].keys())
+        df['has_frequent_missed'] = df['number'].isin(frequent_missed_numbers).astype("int8")
+    
+        # Attach the per-number statistics by position rather than merging them in
+        for column, name in (('total_calls', 'total_calls_from_number'),
+                             ('avg_duration', 'avg_duration_from_number'),
+                             ('total_duration', 'total_duration_from_number'),
+                             ('missed_calls', 'total_missed_from_number'),
+                             ('short_ratio', 'short_call_ratio_from_number'),
+                             ('incoming_calls', 'incoming_calls_from_number'),
+                             ('outgoing_calls', 'outgoing_calls_from_number')):
+            df[name] = stats.table[column].round(2).to_numpy()[codes]
+    
+        # Define columns for complete analysis CSV - REMOVED 'date', 'day', and 'parsed_date' columns
+        complete_analysis_cols = [
+            # Original data columns (excluding 'date')
+            'number', 'name', 'duration', 'type', 'countryiso', 
+            'geocoded_location', 'presentation', 'formatted_number',
         
-        # Enriched features (excluding 'day' and 'parsed_date')
-        'call_hour', 'is_known_contact', 'is_zero_duration',
-        'is_short_call', 'is_long_call', 'is_late_night', 'is_foreign',
-        'is_hidden_number', 'is_unknown_number', 'is_missed_call',
-        'is_incoming', 'is_outgoing', 'short_unknown_calls_today',
+            # Enriched features (excluding 'day' and 'parsed_date')
+            'call_hour', 'is_known_contact', 'is_zero_duration',
+            'is_short_call', 'is_long_call', 'is_late_night', 'is_foreign',
+            'is_hidden_number', 'is_unknown_number', 'is_missed_call',
+            'is_incoming', 'is_outgoing', 'short_unknown_calls_today',
         
-        # Pattern indicators
-        'is_frequent_caller', 'has_very_short_calls', 'has_very_long_calls',
-        'is_night_caller', 'has_frequent_missed',
+            # Pattern indicators
+            'is_frequent_caller', 'has_very_short_calls', 'has_very_long_calls',
+            'is_night_caller', 'has_frequent_missed',
         
-        # Per-number statistics
-        'total_calls_from_number', 'avg_duration_from_number', 
-        'total_duration_from_number', 'total_missed_from_number',
-        'short_call_ratio_from_number', 'incoming_calls_from_number',
-        'outgoing_calls_from_number',
+            # Per-number statistics
+            'total_calls_from_number', 'avg_duration_from_number', 
+            'total_duration_from_number', 'total_missed_from_number',
+            'short_call_ratio_from_number', 'incoming_calls_from_number',
+            'outgoing_calls_from_number',
         
-        # Scoring
-        'risk_score', 'spoof_score', 'spoof_reasons'
-    ]
+            # Scoring
+            'risk_score', 'spoof_score', 'spoof_reasons'
+        ]
     
-    # Save complete analysis
-    available_cols = [col for col in complete_analysis_cols if col in df.columns]
-    df[available_cols].to_csv(os.path.join(output_dir, "complete_call_analysis.csv"), index=False)
-    print("[*] Complete analysis saved to complete_call_analysis.csv")
+        # Save complete analysis
+        available_cols = [col for col in complete_analysis_cols if col in df.columns]
+        df[available_cols].to_csv(os.path.join(output_dir, "complete_call_analysis.csv"), index=False)
+        print("[*] Complete analysis saved to complete_call_analysis.csv")
+        stage.rows_out = len(df)
     
     # Save summary report
     with open(os.path.join(output_dir, "call_analysis_summary.txt"), "w") as f:
@@ -444,11 +572,21 @@ def process_call_log(file_path, output_dir, risk_threshold=5):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python call.py <input_file> [output_dir]")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Analyse a call log export")
+    parser.add_argument("input_file", help="Call log export (.csv, .parquet or .arrow)")
+    parser.add_argument("output_dir", nargs="?", default="analysis_output",
+                        help="Directory for the output files (default: analysis_output)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the per-number detectors and risk scores (default: 1)")
+    args = parser.parse_args()
 
-    input_file = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "analysis_output"
-
-    process_call_log(input_file, os.path.join(output_dir, "calls"))
\ No newline at end of file
+    calls_output_dir = os.path.join(args.output_dir, "calls")
+    tracing.start_trace("call_analysis")
+    pool = shards.open_pool(args.workers)
+    try:
+        process_call_log(args.input_file, calls_output_dir, pool=pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        os.makedirs(calls_output_dir, exist_ok=True)
+        tracing.write_trace(os.path.join(calls_output_dir, tracing.TRACE_FILENAME))
@@ -1,17 +1,24 @@
+import argparse
 import json
 import csv
+import numpy as np
 import pandas as pd
 import re
 from urllib.parse import urlparse
 from pathlib import Path
 import sys
 import os
-import matplotlib.pyplot as plt
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from call_sms import campaigns, columnar, domains, phone, shards, tracing
 
 # -------------------------- #
 #  LOAD CONFIG FROM JSON   #
 # -------------------------- #
-CONFIG_PATH = Path(__file__).parent / "sms_config.json"
+# SMS_ANALYSER_CONFIG points at an alternative config (used by the benchmarks)
+CONFIG_PATH = Path(os.environ.get("SMS_ANALYSER_CONFIG", Path(__file__).parent / "sms_config.json"))
 if not CONFIG_PATH.exists():
     raise FileNotFoundError(f"Config file not found: {CONFIG_PATH}")
 
@@ -19,13 +26,37 @@ with open(CONFIG_PATH, 'r') as f:
     config = json.load(f)
 
 KEYWORDS_TO_SEARCH = config["keywords_to_search"]
+# Country the phone is registered in; numbers resolving elsewhere are foreign
+HOME_REGION = config.get("home_region", phone.DEFAULT_REGION)
 CATEGORIES = config["categories"]
 SUSPICIOUS_DOMAINS = config["suspicious_domains"]
+# A sender is bursting when it sends more than BURST_THRESHOLD messages within BURST_WINDOW_MINUTES
+BURST_THRESHOLD = config.get("burst_threshold", 5)
+BURST_WINDOW_MINUTES = config.get("burst_window_minutes", 10)
+# Near-duplicate clusters with at least this many messages are reported as campaigns
+CAMPAIGN_MIN_MESSAGES = config.get("campaign_min_messages", 3)
+# Optional blocklist feed file(s), one domain per line, relative to the config file
+DOMAIN_FEEDS = domains.feed_paths(CONFIG_PATH)
+DOMAIN_BLOCKLIST = domains.DomainMatcher.from_sources(SUSPICIOUS_DOMAINS, DOMAIN_FEEDS)
 
 # Will be set inside main
 OUTPUT_DIR = None
 OUTPUT_FILES = {}
 
+# Columns the row-level stages read; only these are sent to the worker processes
+SHARD_COLUMNS = ["date", "address", "body"]
+
+def map_shards(func, df, pool, *args):
+    """Run a row-level stage in this process, or over contiguous row shards in the pool"""
+    if pool is None:
+        return [func(df, *args)]
+    return pool.map(func, shards.row_shards(df[SHARD_COLUMNS], pool.shard_count), *args)
+
+def concat_shards(results):
+    """Concatenate per-shard DataFrames in shard order, skipping shards that produced nothing"""
+    results = [result for result in results if not result.empty]
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
 # -------------------------- #
 #  ANALYSIS FUNCTIONS      #
 # -------------------------- #
@@ -39,11 +70,33 @@ def set_output_paths(base_output_dir):
         "categorized": OUTPUT_DIR / "categorized_messages.csv",
         "urls": OUTPUT_DIR / "url_analysis.csv",
         "anomalies": OUTPUT_DIR / "anomalies.csv",
-        "keyword_combined": OUTPUT_DIR / "keyword_matches.csv"
+        "keyword_combined": OUTPUT_DIR / "keyword_matches.csv",
+        "campaigns": OUTPUT_DIR / "campaigns.csv"
     }
 
-def categorize_messages(df):
-    print("\n📂 Categorizing messages...")
+@tracing.traced()
+def load_messages(file_path):
+    """Load an SMS export (CSV, Parquet or Arrow) with text-compatible columns"""
+    df = columnar.read_table(file_path)
+
+    for col in ("address", "body", "type"):
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+
+    # Columnar exports keep raw epoch milliseconds; render them like the CSV export
+    if "date" in df.columns and pd.api.types.is_numeric_dtype(df["date"]):
+        df["date"] = columnar.epoch_ms_to_local(df["date"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    return df
+
+@tracing.traced()
+def flag_foreign_numbers(df):
+    """Add ``is_foreign_number`` (0/1) from the sender's E.164 country; sender IDs are never foreign"""
+    region = phone.normalize_series(df['address'], HOME_REGION)["region"]
+    df['is_foreign_number'] = region.fillna(HOME_REGION).ne(HOME_REGION).astype(int)
+    return df
+
+def _categorize_rows(df):
     categorized = []
 
     for _, row in df.iterrows():
@@ -61,13 +114,25 @@ def categorize_messages(df):
             "Category": category
         })
 
-    df_cat = pd.DataFrame(categorized)
+    return pd.DataFrame(categorized)
+
+@tracing.traced()
+def categorize_messages(df, pool=None):
+    print("\n📂 Categorizing messages...")
+    df_cat = concat_shards(map_shards(_categorize_rows, df, pool))
+    tracing.count_rows(len(df_cat))
     df_cat.to_csv(OUTPUT_FILES["categorized"], index=False)
     print(f" Categorized messages saved to {OUTPUT_FILES['categorized']}")
+def _value_counts(data, column):
+    """Accept either the output DataFrame or precomputed {value: count} counts"""
+    if isinstance(data, pd.DataFrame):
+        return data[column].value_counts()
+    return pd.Series(data, dtype="int64").sort_values(ascending=False)
+
 def create_category_pie_chart(df_categorized):
     import matplotlib.pyplot as plt
 
-    category_counts = df_categorized['Category'].value_counts()
+    category_counts = _value_counts(df_categorized, 'Category')
     labels = category_counts.index
     sizes = category_counts.values
     total = sum(sizes)
@@ -87,43 +152,109 @@ def create_category_pie_chart(df_categorized):
 
 
 
-def analyze_urls(df):
+def describe_url(url):
+    """(Domain, Suspicious, Category) of one distinct URL"""
+    domain = urlparse(url).netloc
+    suspicious = DOMAIN_BLOCKLIST.match_url(url) is not None
+    category = "Banking" if "bank" in domain.lower() else "Promotional"
+    return domain, "Yes" if suspicious else "No", category
+
+def _url_rows(df):
+    bodies = df['body'].map(str).reset_index(drop=True)
+    found = bodies.str.findall(domains.URL_PATTERN)
+    urls = found[found.str.len() > 0].explode()
+    if urls.empty:
+        return pd.DataFrame()
+
+    # Each distinct URL is parsed and matched once, however many messages repeat it
+    described = {url: describe_url(url) for url in urls.unique()}
+    rows = urls.index.to_numpy()
+    domain, suspicious, category = zip(*(described[url] for url in urls))
+    return pd.DataFrame({
+        "Date": df['date'].to_numpy()[rows],
+        "Sender": df['address'].to_numpy()[rows],
+        "Message": bodies.str[:100].to_numpy()[rows],
+        "URL": urls.to_numpy(),
+        "Domain": domain,
+        "Suspicious": suspicious,
+        "Category": category
+    })
+
+@tracing.traced()
+def analyze_urls(df, pool=None):
     print("\n🔗 Analyzing URLs...")
-    url_data = []
-
-    for _, row in df.iterrows():
-        urls = re.findall(r"https?://[^\s]+", str(row['body']))
-        for url in urls:
-            domain = urlparse(url).netloc
-            suspicious = any(s in domain for s in SUSPICIOUS_DOMAINS)
-            category = "Banking" if "bank" in domain.lower() else "Promotional"
-
-            url_data.append({
-                "Date": row['date'],
-                "Sender": row['address'],
-                "Message": str(row['body'])[:100],
-                "URL": url,
-                "Domain": domain,
-                "Suspicious": "Yes" if suspicious else "No",
-                "Category": category
-            })
+    df_url = concat_shards(map_shards(_url_rows, df, pool))
 
-    if url_data:
-        df_url = pd.DataFrame(url_data)
+    if not df_url.empty:
+        tracing.count_rows(len(df_url))
         df_url.to_csv(OUTPUT_FILES["urls"], index=False)
         print(f"URL analysis saved to {OUTPUT_FILES['urls']}")
     else:
         print("No URLs found in messages.")
 
 
-def detect_anomalies(df):
-    print("\n Detecting anomalies...")
+def parse_message_dates(values):
+    """Timestamps of the formatted message dates; unparseable ones ("Unknown") become NaT"""
+    parsed = pd.to_datetime(values, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    retry = parsed.isna() & values.notna() & values.ne("Unknown")
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format="mixed", errors="coerce")
+    return parsed
+
+@tracing.traced()
+def detect_sender_bursts(df, threshold=None, window_minutes=None):
+    """Senders with more than ``threshold`` messages inside any ``window_minutes`` window
+
+    Messages are sorted once by (sender, time); every message then finds the
+    start of its trailing window with one vectorized searchsorted, so the
+    whole pass is O(n log n). Returns one row per bursting sender with its
+    busiest window, busiest first.
+    """
+    threshold = BURST_THRESHOLD if threshold is None else threshold
+    window_minutes = BURST_WINDOW_MINUTES if window_minutes is None else window_minutes
+    columns = ["sender", "messages", "window_start", "window_end"]
+
+    dates = parse_message_dates(df['date'])
+    known = dates.notna().to_numpy()
+    codes, senders = pd.factorize(df['address'].to_numpy()[known])
+    if len(codes) == 0:
+        return pd.DataFrame(columns=columns)
+    seconds = dates.to_numpy()[known].astype("datetime64[s]").astype(np.int64)
+
+    order = np.lexsort((seconds, codes))
+    codes, seconds = codes[order], seconds[order]
+    # Lay the senders out end to end on one axis, each further apart than a window,
+    # so a single searchsorted never reaches into the previous sender's messages
+    window = int(window_minutes * 60)
+    seconds = seconds - seconds.min()
+    span = int(seconds.max()) + window + 1
+    key = codes.astype(np.int64) * span + seconds
+    in_window = np.arange(len(key)) - np.searchsorted(key, key - window, side="left") + 1
+
+    # Busiest window per sender (the earliest one on ties)
+    best = pd.Series(in_window).groupby(codes, sort=False).idxmax().to_numpy()
+    best = best[in_window[best] > threshold]
+    bursts = pd.DataFrame({
+        "sender": senders[codes[best]],
+        "messages": in_window[best],
+        "window_start": dates.to_numpy()[known][order][best - in_window[best] + 1],
+        "window_end": dates.to_numpy()[known][order][best],
+    }, columns=columns)
+    bursts = bursts.sort_values("messages", ascending=False, kind="stable").reset_index(drop=True)
+    tracing.count_rows(len(bursts))
+    return bursts
+
+def _suspicious_link_rows(df):
     anomalies = []
+    # Templated messages repeat; look each distinct body up in the blocklist once
+    linked_bodies = {}
 
     for _, row in df.iterrows():
         body = str(row['body']).lower()
         has_money = "rs." in body or "sent" in body or "debited" in body
-        suspicious_link = any(domain in body for domain in SUSPICIOUS_DOMAINS)
+        if has_money and body not in linked_bodies:
+            linked_bodies[body] = DOMAIN_BLOCKLIST.search(body) is not None
+        suspicious_link = has_money and linked_bodies[body]
 
         if has_money and suspicious_link:
             anomalies.append({
@@ -133,44 +264,108 @@ def detect_anomalies(df):
                 "Reason": "Financial + Suspicious URL"
             })
 
-    senders = df['address'].value_counts()
-    frequent_senders = senders[senders > 5]
-    for sender in frequent_senders.index:
+    return anomalies
+
+@tracing.traced()
+def detect_anomalies(df, pool=None):
+    print("\n Detecting anomalies...")
+    anomalies = [row for rows in map_shards(_suspicious_link_rows, df, pool) for row in rows]
+
+    # Sender-level checks need every message of a sender and run over the whole frame
+    for burst in detect_sender_bursts(df).itertuples(index=False):
         anomalies.append({
-            "Date": "N/A",
-            "Sender": sender,
-            "Message": f"{senders[sender]} messages from sender",
-            "Reason": "High frequency sender"
+            "Date": burst.window_start.strftime("%Y-%m-%d %H:%M:%S"),
+            "Sender": burst.sender,
+            "Message": f"{burst.messages} messages within {BURST_WINDOW_MINUTES} minutes",
+            "Reason": "Message burst"
         })
 
+    if 'is_foreign_number' in df.columns:
+        foreign_senders = df.loc[df['is_foreign_number'] == 1, 'address'].value_counts()
+        for sender, count in foreign_senders.items():
+            anomalies.append({
+                "Date": "N/A",
+                "Sender": sender,
+                "Message": f"{count} messages from foreign number",
+                "Reason": "Foreign sender"
+            })
+
     if anomalies:
         df_anom = pd.DataFrame(anomalies)
+        tracing.count_rows(len(df_anom))
         df_anom.to_csv(OUTPUT_FILES["anomalies"], index=False)
         print(f" Anomalies saved to {OUTPUT_FILES['anomalies']}")
     else:
         print("No suspicious anomalies detected.")
 
 
-def search_keywords(df, keywords):
-    print(f"\n Searching for keywords: {', '.join(keywords)}")
+@tracing.traced()
+def cluster_campaigns(df):
+    print("\n Clustering campaigns...")
+    labels, texts = campaigns.cluster_texts(df['body'])
+    clustered = pd.DataFrame({
+        "campaign": labels,
+        "text": texts,
+        "sender": df['address'].to_numpy(),
+        "date": parse_message_dates(df['date']).to_numpy(),
+        "body": df['body'].to_numpy(),
+    })
+    clustered = clustered[clustered["campaign"] >= 0]
+
+    groups = clustered.groupby("campaign", sort=False)
+    summary = groups.agg(Messages=("sender", "size"), Senders=("sender", "nunique"),
+                         FirstSeen=("date", "min"), LastSeen=("date", "max"))
+    summary = summary[summary["Messages"] >= CAMPAIGN_MIN_MESSAGES]
+
+    if summary.empty:
+        print("No campaigns detected.")
+        return
+
+    # Representative: the campaign's most repeated (normalised) text, as first received
+    text_counts = clustered.groupby(["campaign", "text"], sort=False).size()
+    top_text = text_counts.groupby(level="campaign", sort=False).idxmax().loc[summary.index]
+    first_body = clustered.drop_duplicates("text").set_index("text")["body"]
+    summary["Representative"] = first_body.loc[[text for _, text in top_text]].str[:100].to_numpy()
+
+    summary = summary.sort_values(["Messages", "Senders"], ascending=False, kind="stable")
+    summary.insert(0, "Campaign", range(1, len(summary) + 1))
+    for col in ("FirstSeen", "LastSeen"):
+        summary[col] = summary[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    tracing.count_rows(len(summary))
+    summary.to_csv(OUTPUT_FILES["campaigns"], index=False)
+    print(f" Campaigns saved to {OUTPUT_FILES['campaigns']}")
+
+
+def _keyword_rows(df, keywords):
     results = []
 
-    for keyword in keywords:
+    for position, keyword in enumerate(keywords):
         pattern = re.compile(fr"\b{keyword}s?\b", re.IGNORECASE)
         matches = df[df['body'].str.contains(pattern, na=False)]
 
-        if not matches.empty:
-            for _, row in matches.iterrows():
-                results.append({
-                    "Date": row['date'],
-                    "Sender": row['address'],
-                    "Message": row['body'][:100],
-                    "MatchedKeyword": keyword
-                })
-            print(f" Found {len(matches)} messages for keyword '{keyword}'")
-
-    if results:
-        df_out = pd.DataFrame(results)
+        for _, row in matches.iterrows():
+            results.append({
+                "Date": row['date'],
+                "Sender": row['address'],
+                "Message": row['body'][:100],
+                "MatchedKeyword": keyword,
+                "_keyword": position
+            })
+
+    return pd.DataFrame(results)
+
+@tracing.traced()
+def search_keywords(df, keywords, pool=None):
+    print(f"\n Searching for keywords: {', '.join(keywords)}")
+    df_out = concat_shards(map_shards(_keyword_rows, df, pool, keywords))
+
+    if not df_out.empty:
+        # Keyword-major like a serial run; shards are already in row order within a keyword
+        df_out = df_out.sort_values("_keyword", kind="stable")
+        for position, count in df_out["_keyword"].value_counts(sort=False).sort_index().items():
+            print(f" Found {count} messages for keyword '{keywords[position]}'")
+        df_out = df_out.drop(columns="_keyword")
+        tracing.count_rows(len(df_out))
         df_out.to_csv(OUTPUT_FILES["keyword_combined"], index=False, quoting=csv.QUOTE_ALL)
         print(f"✅ All keyword matches saved to {OUTPUT_FILES['keyword_combined']}")
     else:
@@ -178,7 +373,7 @@ def search_keywords(df, keywords):
 def create_keyword_pie_chart(df_keywords):
     import matplotlib.pyplot as plt
 
-    keyword_counts = df_keywords['MatchedKeyword'].value_counts()
+    keyword_counts = _value_counts(df_keywords, 'MatchedKeyword')
     labels = keyword_counts.index
     sizes = keyword_counts.values
     total = sum(sizes)
@@ -196,26 +391,37 @@ def create_keyword_pie_chart(df_keywords):
 # -------------------------- #
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python sms.py <sms_logs.csv> [output_dir]")
-        sys.exit(1)
-
-    input_file = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "analysis_output"
-
-    set_output_paths(os.path.join(output_dir, "sms"))
-
-    df = pd.read_csv(input_file)
-    print("\n✅ File loaded successfully.")
-    print("Total messages:", len(df))
-
-    # Clean up the DataFrame
-    df['body'] = df['body'].fillna("").astype(str)
-    df['address'] = df['address'].fillna("Unknown")
-    df['date'] = df['date'].fillna("Unknown")
-
-    # Run all tasks
-    categorize_messages(df)
-    analyze_urls(df)
-    detect_anomalies(df)
-    search_keywords(df, KEYWORDS_TO_SEARCH)
+    parser = argparse.ArgumentParser(description="Analyse an SMS export")
+    parser.add_argument("input_file", help="SMS export (.csv, .parquet or .arrow)")
+    parser.add_argument("output_dir", nargs="?", default="analysis_output",
+                        help="Directory for the output CSVs (default: analysis_output)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for categorization, URL extraction and keyword matching (default: 1)")
+    args = parser.parse_args()
+
+    set_output_paths(os.path.join(args.output_dir, "sms"))
+    tracing.start_trace("sms_analysis")
+    pool = shards.open_pool(args.workers)
+
+    try:
+        df = load_messages(args.input_file)
+        print("\n✅ File loaded successfully.")
+        print("Total messages:", len(df))
+
+        # Clean up the DataFrame
+        with tracing.stage("clean", rows_in=len(df)):
+            df['body'] = df['body'].fillna("").astype(str)
+            df['address'] = df['address'].fillna("Unknown")
+            df['date'] = df['date'].fillna("Unknown")
+
+        # Run all tasks
+        flag_foreign_numbers(df)
+        categorize_messages(df, pool)
+        analyze_urls(df, pool)
+        detect_anomalies(df, pool)
+        cluster_campaigns(df)
+        search_keywords(df, KEYWORDS_TO_SEARCH, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        tracing.write_trace(OUTPUT_DIR / tracing.TRACE_FILENAME)
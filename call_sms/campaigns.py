@@ -0,0 +1,145 @@
+"""Near-duplicate message clustering with MinHash and LSH.
+
+Scam campaigns send one template with small variations (amounts, links,
+names, reference numbers) from many senders.  ``cluster_texts`` groups such
+messages without comparing every pair:
+
+1. each body is normalised (lower-case, URLs and digit runs collapsed) and
+   only distinct normalised bodies go further;
+2. every body becomes a set of character shingles, hashed for all bodies at
+   once with a rolling hash over one concatenated byte buffer;
+3. ``num_perm`` multiply-add-shift hash functions give each body a MinHash
+   signature, computed one permutation at a time over the whole shingle
+   array with ``np.minimum.reduceat``;
+4. signatures are cut into ``bands``; bodies sharing a band land in the same
+   bucket, are checked against the bucket's first member, and the surviving
+   links are merged into clusters by connected components.
+
+With the default 64 permutations in 16 bands of 4, pairs above ~0.5
+Jaccard similarity are found with high probability.  Everything after
+normalisation is vectorized NumPy, so millions of messages cluster in
+minutes on one core.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.5
+SEED = 1
+
+_SHIFT = np.uint64(32)
+_URL = r"(?:https?://|www\.)\S+"
+
+
+def normalize_texts(values):
+    """Lower-case the texts and collapse URLs, digit runs and punctuation so template variants match."""
+    import pandas as pd
+
+    texts = pd.Series(values, dtype=object).fillna("").astype(str).str.lower()
+    texts = texts.str.replace(_URL, " url ", regex=True)
+    texts = texts.str.replace(r"\d+", "0", regex=True)
+    texts = texts.str.replace(r"[^\w]+", " ", regex=True).str.strip()
+    return texts.to_numpy(dtype=object)
+
+
+def shingle_hashes(texts, size: int = SHINGLE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """32-bit hashes of every ``size``-byte shingle, and the offset of each text's first shingle.
+
+    Texts shorter than a shingle contribute a single (zero-padded) shingle, so
+    every text has at least one.
+    """
+    encoded = [text.encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+    # Texts are separated by ``size`` zero bytes so no shingle spans two texts
+    starts = np.concatenate(([0], np.cumsum(lengths + size)[:-1])).astype(np.int64)
+    buffer = np.frombuffer(b"".join(data + b"\0" * size for data in encoded), dtype=np.uint8)
+
+    counts = np.maximum(lengths - size + 1, 1)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    positions = np.repeat(starts - offsets, counts) + np.arange(counts.sum(), dtype=np.int64)
+
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for j in range(size):
+        hashes = hashes * np.uint64(257) + buffer[positions + j]
+    # Fibonacci mixing down to 32 bits, the input width of the multiply-add-shift hashes below
+    hashes = (hashes * np.uint64(0x9E3779B97F4A7C15)) >> _SHIFT
+    return hashes, offsets
+
+
+def minhash_signatures(texts, num_perm: int = NUM_PERM, size: int = SHINGLE_SIZE,
+                       seed: int = SEED, batch: int = 4_000_000) -> np.ndarray:
+    """(len(texts), num_perm) uint32 MinHash signatures of the texts' shingle sets."""
+    # Multiply-add-shift hashing (a odd, 64-bit arithmetic wrapping), top 32 bits kept
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    start = 0
+    while start < len(texts):
+        # Grow the batch by texts until it holds about ``batch`` bytes of shingles
+        stop, budget = start, 0
+        while stop < len(texts) and (budget < batch or stop == start):
+            budget += len(texts[stop]) + 1
+            stop += 1
+        hashes, offsets = shingle_hashes(texts[start:stop], size)
+        for perm in range(num_perm):
+            values = (a[perm] * hashes + b[perm]) >> _SHIFT
+            signatures[start:stop, perm] = np.minimum.reduceat(values, offsets)
+        start = stop
+    return signatures
+
+
+def _components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Connected-component label (smallest member index) of each of ``n`` nodes."""
+    labels = np.arange(n)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, left, labels[right])
+        np.minimum.at(updated, right, labels[left])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def lsh_clusters(signatures: np.ndarray, bands: int = BANDS, threshold: float = THRESHOLD) -> np.ndarray:
+    """Cluster label of each signature; near-duplicates share the label of their smallest index."""
+    import pandas as pd
+
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    left, right = [], []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        key = block[:, 0]
+        for col in range(1, rows):
+            key = (key * np.uint64(0x100000001B3)) ^ block[:, col]
+        buckets, _ = pd.factorize(key)
+        first = np.unique(buckets, return_index=True)[1][buckets]
+        # Link each member to the bucket's first member when their signatures agree overall
+        candidates = np.flatnonzero(first != np.arange(n))
+        similar = (signatures[candidates] == signatures[first[candidates]]).mean(axis=1) >= threshold
+        left.append(candidates[similar])
+        right.append(first[candidates[similar]])
+    return _components(n, np.concatenate(left), np.concatenate(right))
+
+
+def cluster_texts(values, num_perm: int = NUM_PERM, bands: int = BANDS, threshold: float = THRESHOLD,
+                  size: int = SHINGLE_SIZE, seed: int = SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """Cluster label per message (-1 for empty texts) and the normalised-text code of each message."""
+    import pandas as pd
+
+    codes, distinct = pd.factorize(normalize_texts(values))
+    labels = np.full(len(codes), -1)
+    keep = np.flatnonzero(pd.Series(distinct, dtype=object).str.len().to_numpy() > 0)
+    if len(keep):
+        signatures = minhash_signatures(distinct[keep], num_perm, size, seed)
+        text_labels = np.full(len(distinct), -1)
+        text_labels[keep] = keep[lsh_clusters(signatures, bands, threshold)]
+        labels = text_labels[codes]
+    return labels, codes
@@ -0,0 +1,173 @@
+"""Columnar (Parquet / Arrow IPC) export and loading for scraper outputs.
+
+Scrapers hand over rows as ``dict[str, str]`` exactly as ``adb content query``
+returned them; here they are converted once into typed Arrow columns
+(int64 epoch-ms timestamps, nullable ints, dictionary-encoded categoricals)
+so that analysers can load a large export without re-parsing strings.
+
+``pyarrow`` is only required when a columnar format is actually used.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+COLUMNAR_SUFFIXES = PARQUET_SUFFIXES + ARROW_SUFFIXES
+
+NULL_TOKENS = {"", "null", "NULL", "(null)", "None"}
+
+# Columns of content://call_log/calls and content://sms holding integers.
+# Timestamps stay int64 epoch milliseconds.
+CALL_INT_COLUMNS = {
+    "_id", "_row_id", "date", "duration", "type", "presentation", "new",
+    "is_read", "features", "data_usage", "last_modified", "missed_reason",
+    "block_reason", "numbertype", "priority",
+}
+CALL_CATEGORY_COLUMNS = {
+    "countryiso", "geocoded_location", "subscription_component_name",
+    "phone_account_address", "numberlabel", "name",
+}
+
+SMS_INT_COLUMNS = {
+    "id", "_id", "thread_id", "date", "date_sent", "status", "locked", "sub_id",
+}
+SMS_CATEGORY_COLUMNS = {"type", "address"}
+SMS_BOOL_COLUMNS = {"read"}
+
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+
+def is_columnar_path(path) -> bool:
+    return Path(path).suffix.lower() in COLUMNAR_SUFFIXES
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet/Arrow export requires pyarrow (pip install pyarrow)"
+        ) from exc
+    return pa
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if text in NULL_TOKENS:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return int(float(text))
+        except ValueError:
+            return None
+
+
+def _to_bool(value) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in {"1", "true", "yes"}:
+        return True
+    if text in {"0", "false", "no"}:
+        return False
+    return None
+
+
+def _to_str(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value)
+    return None if text in NULL_TOKENS else text
+
+
+def records_to_table(records: List[Dict], keys: Iterable[str],
+                     int_columns=frozenset(), category_columns=frozenset(),
+                     bool_columns=frozenset()):
+    """Build a typed ``pyarrow.Table`` from a list of string records."""
+    pa = _require_pyarrow()
+
+    columns = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        if key in int_columns:
+            columns[key] = pa.array([_to_int(v) for v in values], type=pa.int64())
+        elif key in bool_columns:
+            columns[key] = pa.array([_to_bool(v) for v in values], type=pa.bool_())
+        elif key in category_columns:
+            columns[key] = pa.array([_to_str(v) for v in values], type=pa.string()).dictionary_encode()
+        else:
+            columns[key] = pa.array([_to_str(v) for v in values], type=pa.string())
+
+    return pa.table(columns)
+
+
+def write_table(table, path) -> None:
+    """Write an Arrow table as Parquet or Arrow IPC, chosen by file suffix."""
+    pa = _require_pyarrow()
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression="zstd")
+    elif suffix in ARROW_SUFFIXES:
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError(f"Not a columnar output path: {path}")
+
+
+def write_records(records: List[Dict], keys: Iterable[str], path, **column_types) -> None:
+    write_table(records_to_table(records, keys, **column_types), path)
+
+
+def read_table(path):
+    """Load a CSV, Parquet or Arrow IPC export into a DataFrame.
+
+    Columnar files keep their dtypes: int64 columns with nulls come back as
+    nullable ``Int64`` and dictionary columns as ``category``.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix not in COLUMNAR_SUFFIXES:
+        return pd.read_csv(path)
+
+    pa = _require_pyarrow()
+    if suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    else:
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+
+    nullable = {
+        pa.int64(): pd.Int64Dtype(),
+        pa.int32(): pd.Int32Dtype(),
+        pa.bool_(): pd.BooleanDtype(),
+    }
+    return table.to_pandas(types_mapper=nullable.get)
+
+
+def epoch_ms_to_local(values):
+    """Convert an epoch-millisecond Series to naive local datetimes.
+
+    Matches the local-time rendering the scrapers use for their CSV output.
+    """
+    import pandas as pd
+
+    parsed = pd.to_datetime(values, unit="ms", errors="coerce", utc=True)
+    return parsed.dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
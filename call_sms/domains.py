@@ -0,0 +1,152 @@
+"""Domain blocklist matching for URLs found in messages.
+
+A blocklist entry such as ``bit.ly`` should flag ``bit.ly`` and
+``x.bit.ly`` but not ``notbit.ly.com``, and an entry such as ``.xyz`` should
+flag every host under that TLD.  ``DomainMatcher`` stores the entries in a
+trie keyed on reversed labels (``ly`` -> ``bit``), so a lookup walks the
+host's labels from the TLD inwards and costs the same whether the blocklist
+has five entries or a few hundred thousand.
+
+Entries come from the analyser config and, optionally, from feed files with
+one domain per line (``feed_paths`` resolves them, for the analyser and for
+the app's cache key); hosts-file lines (``0.0.0.0 bad.example``) and ``#``
+comments are accepted, so most public blocklists load as they are.
+
+``host_of`` and ``DomainMatcher.match`` are memoised per distinct value, so a
+dump that repeats the same short link thousands of times parses it once.
+"""
+
+import functools
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+URL_PATTERN = re.compile(r"https?://[^\s]+")
+# Bare host names in free text ("bit.ly/abc", "kyc-update.xyz"), with or without a scheme
+HOST_PATTERN = re.compile(r"(?<![\w.-])(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z][a-z0-9-]*[a-z0-9]",
+                          re.IGNORECASE)
+
+
+def feed_paths(config_path) -> List[Path]:
+    """Feed files named by an analyser config's ``suspicious_domains_file``, relative to the config."""
+    config_path = Path(config_path)
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            feeds = json.load(f).get("suspicious_domains_file") or []
+    except (OSError, ValueError):
+        return []
+    if isinstance(feeds, str):
+        feeds = [feeds]
+    return [config_path.parent / feed for feed in feeds]
+
+
+def normalize_host(host: str) -> str:
+    """Lower-case a host name, drop the trailing dot and encode IDNs to punycode."""
+    host = host.strip().lower().rstrip(".")
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    return host
+
+
+@functools.lru_cache(maxsize=65536)
+def host_of(url: str) -> str:
+    """Normalised host of a URL, without userinfo or port ("" when it has none)."""
+    try:
+        host = urlparse(url).hostname
+    except ValueError:
+        # Malformed netloc such as an unclosed IPv6 bracket
+        host = urlparse(url).netloc.rpartition("@")[2].partition(":")[0]
+    return normalize_host(host or "")
+
+
+def _labels(entry: str) -> List[str]:
+    """Reversed labels of a blocklist entry; "*.bad.example" and ".bad.example" mean the same."""
+    entry = entry.strip()
+    if "://" in entry:
+        entry = host_of(entry)
+    entry = normalize_host(entry.split("/", 1)[0]).lstrip("*").lstrip(".")
+    return [label for label in reversed(entry.split(".")) if label]
+
+
+class DomainMatcher:
+    """Reversed-label suffix trie; a host matches an entry equal to it or to one of its parent domains."""
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self.root: Dict[Optional[str], dict] = {}
+        self.size = 0
+        self._matches: Dict[str, Optional[str]] = {}
+        self.update(entries)
+
+    def add(self, entry: str) -> None:
+        labels = _labels(entry)
+        if not labels:
+            return
+        node = self.root
+        for label in labels:
+            node = node.setdefault(label, {})
+        if None not in node:
+            self.size += 1
+        node[None] = entry.strip()
+        self._matches.clear()
+
+    def update(self, entries: Iterable[str]) -> None:
+        for entry in entries:
+            self.add(entry)
+
+    def load(self, path) -> int:
+        """Add the entries of a feed file; returns how many lines were read as entries."""
+        count = 0
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.split("#", 1)[0].split()
+                if line:
+                    # hosts-file lines put the address first and the domain last
+                    self.add(line[-1])
+                    count += 1
+        return count
+
+    def match(self, host: str) -> Optional[str]:
+        """The broadest blocklist entry covering ``host``, or None."""
+        try:
+            return self._matches[host]
+        except KeyError:
+            pass
+        entry, node = None, self.root
+        for label in reversed(normalize_host(host).split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            if None in node:
+                entry = node[None]
+                break
+        self._matches[host] = entry
+        return entry
+
+    def match_url(self, url: str) -> Optional[str]:
+        return self.match(host_of(url))
+
+    def search(self, text: str) -> Optional[str]:
+        """The first blocklisted host named anywhere in free text, or None."""
+        for host in HOST_PATTERN.findall(text):
+            entry = self.match(host)
+            if entry is not None:
+                return entry
+        return None
+
+    def __contains__(self, host: str) -> bool:
+        return self.match(host) is not None
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def from_sources(cls, entries: Iterable[str] = (), files: Iterable = ()) -> "DomainMatcher":
+        matcher = cls(entries)
+        for path in files:
+            matcher.load(Path(path))
+        return matcher
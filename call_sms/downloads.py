@@ -0,0 +1,81 @@
+"""On-demand download artifacts for a session's analysis outputs.
+
+Nothing here runs while a page renders: the Streamlit download buttons get
+callables that build (or reuse) the artifact only when the user clicks.
+Zips and gzip copies are written to disk in fixed-size chunks, so large
+CSVs are never held in memory in full.  Built artifacts live in a
+``_downloads`` folder inside the session directory and are rebuilt only
+when one of their sources has changed.
+"""
+
+import gzip
+import os
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+DOWNLOADS_DIRNAME = "_downloads"
+COPY_CHUNK_SIZE = 1024 * 1024
+# Working files that are not part of the analysis results
+EXCLUDED_SUFFIXES = {".db", ".db-journal", ".db-wal", ".db-shm"}
+
+
+def iter_output_files(source_dir) -> Iterator[Path]:
+    source_dir = Path(source_dir)
+    for path in sorted(source_dir.rglob("*")):
+        if not path.is_file():
+            continue
+        if DOWNLOADS_DIRNAME in path.relative_to(source_dir).parts:
+            continue
+        if path.suffix in EXCLUDED_SUFFIXES:
+            continue
+        yield path
+
+
+def _is_fresh(artifact: Path, sources) -> bool:
+    if not artifact.exists():
+        return False
+    built = artifact.stat().st_mtime
+    return all(source.stat().st_mtime <= built for source in sources)
+
+
+def _publish(tmp_path: Path, dest: Path) -> Path:
+    os.replace(tmp_path, dest)
+    return dest
+
+
+def build_zip(source_dir, zip_name: str = "analysis_results.zip") -> Path:
+    """Zip every output under ``source_dir``, streaming each file in chunks."""
+    source_dir = Path(source_dir)
+    out_dir = source_dir / DOWNLOADS_DIRNAME
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dest = out_dir / zip_name
+
+    sources = list(iter_output_files(source_dir))
+    if _is_fresh(dest, sources):
+        return dest
+
+    tmp_path = dest.with_suffix(".tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path in sources:
+            arcname = path.relative_to(source_dir).as_posix()
+            with open(path, "rb") as src, zf.open(arcname, "w", force_zip64=True) as dst:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+    return _publish(tmp_path, dest)
+
+
+def gzip_file(path, downloads_dir) -> Path:
+    """Return a gzip-compressed copy of ``path`` under ``downloads_dir``."""
+    path = Path(path)
+    out_dir = Path(downloads_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dest = out_dir / (path.name + ".gz")
+
+    if _is_fresh(dest, [path]):
+        return dest
+
+    tmp_path = dest.with_suffix(".tmp")
+    with open(path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+    return _publish(tmp_path, dest)
@@ -0,0 +1,317 @@
+"""Background job runner for long-running extractions and analyses.
+
+Jobs are rows in a SQLite table; a process pool executes them by running
+the scraper/analyser scripts as subprocesses and streaming their output
+back into the ``job_logs`` table line by line.  Because all state lives in
+SQLite, the Streamlit UI can poll jobs from any rerun or browser session
+and a job keeps running while the user is on another tab.
+
+Progress is estimated from marker lines the scripts already print (e.g.
+``[*] Detecting potential spoof calls...``), so the scripts themselves need
+no changes to report it.
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+LOG_FLUSH_INTERVAL = 0.5
+# Seconds a cancelled job gets to exit after SIGTERM before it is killed
+TERMINATE_TIMEOUT = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    session_id TEXT,
+    command TEXT NOT NULL,
+    cwd TEXT,
+    progress_markers TEXT,
+    outputs TEXT,
+    status TEXT NOT NULL,
+    progress REAL DEFAULT 0,
+    returncode INTEGER,
+    cancel_requested INTEGER DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_session ON jobs(session_id, created);
+CREATE TABLE IF NOT EXISTS job_logs (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    line TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    label: str
+    session_id: Optional[str]
+    command: List[str]
+    status: str
+    progress: float
+    returncode: Optional[int]
+    created: float
+    started: Optional[float]
+    finished: Optional[float]
+    outputs: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def elapsed(self) -> float:
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _row_to_job(row) -> Job:
+    return Job(
+        id=row["id"],
+        kind=row["kind"],
+        label=row["label"],
+        session_id=row["session_id"],
+        command=json.loads(row["command"]),
+        status=row["status"],
+        progress=row["progress"] or 0.0,
+        returncode=row["returncode"],
+        created=row["created"],
+        started=row["started"],
+        finished=row["finished"],
+        outputs=json.loads(row["outputs"] or "{}"),
+    )
+
+
+def _read_lines(stream, lines: "queue.Queue") -> None:
+    """Reader-thread body: forward a job's output lines, then None at end of stream."""
+    try:
+        for line in stream:
+            lines.put(line.rstrip("\n"))
+    finally:
+        lines.put(None)
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=TERMINATE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _execute_job(db_path: str, job_id: str) -> None:
+    """Worker-process entry point: run one job and stream its output.
+
+    Output is read on a separate thread so the cancel flag is polled every
+    ``LOG_FLUSH_INTERVAL`` even while the job prints nothing, and the job
+    always ends in a finished state, whatever fails along the way.
+    """
+    conn = _connect(db_path)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None or row["cancel_requested"]:
+        conn.execute("UPDATE jobs SET status = ?, finished = ? WHERE id = ?",
+                     (CANCELLED, time.time(), job_id))
+        conn.close()
+        return
+
+    command = json.loads(row["command"])
+    markers = json.loads(row["progress_markers"] or "[]")
+
+    seq = 0
+    seen_markers = set()
+    pending = []
+    last_flush = time.monotonic()
+    status, returncode = FAILED, None
+    process = None
+
+    def flush():
+        nonlocal last_flush
+        progress = len(seen_markers) / len(markers) if markers else 0.0
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("INSERT INTO job_logs (job_id, seq, ts, line) VALUES (?, ?, ?, ?)", pending)
+            conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (progress, job_id))
+            cancel = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        pending.clear()
+        last_flush = time.monotonic()
+        return bool(cancel)
+
+    try:
+        conn.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ?",
+                     (RUNNING, time.time(), job_id))
+        try:
+            process = subprocess.Popen(
+                command, cwd=row["cwd"] or None,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, bufsize=1
+            )
+        except OSError as exc:
+            pending.append((job_id, seq, time.time(), f"Failed to start: {exc}"))
+            returncode = -1
+            return
+
+        lines: "queue.Queue" = queue.Queue()
+        threading.Thread(target=_read_lines, args=(process.stdout, lines), daemon=True).start()
+
+        cancelled = False
+        end_of_output = False
+        while not (end_of_output and process.poll() is not None):
+            try:
+                line = lines.get(timeout=LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                pass
+            else:
+                if line is None:
+                    end_of_output = True
+                else:
+                    pending.append((job_id, seq, time.time(), line))
+                    seq += 1
+                    for marker in markers:
+                        if marker in line:
+                            seen_markers.add(marker)
+            if time.monotonic() - last_flush >= LOG_FLUSH_INTERVAL and flush():
+                cancelled = True
+                _stop(process)
+                break
+
+        returncode = process.wait()
+        flush()
+        if cancelled:
+            status = CANCELLED
+        else:
+            status = DONE if returncode == 0 else FAILED
+    except Exception as exc:
+        pending.append((job_id, seq, time.time(), f"Job runner error: {exc!r}"))
+        if process is not None and process.poll() is None:
+            _stop(process)
+        raise
+    finally:
+        # Always leave a finished state behind, even when the database or the runner failed
+        progress = 1.0 if status == DONE else (len(seen_markers) / len(markers) if markers else 0.0)
+        try:
+            if pending:
+                conn.executemany("INSERT OR IGNORE INTO job_logs (job_id, seq, ts, line) VALUES (?, ?, ?, ?)",
+                                 pending)
+        finally:
+            conn.execute(
+                "UPDATE jobs SET status = ?, returncode = ?, finished = ?, progress = ? WHERE id = ?",
+                (status, returncode, time.time(), progress, job_id)
+            )
+            conn.close()
+
+
+class JobRunner:
+    def __init__(self, db_path: str = "jobs.db", max_workers: int = 2):
+        self.db_path = db_path
+        conn = _connect(db_path)
+        conn.executescript(SCHEMA)
+        # Jobs left over from a previous server process can never finish
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished = ? WHERE status IN (?, ?)",
+            (FAILED, time.time(), QUEUED, RUNNING)
+        )
+        conn.close()
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        conn = _connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, label: str, command: List[str],
+               session_id: Optional[str] = None, cwd: Optional[str] = None,
+               progress_markers: Optional[List[str]] = None,
+               outputs: Optional[Dict[str, str]] = None) -> str:
+        job_id = uuid.uuid4().hex
+        conn = _connect(self.db_path)
+        conn.execute(
+            "INSERT INTO jobs (id, kind, label, session_id, command, cwd, progress_markers,"
+            " outputs, status, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, label, session_id, json.dumps(command), cwd,
+             json.dumps(progress_markers or []), json.dumps(outputs or {}), QUEUED, time.time())
+        )
+        conn.close()
+        future = self.executor.submit(_execute_job, self.db_path, job_id)
+        future.add_done_callback(lambda done: self._check_finished(job_id, done))
+        return job_id
+
+    def _check_finished(self, job_id: str, future) -> None:
+        """Mark a job FAILED if its worker died before recording a final status."""
+        if future.cancelled() or future.exception() is not None:
+            conn = _connect(self.db_path)
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status IN (?, ?)",
+                (FAILED, time.time(), job_id, QUEUED, RUNNING)
+            )
+            conn.close()
+
+    def cancel(self, job_id: str) -> None:
+        conn = _connect(self.db_path)
+        conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        conn.close()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return _row_to_job(rows[0]) if rows else None
+
+    def list_jobs(self, session_id: Optional[str] = None, limit: int = 50) -> List[Job]:
+        if session_id is None:
+            rows = self._query("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        else:
+            rows = self._query(
+                "SELECT * FROM jobs WHERE session_id = ? ORDER BY created DESC LIMIT ?",
+                (session_id, limit)
+            )
+        return [_row_to_job(row) for row in rows]
+
+    def logs(self, job_id: str, tail: int = 200) -> List[str]:
+        rows = self._query(
+            "SELECT line FROM (SELECT seq, line FROM job_logs WHERE job_id = ?"
+            " ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+            (job_id, tail)
+        )
+        return [row["line"] for row in rows]
@@ -0,0 +1,268 @@
+"""Phone number normalisation to E.164 and country resolution.
+
+Call logs and SMS exports carry numbers in every shape the dialer or the
+network produced: ``+91 98765-43210``, ``09876543210``, ``0044 20 7946
+0000``, ``919876543210`` (a CSV round trip eats the ``+``), short codes and
+alphanumeric sender IDs such as ``VK-HDFCBK``.  ``normalize`` turns a raw
+value into a ``PhoneNumber`` (E.164 string, calling code, ISO region) or
+``None`` when it is not a dialable number.
+
+Country resolution walks a prefix trie compiled once at import from the ITU
+calling codes plus the longer geographic ranges that share a code (NANP
+area codes, ``+7`` Kazakhstan, the crown dependencies under ``+44``).
+``register_range`` adds further ranges, e.g. carrier allocations, which then
+win over the shorter country prefix.
+
+``normalize`` keeps a bounded memo (the app server is long-lived and sees
+every session's numbers), and ``normalize_series`` normalises each distinct
+value of a column once, so a million-row log costs one pass over its unique
+numbers.
+"""
+
+import functools
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+DEFAULT_REGION = "IN"
+
+# ITU-T E.164 country calling codes -> main ISO region ("001" = non-geographic)
+CALLING_CODES = {
+    "1": "US", "7": "RU", "20": "EG", "27": "ZA", "30": "GR", "31": "NL", "32": "BE",
+    "33": "FR", "34": "ES", "36": "HU", "39": "IT", "40": "RO", "41": "CH", "43": "AT",
+    "44": "GB", "45": "DK", "46": "SE", "47": "NO", "48": "PL", "49": "DE", "51": "PE",
+    "52": "MX", "53": "CU", "54": "AR", "55": "BR", "56": "CL", "57": "CO", "58": "VE",
+    "60": "MY", "61": "AU", "62": "ID", "63": "PH", "64": "NZ", "65": "SG", "66": "TH",
+    "81": "JP", "82": "KR", "84": "VN", "86": "CN", "90": "TR", "91": "IN", "92": "PK",
+    "93": "AF", "94": "LK", "95": "MM", "98": "IR",
+    "211": "SS", "212": "MA", "213": "DZ", "216": "TN", "218": "LY", "220": "GM",
+    "221": "SN", "222": "MR", "223": "ML", "224": "GN", "225": "CI", "226": "BF",
+    "227": "NE", "228": "TG", "229": "BJ", "230": "MU", "231": "LR", "232": "SL",
+    "233": "GH", "234": "NG", "235": "TD", "236": "CF", "237": "CM", "238": "CV",
+    "239": "ST", "240": "GQ", "241": "GA", "242": "CG", "243": "CD", "244": "AO",
+    "245": "GW", "246": "IO", "248": "SC", "249": "SD", "250": "RW", "251": "ET",
+    "252": "SO", "253": "DJ", "254": "KE", "255": "TZ", "256": "UG", "257": "BI",
+    "258": "MZ", "260": "ZM", "261": "MG", "262": "RE", "263": "ZW", "264": "NA",
+    "265": "MW", "266": "LS", "267": "BW", "268": "SZ", "269": "KM", "290": "SH",
+    "291": "ER", "297": "AW", "298": "FO", "299": "GL",
+    "350": "GI", "351": "PT", "352": "LU", "353": "IE", "354": "IS", "355": "AL",
+    "356": "MT", "357": "CY", "358": "FI", "359": "BG", "370": "LT", "371": "LV",
+    "372": "EE", "373": "MD", "374": "AM", "375": "BY", "376": "AD", "377": "MC",
+    "378": "SM", "380": "UA", "381": "RS", "382": "ME", "383": "XK", "385": "HR",
+    "386": "SI", "387": "BA", "389": "MK", "420": "CZ", "421": "SK", "423": "LI",
+    "500": "FK", "501": "BZ", "502": "GT", "503": "SV", "504": "HN", "505": "NI",
+    "506": "CR", "507": "PA", "508": "PM", "509": "HT", "590": "GP", "591": "BO",
+    "592": "GY", "593": "EC", "594": "GF", "595": "PY", "596": "MQ", "597": "SR",
+    "598": "UY", "599": "CW",
+    "670": "TL", "672": "NF", "673": "BN", "674": "NR", "675": "PG", "676": "TO",
+    "677": "SB", "678": "VU", "679": "FJ", "680": "PW", "681": "WF", "682": "CK",
+    "683": "NU", "685": "WS", "686": "KI", "687": "NC", "688": "TV", "689": "PF",
+    "690": "TK", "691": "FM", "692": "MH",
+    "800": "001", "808": "001", "850": "KP", "852": "HK", "853": "MO", "855": "KH",
+    "856": "LA", "870": "001", "878": "001", "880": "BD", "881": "001", "882": "001",
+    "883": "001", "886": "TW", "888": "001",
+    "960": "MV", "961": "LB", "962": "JO", "963": "SY", "964": "IQ", "965": "KW",
+    "966": "SA", "967": "YE", "968": "OM", "970": "PS", "971": "AE", "972": "IL",
+    "973": "BH", "974": "QA", "975": "BT", "976": "MN", "977": "NP", "979": "001",
+    "992": "TJ", "993": "TM", "994": "AZ", "995": "GE", "996": "KG", "998": "UZ",
+}
+
+# Regions sharing a calling code, by the digits that follow it
+SHARED_CODE_RANGES = {
+    "1": {
+        "CA": ["204", "226", "236", "249", "250", "263", "289", "306", "343", "354", "365",
+               "367", "368", "382", "387", "403", "416", "418", "428", "431", "437", "438",
+               "450", "468", "474", "506", "514", "519", "548", "579", "581", "584", "587",
+               "604", "613", "639", "647", "672", "683", "705", "709", "742", "753", "778",
+               "780", "782", "807", "819", "825", "867", "873", "879", "902", "905"],
+        "BS": ["242"], "BB": ["246"], "AI": ["264"], "AG": ["268"], "VG": ["284"],
+        "VI": ["340"], "KY": ["345"], "BM": ["441"], "GD": ["473"], "TC": ["649"],
+        "JM": ["658", "876"], "MS": ["664"], "MP": ["670"], "GU": ["671"], "AS": ["684"],
+        "SX": ["721"], "LC": ["758"], "DM": ["767"], "VC": ["784"], "PR": ["787", "939"],
+        "DO": ["809", "829", "849"], "TT": ["868"], "KN": ["869"],
+    },
+    "7": {"KZ": ["6", "7"]},
+    "44": {"GG": ["1481", "7781", "7839", "7911"], "JE": ["1534", "7509", "7700", "7797", "7829", "7937"],
+           "IM": ["1624", "7524", "7624", "7924"]},
+    "262": {"YT": ["269", "639"]},
+    "590": {"BL": ["590"], "MF": ["690"]},
+}
+
+# National significant number lengths, used to tell "9876543210" (national)
+# from "919876543210" (international without its "+")
+NATIONAL_LENGTHS = {
+    "IN": (10,), "US": (10,), "CA": (10,), "GB": (9, 10), "PK": (10,), "BD": (10,),
+    "NP": (10,), "LK": (9,), "AE": (8, 9), "SA": (8, 9), "AU": (9,), "SG": (8,),
+    "MY": (9, 10), "FR": (9,), "ES": (9,), "IT": (9, 10), "DE": (10, 11), "CN": (11,),
+}
+
+# Regions whose national format has no leading trunk "0"
+NO_TRUNK_PREFIX = {"US", "CA", "ES", "IT", "SG", "PT", "GR", "DK", "NO", "QA", "BH", "KW", "OM"}
+
+MIN_LENGTH = 7
+MAX_E164_DIGITS = 15
+
+_SEPARATORS = re.compile(r"[\s\-(). /]")
+
+
+@dataclass(frozen=True)
+class PhoneNumber:
+    e164: str
+    country_code: str
+    region: str
+    carrier: Optional[str] = None
+
+    @property
+    def national(self) -> str:
+        return self.e164[1 + len(self.country_code):]
+
+
+class PrefixTrie:
+    """Digit trie returning the value stored at the longest matching prefix."""
+
+    def __init__(self):
+        self.root: Dict[str, dict] = {}
+
+    def insert(self, prefix: str, value) -> None:
+        node = self.root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node[None] = value
+
+    def longest_match(self, digits: str) -> Tuple[int, Optional[object]]:
+        """(length of the matched prefix, its value), or (0, None)."""
+        node, best = self.root, (0, None)
+        for depth, digit in enumerate(digits, 1):
+            node = node.get(digit)
+            if node is None:
+                break
+            if None in node:
+                best = (depth, node[None])
+        return best
+
+
+def _compile_trie() -> PrefixTrie:
+    trie = PrefixTrie()
+    for code, region in CALLING_CODES.items():
+        trie.insert(code, (code, region, None))
+    for code, regions in SHARED_CODE_RANGES.items():
+        for region, prefixes in regions.items():
+            for prefix in prefixes:
+                trie.insert(code + prefix, (code, region, None))
+    return trie
+
+
+_TRIE = _compile_trie()
+REGION_CODES = {region: code for code, region in CALLING_CODES.items() if region != "001"}
+REGION_CODES.update({region: code for code, regions in SHARED_CODE_RANGES.items() for region in regions})
+
+
+def register_range(prefix: str, region: Optional[str] = None, carrier: Optional[str] = None) -> None:
+    """Add an E.164 prefix (without "+") such as a carrier allocation to the trie."""
+    prefix = prefix.lstrip("+")
+    length, match = _TRIE.longest_match(prefix)
+    if match is None:
+        raise ValueError(f"{prefix!r} does not start with a known calling code")
+    code = match[0]
+    _TRIE.insert(prefix, (code, region or match[1], carrier))
+    normalize.cache_clear()
+
+
+def resolve(digits: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """(calling code, region, carrier) for international digits, or None."""
+    return _TRIE.longest_match(digits)[1]
+
+
+def _clean(raw) -> Optional[str]:
+    if raw is None:
+        return None
+    if isinstance(raw, float):
+        if raw != raw or not raw.is_integer():  # NaN, or not a number at all
+            return None
+        raw = int(raw)
+    text = _SEPARATORS.sub("", str(raw).strip())
+    return text or None
+
+
+def _international(digits: str) -> Optional[PhoneNumber]:
+    if not MIN_LENGTH <= len(digits) <= MAX_E164_DIGITS:
+        return None
+    match = resolve(digits)
+    if match is None:
+        return None
+    code, region, carrier = match
+    if len(digits) - len(code) < 4:
+        return None
+    return PhoneNumber("+" + digits, code, region, carrier)
+
+
+def _national(digits: str, default_region: str) -> Optional[PhoneNumber]:
+    code = REGION_CODES.get(default_region)
+    if code is None:
+        return None
+    return _international(code + digits)
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize(raw, default_region: str = DEFAULT_REGION) -> Optional[PhoneNumber]:
+    """Canonical E.164 form of ``raw`` dialled from ``default_region``, or None.
+
+    Alphanumeric sender IDs, short codes and hidden numbers ("-1", "-2") are
+    not numbers and give None.
+    """
+    text = _clean(raw)
+    if text is None:
+        return None
+
+    if text.startswith("+"):
+        digits = text[1:]
+        return _international(digits) if digits.isdigit() else None
+    if not text.isdigit():
+        return None
+
+    if default_region in ("US", "CA") and text.startswith("011"):
+        return _international(text[3:])
+    if text.startswith("00"):
+        return _international(text[2:])
+    if text.startswith("0") and default_region not in NO_TRUNK_PREFIX:
+        return _national(text[1:], default_region)
+    if len(text) < MIN_LENGTH:
+        return None
+
+    lengths = NATIONAL_LENGTHS.get(default_region)
+    if lengths and len(text) in lengths:
+        return _national(text, default_region)
+    # Digits that already carry a calling code (a "+" lost in a CSV round trip)
+    number = _international(text)
+    if number is not None:
+        return number
+    return _national(text, default_region)
+
+
+def to_e164(raw, default_region: str = DEFAULT_REGION) -> Optional[str]:
+    number = normalize(raw, default_region)
+    return number.e164 if number else None
+
+
+def region_of(raw, default_region: str = DEFAULT_REGION) -> Optional[str]:
+    number = normalize(raw, default_region)
+    return number.region if number else None
+
+
+def home_region(regions, fallback: str = DEFAULT_REGION) -> str:
+    """Most common non-blank region code in a Series, e.g. the provider's ``countryiso``."""
+    known = regions.dropna().astype(str).str.strip().str.upper()
+    known = known[known != ""]
+    return known.mode().iloc[0] if not known.empty else fallback
+
+
+def normalize_series(values, default_region: str = DEFAULT_REGION):
+    """DataFrame of ``e164``/``region`` for a Series, normalising each distinct value once."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    numbers = [normalize(value, default_region) for value in uniques]
+    e164 = pd.array([n.e164 if n else None for n in numbers] + [None], dtype="string")
+    region = pd.array([n.region if n else None for n in numbers] + [None], dtype="string")
+    # factorize marks missing values with -1, which now points at the trailing None
+    return pd.DataFrame({"e164": e164.take(codes), "region": region.take(codes)}, index=values.index)
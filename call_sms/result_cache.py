@@ -0,0 +1,126 @@
+"""On-disk cache of analyser outputs shared across Streamlit sessions.
+
+Entries are keyed by the SHA-256 of the uploaded export, the analysis type
+and a config version derived from the analyser sources and their config
+files, so editing a heuristic invalidates old results automatically.
+Each entry is a directory holding a copy of the analyser's output folder
+plus a ``meta.json``; entries expire after a TTL and the least recently
+used ones are evicted once the cache grows past ``max_bytes``.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+CACHE_FORMAT_VERSION = "1"
+HASH_CHUNK_SIZE = 1024 * 1024
+META_FILENAME = "meta.json"
+
+
+def hash_file(path) -> str:
+    """Stream a file through SHA-256 without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_version(paths: Iterable) -> str:
+    """Fingerprint the analyser code/config files that shape the output."""
+    digest = hashlib.sha256(CACHE_FORMAT_VERSION.encode())
+    for path in paths:
+        path = Path(path)
+        digest.update(path.name.encode())
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class AnalysisCache:
+    def __init__(self, root="analysis_cache", ttl_seconds: int = 7 * 24 * 3600,
+                 max_bytes: int = 2 * 1024 ** 3):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash: str, analysis_type: str, version: str) -> str:
+        label = "".join(c if c.isalnum() else "_" for c in analysis_type.lower())
+        return f"{label}-{version}-{content_hash}"
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    def _is_expired(self, entry: Path, now: float) -> bool:
+        meta = entry / META_FILENAME
+        try:
+            return now - meta.stat().st_mtime > self.ttl_seconds
+        except FileNotFoundError:
+            return True
+
+    def lookup(self, key: str) -> Optional[Path]:
+        entry = self._entry(key)
+        if not entry.is_dir():
+            return None
+        if self._is_expired(entry, time.time()):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # The meta file's mtime doubles as the last-access time for LRU/TTL
+        os.utime(entry / META_FILENAME)
+        return entry / "output"
+
+    def restore(self, key: str, dest_dir) -> bool:
+        """Copy a cached result into ``dest_dir``; returns False on a miss."""
+        cached = self.lookup(key)
+        if cached is None:
+            return False
+        shutil.copytree(cached, dest_dir, dirs_exist_ok=True)
+        return True
+
+    def store(self, key: str, src_dir, **meta) -> None:
+        entry = self._entry(key)
+        if entry.exists():
+            return
+
+        # Build in a private directory and rename, so concurrent sessions
+        # never see a half-written entry.
+        staging = self.root / f".tmp-{uuid.uuid4().hex}"
+        try:
+            shutil.copytree(src_dir, staging / "output")
+            with open(staging / META_FILENAME, "w") as f:
+                json.dump({"key": key, "created": time.time(), **meta}, f)
+            os.rename(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        now = time.time()
+        entries = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.startswith(".tmp-"):
+                continue
+            if self._is_expired(entry, now):
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            entries.append(((entry / META_FILENAME).stat().st_mtime, _dir_size(entry), entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -0,0 +1,136 @@
+"""Indexed SQLite store for paging through large analyser outputs.
+
+The Streamlit tables used to push whole result CSVs to the browser.  Here a
+CSV is loaded once (in chunks) into a SQLite table with indexes on the
+columns users sort and filter by; the UI then asks for one page at a time
+with server-side filtering and ordering, so only the visible rows are sent
+to the client.  A table is reloaded only when its source CSV changes.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LOAD_CHUNK_ROWS = 100_000
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class ResultStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS _sources ("
+            " name TEXT PRIMARY KEY, path TEXT, mtime REAL, size INTEGER)"
+        )
+        conn.commit()
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _is_current(self, conn, name: str, csv_path: str) -> bool:
+        stat = os.stat(csv_path)
+        row = conn.execute(
+            "SELECT path, mtime, size FROM _sources WHERE name = ?", (name,)
+        ).fetchone()
+        return row == (csv_path, stat.st_mtime, stat.st_size)
+
+    def load_csv(self, name: str, csv_path: str, index_columns: Iterable[str] = ()) -> None:
+        """(Re)load ``csv_path`` into table ``name`` unless it is already current."""
+        import pandas as pd
+
+        conn = self._connect()
+        try:
+            if self._is_current(conn, name, csv_path):
+                return
+
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+            for chunk in pd.read_csv(csv_path, chunksize=LOAD_CHUNK_ROWS):
+                chunk.to_sql(name, conn, if_exists="append", index=False)
+
+            columns = self.columns(name, conn)
+            for column in index_columns:
+                if column in columns:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{name}_{column}')}"
+                        f" ON {_quote(name)} ({_quote(column)})"
+                    )
+
+            stat = os.stat(csv_path)
+            conn.execute(
+                "INSERT OR REPLACE INTO _sources (name, path, mtime, size) VALUES (?, ?, ?, ?)",
+                (name, csv_path, stat.st_mtime, stat.st_size)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def columns(self, name: str, conn: Optional[sqlite3.Connection] = None) -> List[str]:
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(name)})")]
+        finally:
+            if own:
+                conn.close()
+
+    def _where(self, columns: List[str], equals: Optional[Dict[str, object]],
+               contains: Optional[Dict[str, str]]) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (equals or {}).items():
+            if column in columns and value not in (None, ""):
+                clauses.append(f"{_quote(column)} = ?")
+                params.append(value)
+        for column, text in (contains or {}).items():
+            if column in columns and text:
+                clauses.append(f"CAST({_quote(column)} AS TEXT) LIKE ?")
+                params.append(f"%{text}%")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, name: str, equals: Optional[Dict[str, object]] = None,
+              contains: Optional[Dict[str, str]] = None) -> int:
+        conn = self._connect()
+        try:
+            where, params = self._where(self.columns(name, conn), equals, contains)
+            return conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def page(self, name: str, page: int = 0, page_size: int = 100,
+             sort_by: Optional[str] = None, descending: bool = True,
+             equals: Optional[Dict[str, object]] = None,
+             contains: Optional[Dict[str, str]] = None):
+        """Return one page of ``name`` as a DataFrame, filtered and sorted in SQL."""
+        import pandas as pd
+
+        conn = self._connect()
+        try:
+            columns = self.columns(name, conn)
+            where, params = self._where(columns, equals, contains)
+
+            order = ""
+            if sort_by in columns:
+                order = f" ORDER BY {_quote(sort_by)} {'DESC' if descending else 'ASC'}"
+
+            query = f"SELECT * FROM {_quote(name)}{where}{order} LIMIT ? OFFSET ?"
+            return pd.read_sql_query(query, conn, params=params + [page_size, page * page_size])
+        finally:
+            conn.close()
+
+    def value_counts(self, name: str, column: str) -> Dict[object, int]:
+        """Counts per distinct value, computed in SQL (e.g. for pie charts)."""
+        conn = self._connect()
+        try:
+            if column not in self.columns(name, conn):
+                return {}
+            rows = conn.execute(
+                f"SELECT {_quote(column)}, COUNT(*) AS n FROM {_quote(name)}"
+                f" GROUP BY {_quote(column)} ORDER BY n DESC"
+            ).fetchall()
+            return dict(rows)
+        finally:
+            conn.close()
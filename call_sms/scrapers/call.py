@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 
+import argparse
 import csv
 import json
-import subprocess
 import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from call_sms import adb, columnar, tracing
+
+# Columns of content://call_log/calls the call analyser reads or writes out
+ANALYSER_PROJECTION = [
+    "_id", "number", "date", "duration", "type", "name", "countryiso",
+    "geocoded_location", "presentation", "formatted_number", "normalized_number",
+]
+
 
 @dataclass
 class Config:
+    adb_path: str = "adb"
+    adb_transport: str = "auto"
+    adb_server: Optional[str] = None
     output_file: str = "call_exports.csv"
     output_dir: str = "call_exports"
     device_id: Optional[str] = None
@@ -20,6 +35,19 @@ class Config:
     adb_command_timeout: int = 30
     csv_delimiter: str = ","
     csv_quotechar: str = '"'
+    # "auto" gzips the query output on the device when it has gzip, "none" disables it
+    compression: str = "auto"
+    # Pushed down to the provider: only these columns/rows leave the device
+    projection: Optional[List[str]] = None
+    date_from: Optional[Union[int, str]] = None
+    date_to: Optional[Union[int, str]] = None
+    call_types: Optional[List[int]] = None
+    numbers: Optional[List[str]] = None
+    where: Optional[str] = None
+    
+    def get_where(self) -> Optional[str]:
+        return adb.sql_where(self.date_from, self.date_to, self.call_types, self.numbers,
+                             number_column="number", extra=self.where)
     
     def get_full_output_path(self) -> Path:
         return Path(self.output_dir) / self.output_file
@@ -32,6 +60,11 @@ class ADBCallLogExtractor:
         
         self.output_path.parent.mkdir(parents=True, exist_ok=True)
         
+        self.adb = adb.get_session(
+            config.adb_path, config.device_id, config.adb_transport,
+            config.adb_server, config.adb_command_timeout
+        )
+        
         self.entry_pattern = re.compile(r'Row: (\d+) (.+)')
         self.field_pattern = re.compile(r'(\w+)=([^,]*?)(?:,|$)')
     
@@ -50,81 +83,53 @@ class ADBCallLogExtractor:
         return filtered_data
     
     def _build_adb_command(self) -> List[str]:
-        cmd = ["adb"]
-        
-        if self.config.device_id:
-            cmd.extend(["-s", self.config.device_id])
-        
-        cmd.extend([
-            "shell", "content", "query",
-            "--uri", self.config.content_uri
-        ])
-        
-        return cmd
+        return adb.content_query(self.config.content_uri, self.config.projection, self.config.get_where())
     
     def _check_adb_available(self) -> bool:
-        try:
-            result = subprocess.run(
-                ["adb", "version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        return self.adb.available()
     
     def _check_device_connected(self) -> bool:
-        try:
-            cmd = ["adb", "devices"]
-            if self.config.device_id:
-                cmd = ["adb", "-s", self.config.device_id, "get-state"]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if self.config.device_id:
-                return result.returncode == 0 and "device" in result.stdout
-            else:
-                lines = result.stdout.strip().split('\n')[1:]
-                return any(line.strip() and not line.endswith('offline') for line in lines)
-                
-        except subprocess.TimeoutExpired:
-            return False
+        return self.adb.is_connected()
     
+    @tracing.traced("adb_query")
     def run_adb_query(self) -> List[str]:
         if not self._check_adb_available():
+            tracing.note_error(RuntimeError("adb is not available"))
             return []
         
         if not self._check_device_connected():
+            tracing.note_error(RuntimeError("no device connected"))
             return []
         
         adb_command = self._build_adb_command()
         
+        if self.adb.use_gzip(self.config.compression):
+            try:
+                lines = list(self.adb.read_lines(adb_command, "gzip", timeout=self.config.adb_command_timeout))
+            except adb.COMPRESSED_TRANSFER_ERRORS as e:
+                # Fall through to the uncompressed query below
+                tracing.annotate(compression_fallback=f"{type(e).__name__}: {e}")
+            else:
+                if lines and lines[0].startswith("Error while accessing provider"):
+                    tracing.note_error(RuntimeError(lines[0]))
+                    return []
+                return lines
+        
         try:
-            result = subprocess.run(
-                adb_command,
-                capture_output=True,
-                text=True,
-                timeout=self.config.adb_command_timeout,
-                encoding=self.config.encoding
-            )
+            result = self.adb.shell(adb_command, timeout=self.config.adb_command_timeout)
             
-            if result.returncode != 0:
+            if not result.ok:
+                tracing.note_error(RuntimeError(result.stderr.strip() or f"adb exited with {result.returncode}"))
                 return []
             
             lines = result.stdout.strip().splitlines()
             return lines
             
-        except subprocess.TimeoutExpired:
-            return []
-        except subprocess.CalledProcessError:
+        except (OSError, adb.AdbError) as e:
+            tracing.note_error(e)
             return []
     
+    @tracing.traced("parse")
     def parse_call_log_data(self, lines: List[str]) -> Tuple[List[Dict[str, str]], List[str]]:
         parsed_data = []
         all_keys = set()
@@ -154,6 +159,7 @@ class ADBCallLogExtractor:
                 continue
         
         sorted_keys = sorted(all_keys)
+        tracing.count_rows(len(parsed_data))
         
         return parsed_data, sorted_keys
     
@@ -173,6 +179,14 @@ class ADBCallLogExtractor:
         with open(self.output_path, 'w', encoding=self.config.encoding) as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
     
+    def _write_columnar(self, data: List[Dict[str, str]], keys: List[str]) -> None:
+        columnar.write_records(
+            data, keys, self.output_path,
+            int_columns=columnar.CALL_INT_COLUMNS,
+            category_columns=columnar.CALL_CATEGORY_COLUMNS
+        )
+    
+    @tracing.traced("write_output")
     def write_output(self, data: List[Dict[str, str]], keys: List[str]) -> None:
         if not data:
             return
@@ -180,11 +194,13 @@ class ADBCallLogExtractor:
         try:
             if self.config.output_file.endswith('.json'):
                 self._write_json(data, keys)
+            elif columnar.is_columnar_path(self.config.output_file):
+                self._write_columnar(data, keys)
             else:
                 self._write_csv(data, keys)
             
-        except Exception:
-            pass
+        except Exception as e:
+            tracing.note_error(e)
     
     def extract_call_logs(self) -> Dict[str, any]:
         try:
@@ -206,14 +222,56 @@ class ADBCallLogExtractor:
                 "output_file": self.output_path
             }
             
-        except Exception:
+        except Exception as e:
+            tracing.note_error(e)
             return {"records_extracted": 0}
 
 
+def projection_argument(value: str) -> List[str]:
+    """argparse ``type=`` for --projection: column names, or 'analyser'."""
+    if value == "analyser":
+        return ANALYSER_PROJECTION
+    return adb.column_list_argument(value)
+
+
 def main():
-    config = Config()
+    parser = argparse.ArgumentParser(description="Extract call logs over ADB")
+    parser.add_argument("--format", choices=["csv", "json", "parquet", "arrow"], default="csv",
+                        help="Output format (parquet/arrow keep typed columns)")
+    parser.add_argument("--output-dir", default=Config.output_dir,
+                        help="Directory for the export and its trace (default: call_exports)")
+    parser.add_argument("--adb-path", default="adb",
+                        help="adb executable to use (e.g. a fake device for testing)")
+    parser.add_argument("--adb-transport", choices=["auto", "socket", "subprocess"], default="auto",
+                        help="Talk to the adb server socket directly or run the adb executable")
+    parser.add_argument("--adb-server", default=None,
+                        help="adb server address as host:port (default 127.0.0.1:5037)")
+    parser.add_argument("--compression", choices=adb.COMPRESSION_MODES, default="auto",
+                        help="gzip the query output on the device (auto: when the device has gzip)")
+    parser.add_argument("--projection", default=None, type=projection_argument,
+                        help="Comma-separated columns to fetch, or 'analyser' for the columns the analyser uses")
+    parser.add_argument("--since", default=None, type=adb.date_argument(),
+                        help="Only calls on/after this date (YYYY-MM-DD[THH:MM] or epoch ms)")
+    parser.add_argument("--until", default=None, type=adb.date_argument(end_of_day=True),
+                        help="Only calls on/before this date (YYYY-MM-DD[THH:MM] or epoch ms)")
+    parser.add_argument("--call-type", default=None, type=adb.int_list_argument,
+                        help="Comma-separated call type codes (1 incoming, 2 outgoing, 3 missed, ...)")
+    parser.add_argument("--numbers", default=None, help="Comma-separated phone numbers to keep")
+    args = parser.parse_args()
+    
+    config = Config(
+        adb_path=args.adb_path, adb_transport=args.adb_transport,
+        adb_server=args.adb_server, output_file=f"call_exports.{args.format}", output_dir=args.output_dir,
+        compression=args.compression,
+        projection=args.projection or None, date_from=args.since, date_to=args.until,
+        call_types=args.call_type or None,
+        numbers=[n.strip() for n in args.numbers.split(",") if n.strip()] if args.numbers else None
+    )
     extractor = ADBCallLogExtractor(config)
-    extractor.extract_call_logs()
+    tracer = tracing.start_trace("call_extraction")
+    with tracer.stage("extract_call_logs"):
+        extractor.extract_call_logs()
+    tracer.write(Path(config.output_dir) / tracing.TRACE_FILENAME)
 
 
 if __name__ == "__main__":
@@ -1,33 +1,74 @@
 #!/usr/bin/env python3
 
-import subprocess
+import argparse
 import json
 import csv
 import sqlite3
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from call_sms import adb, columnar, tracing
+
+SMS_PROJECTION = ["_id", "thread_id", "address", "body", "date", "date_sent", "read", "type", "status"]
 
 
 @dataclass
 class Config:
     adb_path: str = "adb"
+    adb_transport: str = "auto"
+    adb_server: Optional[str] = None
     max_records: Optional[int] = None
     output_dir: str = "sms_exports"
-    csv_filename: str = "sms_export.csv"
-    json_filename: str = "sms_export.json"
+    # None skips that export (``--format`` keeps only the chosen one)
+    csv_filename: Optional[str] = "sms_export.csv"
+    json_filename: Optional[str] = "sms_export.json"
     temp_db_filename: str = "mmssms.db"
+    # "auto" gzips query output and the database pull on the device when it has gzip
+    compression: str = "auto"
+    jsonl_filename: Optional[str] = None
+    columnar_filename: Optional[str] = None
+    # Pushed down to the provider (and applied to the pulled database the same way)
+    projection: Optional[List[str]] = None
+    date_from: Optional[Union[int, str]] = None
+    date_to: Optional[Union[int, str]] = None
+    message_types: Optional[List[int]] = None
+    addresses: Optional[List[str]] = None
+    where: Optional[str] = None
     
     def __post_init__(self):
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
     
-    def get_csv_path(self) -> str:
+    def get_where(self) -> Optional[str]:
+        return adb.sql_where(self.date_from, self.date_to, self.message_types, self.addresses,
+                             number_column="address", extra=self.where)
+    
+    def get_csv_path(self) -> Optional[str]:
+        if not self.csv_filename:
+            return None
         return os.path.join(self.output_dir, self.csv_filename)
     
-    def get_json_path(self) -> str:
+    def get_json_path(self) -> Optional[str]:
+        if not self.json_filename:
+            return None
         return os.path.join(self.output_dir, self.json_filename)
+    
+    def get_jsonl_path(self) -> Optional[str]:
+        if not self.jsonl_filename:
+            return None
+        return os.path.join(self.output_dir, self.jsonl_filename)
+    
+    def get_columnar_path(self) -> Optional[str]:
+        if not self.columnar_filename:
+            return None
+        return os.path.join(self.output_dir, self.columnar_filename)
 
 
 class ADBManager:
@@ -35,41 +76,46 @@ class ADBManager:
         self.config = config
         self.device_id: Optional[str] = None
         self.has_root: bool = False
+        self.session = adb.get_session(config.adb_path, transport=config.adb_transport,
+                                       server=config.adb_server)
     
+    @tracing.traced("adb_devices")
     def check_adb_connection(self) -> bool:
         try:
-            result = subprocess.run([self.config.adb_path, "devices"], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
+            if not self.session.is_connected():
                 return False
                 
-            devices = result.stdout.strip().split('\n')[1:]
-            connected_devices = [line.split('\t')[0] for line in devices if 'device' in line]
-            
-            if not connected_devices:
-                return False
-                
-            self.device_id = connected_devices[0]
+            self.device_id = self.session.serial
             return True
             
-        except Exception:
+        except Exception as e:
+            tracing.note_error(e)
             return False
     
+    @tracing.traced("adb_root_check")
     def check_root_access(self) -> bool:
         try:
-            result = subprocess.run([self.config.adb_path, "shell", "su", "-c", "id"], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0 and "uid=0" in result.stdout:
-                self.has_root = True
-                return True
-            else:
-                self.has_root = False
-                return False
-        except Exception:
+            self.has_root = self.session.has_root()
+            return self.has_root
+        except Exception as e:
+            tracing.note_error(e)
             self.has_root = False
             return False
 
 
+MESSAGE_TYPES = {
+    '1': 'Received',
+    '2': 'Sent',
+    '3': 'Draft',
+    '4': 'Outbox',
+    '5': 'Failed',
+    '6': 'Queued'
+}
+
+EXPORT_FIELDS = ['id', 'thread_id', 'address', 'body', 'date',
+                 'date_sent', 'read', 'type', 'status']
+
+
 class SMSDataProcessor:
     @staticmethod
     def format_timestamp(timestamp: str) -> str:
@@ -83,15 +129,102 @@ class SMSDataProcessor:
     
     @staticmethod
     def get_message_type(msg_type: str) -> str:
-        type_map = {
-            '1': 'Received',
-            '2': 'Sent',
-            '3': 'Draft',
-            '4': 'Outbox',
-            '5': 'Failed',
-            '6': 'Queued'
-        }
-        return type_map.get(str(msg_type), f'Unknown ({msg_type})')
+        return MESSAGE_TYPES.get(str(msg_type), f'Unknown ({msg_type})')
+    
+    def iter_formatted(self, sms_data):
+        """Format each raw message exactly once for all export writers.
+        
+        ``read`` is kept as a bool and the raw epoch-ms timestamps are carried
+        along as ``date_ms``/``date_sent_ms`` so each writer can render them
+        in its own way without re-parsing.
+        """
+        format_timestamp = self.format_timestamp
+        message_types = MESSAGE_TYPES
+        
+        for sms in sms_data:
+            date = sms.get('date', '')
+            date_sent = sms.get('date_sent', '')
+            msg_type = sms.get('type', '')
+            yield {
+                'id': sms.get('_id', ''),
+                'thread_id': sms.get('thread_id', ''),
+                'address': sms.get('address', ''),
+                'body': sms.get('body', ''),
+                'date': format_timestamp(date),
+                'date_sent': format_timestamp(date_sent),
+                'read': str(sms.get('read')) == '1',
+                'type': message_types.get(str(msg_type), f'Unknown ({msg_type})'),
+                'status': sms.get('status', ''),
+                'date_ms': date,
+                'date_sent_ms': date_sent
+            }
+
+
+class CSVExportWriter:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+    
+    def write(self, row: Dict[str, Any]) -> None:
+        self.writer.writerow({**row, 'read': 'Yes' if row['read'] else 'No'})
+    
+    def close(self) -> None:
+        self.file.close()
+
+
+class JSONExportWriter:
+    """Streams a JSON array laid out exactly like ``json.dump(..., indent=2)``."""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.count = 0
+    
+    def write(self, row: Dict[str, Any]) -> None:
+        record = {field: row[field] for field in EXPORT_FIELDS}
+        text = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self.file.write(('[\n  ' if self.count == 0 else ',\n  ') + text)
+        self.count += 1
+    
+    def close(self) -> None:
+        self.file.write('\n]' if self.count else '[]')
+        self.file.close()
+
+
+class JSONLinesExportWriter:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, 'w', encoding='utf-8')
+    
+    def write(self, row: Dict[str, Any]) -> None:
+        record = {field: row[field] for field in EXPORT_FIELDS}
+        self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write('\n')
+    
+    def close(self) -> None:
+        self.file.close()
+
+
+class ColumnarExportWriter:
+    """Collects rows and writes a typed Parquet/Arrow file on close."""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.rows: List[Dict[str, Any]] = []
+    
+    def write(self, row: Dict[str, Any]) -> None:
+        self.rows.append({**row, 'date': row['date_ms'], 'date_sent': row['date_sent_ms']})
+    
+    def close(self) -> None:
+        columnar.write_records(
+            self.rows, EXPORT_FIELDS, self.filename,
+            int_columns=columnar.SMS_INT_COLUMNS,
+            category_columns=columnar.SMS_CATEGORY_COLUMNS,
+            bool_columns=columnar.SMS_BOOL_COLUMNS
+        )
+        self.rows = []
 
 
 class AndroidSMSExtractor:
@@ -100,7 +233,10 @@ class AndroidSMSExtractor:
         self.adb_manager = ADBManager(self.config)
         self.processor = SMSDataProcessor()
         self.adb_path = self.config.adb_path
+        self.adb = self.adb_manager.session
         self.device_id = None
+        # Exports that could not be written; main() exits non-zero when any did
+        self.export_errors: List[str] = []
     
     def check_adb_connection(self):
         return self.adb_manager.check_adb_connection()
@@ -108,45 +244,62 @@ class AndroidSMSExtractor:
     def check_root_access(self):
         return self.adb_manager.check_root_access()
     
+    @tracing.traced("adb_content_query")
     def extract_sms_content_provider(self):
         if self.config.max_records:
             pass
         
-        cmd = [self.adb_path, "shell", "content", "query", 
-               "--uri", "content://sms", 
-               "--projection", "_id,thread_id,address,body,date,date_sent,read,type,status"]
+        cmd = adb.content_query("content://sms", self.config.projection or SMS_PROJECTION,
+                                self.config.get_where())
+        
+        if self.adb.use_gzip(self.config.compression):
+            try:
+                lines = list(self.adb.read_lines(cmd, "gzip"))
+            except adb.COMPRESSED_TRANSFER_ERRORS as e:
+                # Fall through to the uncompressed query below
+                tracing.annotate(compression_fallback=f"{type(e).__name__}: {e}")
+            else:
+                if lines and lines[0].startswith("Error while accessing provider"):
+                    return None
+                return self.parse_content_query(lines)
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
+            result = self.adb.shell(cmd)
+            if not result.ok:
                 return None
                 
             lines = result.stdout.strip().split('\n')
-            sms_data = []
-            records_processed = 0
-            
-            for line in lines:
-                if line.startswith('Row:'):
-                    if self.config.max_records and records_processed >= self.config.max_records:
-                        break
-                    
-                    row_data = {}
-                    parts = line.split(',')
-                    for part in parts:
-                        if '=' in part:
-                            key, value = part.split('=', 1)
-                            key = key.strip().replace('Row: ', '')
-                            row_data[key] = value.strip()
-                    
-                    if row_data:
-                        sms_data.append(row_data)
-                        records_processed += 1
-            
-            return sms_data
+            return self.parse_content_query(lines)
             
-        except Exception:
+        except Exception as e:
+            tracing.note_error(e)
             return None
     
+    @tracing.traced("parse_content_query")
+    def parse_content_query(self, lines):
+        sms_data = []
+        records_processed = 0
+        
+        for line in lines:
+            if line.startswith('Row:'):
+                if self.config.max_records and records_processed >= self.config.max_records:
+                    break
+                
+                row_data = {}
+                parts = line.split(',')
+                for part in parts:
+                    if '=' in part:
+                        key, value = part.split('=', 1)
+                        key = key.strip().replace('Row: ', '')
+                        row_data[key] = value.strip()
+                
+                if row_data:
+                    sms_data.append(row_data)
+                    records_processed += 1
+        
+        return sms_data
+    
+    @tracing.traced("adb_pull_database")
     def extract_sms_database(self):
         if self.config.max_records:
             pass
@@ -154,20 +307,33 @@ class AndroidSMSExtractor:
         db_path = "/data/data/com.android.providers.telephony/databases/mmssms.db"
         local_db_path = os.path.join(self.config.output_dir, self.config.temp_db_filename)
         
+        if self.adb.use_gzip(self.config.compression):
+            try:
+                # Stream the database gzipped straight out of /data, no copy on /sdcard needed
+                self.adb.pull_gzip(db_path, local_db_path, as_root=True)
+            except (OSError, *adb.COMPRESSED_TRANSFER_ERRORS) as e:
+                # Fall through to the uncompressed copy below
+                tracing.annotate(compression_fallback=f"{type(e).__name__}: {e}")
+            else:
+                return self.parse_sqlite_database(local_db_path)
+        
         try:
-            subprocess.run([self.adb_path, "shell", "su", "-c", 
-                          f"cp {db_path} /sdcard/mmssms.db"], check=True)
-            
-            subprocess.run([self.adb_path, "pull", "/sdcard/mmssms.db", local_db_path], 
-                          check=True)
+            result = self.adb.shell(["su", "-c", f"cp {db_path} /sdcard/mmssms.db"])
+            if not result.ok:
+                raise adb.AdbError(result.stderr.strip() or f"copying {db_path} failed")
             
-            subprocess.run([self.adb_path, "shell", "rm", "/sdcard/mmssms.db"])
+            try:
+                self.adb.pull("/sdcard/mmssms.db", local_db_path)
+            finally:
+                self.adb.shell(["rm", "/sdcard/mmssms.db"])
             
             return self.parse_sqlite_database(local_db_path)
             
-        except subprocess.CalledProcessError:
+        except (OSError, adb.AdbError) as e:
+            tracing.note_error(e)
             return None
     
+    @tracing.traced("parse_database")
     def parse_sqlite_database(self, db_path):
         try:
             conn = sqlite3.connect(db_path)
@@ -177,9 +343,13 @@ class AndroidSMSExtractor:
                 SELECT _id, thread_id, address, body, date, date_sent, 
                        read, type, status, locked, sub_id
                 FROM sms
-                ORDER BY date DESC
             """
             
+            where = self.config.get_where()
+            if where:
+                query += f" WHERE {where}"
+            query += " ORDER BY date DESC"
+            
             if self.config.max_records:
                 query += f" LIMIT {self.config.max_records}"
             
@@ -195,7 +365,8 @@ class AndroidSMSExtractor:
             conn.close()
             return sms_data
             
-        except Exception:
+        except Exception as e:
+            tracing.note_error(e)
             return None
     
     def format_timestamp(self, timestamp):
@@ -204,65 +375,96 @@ class AndroidSMSExtractor:
     def get_message_type(self, msg_type):
         return self.processor.get_message_type(msg_type)
     
-    def save_to_csv(self, sms_data, filename=None):
-        if not sms_data:
+    @tracing.traced("export")
+    def export(self, sms_data, writers):
+        """Format ``sms_data`` once and fan every row out to ``writers``.
+        
+        Writers are independent: one that fails is reported, its partial file
+        removed, and the others carry on.
+        """
+        if not sms_data or not writers:
             return
         
-        if filename is None:
-            filename = self.config.get_csv_path()
-            
+        active = list(writers)
+        failed = []
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['id', 'thread_id', 'address', 'body', 'date', 
-                             'date_sent', 'read', 'type', 'status']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for sms in sms_data:
-                    formatted_sms = {
-                        'id': sms.get('_id', ''),
-                        'thread_id': sms.get('thread_id', ''),
-                        'address': sms.get('address', ''),
-                        'body': sms.get('body', ''),
-                        'date': self.format_timestamp(sms.get('date', '')),
-                        'date_sent': self.format_timestamp(sms.get('date_sent', '')),
-                        'read': 'Yes' if sms.get('read') == '1' else 'No',
-                        'type': self.get_message_type(sms.get('type', '')),
-                        'status': sms.get('status', '')
-                    }
-                    writer.writerow(formatted_sms)
-            
-        except Exception:
+            for row in self.processor.iter_formatted(sms_data):
+                for writer in active:
+                    try:
+                        writer.write(row)
+                    except Exception as e:
+                        failed.append((writer, e))
+                if failed:
+                    for writer, e in failed:
+                        active.remove(writer)
+                        self._discard_writer(writer, e)
+                    failed.clear()
+            tracing.count_rows(len(sms_data))
+        finally:
+            for writer in active:
+                try:
+                    writer.close()
+                except Exception as e:
+                    self._discard_writer(writer, e)
+    
+    def _report_export_error(self, path, exc):
+        tracing.note_error(exc)
+        self.export_errors.append(f"{path}: {exc}")
+        print(f"[!] Failed to write {path}: {type(exc).__name__}: {exc}", file=sys.stderr)
+    
+    def _discard_writer(self, writer, exc):
+        self._report_export_error(writer.filename, exc)
+        # Leave no truncated or invalid export behind
+        file = getattr(writer, 'file', None)
+        if file is not None:
+            try:
+                file.close()
+            except OSError:
+                pass
+        try:
+            os.remove(writer.filename)
+        except OSError:
             pass
     
-    def save_to_json(self, sms_data, filename=None):
-        if not sms_data:
+    def build_writers(self):
+        writers = []
+        targets = [
+            (CSVExportWriter, self.config.get_csv_path()),
+            (JSONExportWriter, self.config.get_json_path()),
+            (JSONLinesExportWriter, self.config.get_jsonl_path()),
+            (ColumnarExportWriter, self.config.get_columnar_path()),
+        ]
+        for writer_cls, path in targets:
+            if not path:
+                continue
+            try:
+                writers.append(writer_cls(path))
+            except Exception as e:
+                self._report_export_error(path, e)
+        return writers
+    
+    def _save_with(self, writer_cls, sms_data, filename):
+        if not sms_data or filename is None:
             return
         
-        if filename is None:
-            filename = self.config.get_json_path()
-            
         try:
-            formatted_data = []
-            for sms in sms_data:
-                formatted_sms = {
-                    'id': sms.get('_id', ''),
-                    'thread_id': sms.get('thread_id', ''),
-                    'address': sms.get('address', ''),
-                    'body': sms.get('body', ''),
-                    'date': self.format_timestamp(sms.get('date', '')),
-                    'date_sent': self.format_timestamp(sms.get('date_sent', '')),
-                    'read': sms.get('read') == '1',
-                    'type': self.get_message_type(sms.get('type', '')),
-                    'status': sms.get('status', '')
-                }
-                formatted_data.append(formatted_sms)
-            
-            with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump(formatted_data, jsonfile, indent=2, ensure_ascii=False)
-            
-        except Exception:
-            pass
+            writer = writer_cls(filename)
+        except Exception as e:
+            self._report_export_error(filename, e)
+            return
+        self.export(sms_data, [writer])
+    
+    def save_to_csv(self, sms_data, filename=None):
+        self._save_with(CSVExportWriter, sms_data, filename or self.config.get_csv_path())
+    
+    def save_to_json(self, sms_data, filename=None):
+        self._save_with(JSONExportWriter, sms_data, filename or self.config.get_json_path())
+    
+    def save_to_jsonl(self, sms_data, filename=None):
+        self._save_with(JSONLinesExportWriter, sms_data, filename or self.config.get_jsonl_path())
+    
+    def save_to_columnar(self, sms_data, filename=None):
+        self._save_with(ColumnarExportWriter, sms_data, filename or self.config.get_columnar_path())
     
     def run_extraction(self):
         if not self.check_adb_connection():
@@ -279,13 +481,60 @@ class AndroidSMSExtractor:
             sms_data = self.extract_sms_content_provider()
         
         if sms_data:
-            self.save_to_csv(sms_data)
-            self.save_to_json(sms_data)
+            try:
+                self.export(sms_data, self.build_writers())
+            except Exception as e:
+                self._report_export_error(self.config.output_dir, e)
 
 
 def main():
-    extractor = AndroidSMSExtractor()
-    extractor.run_extraction()
+    parser = argparse.ArgumentParser(description="Extract SMS messages over ADB")
+    parser.add_argument("--format", choices=["csv", "json", "parquet", "arrow"], default=None,
+                        help="Write only this export format, as the call scraper does (parquet/arrow keep "
+                             "typed columns; default: both sms_export.csv and sms_export.json)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Also write a JSON Lines export")
+    parser.add_argument("--output-dir", default=Config.output_dir,
+                        help="Directory for the exports, the pulled database and the trace (default: sms_exports)")
+    parser.add_argument("--adb-path", default="adb",
+                        help="adb executable to use (e.g. a fake device for testing)")
+    parser.add_argument("--adb-transport", choices=["auto", "socket", "subprocess"], default="auto",
+                        help="Talk to the adb server socket directly or run the adb executable")
+    parser.add_argument("--adb-server", default=None,
+                        help="adb server address as host:port (default 127.0.0.1:5037)")
+    parser.add_argument("--compression", choices=adb.COMPRESSION_MODES, default="auto",
+                        help="gzip transfers on the device (auto: when the device has gzip)")
+    parser.add_argument("--since", default=None, type=adb.date_argument(),
+                        help="Only messages on/after this date (YYYY-MM-DD[THH:MM] or epoch ms)")
+    parser.add_argument("--until", default=None, type=adb.date_argument(end_of_day=True),
+                        help="Only messages on/before this date (YYYY-MM-DD[THH:MM] or epoch ms)")
+    parser.add_argument("--message-type", default=None, type=adb.int_list_argument,
+                        help="Comma-separated message type codes (1 received, 2 sent, ...)")
+    parser.add_argument("--addresses", default=None, help="Comma-separated sender/recipient addresses to keep")
+    args = parser.parse_args()
+    
+    config = Config(
+        adb_path=args.adb_path, adb_transport=args.adb_transport, adb_server=args.adb_server,
+        output_dir=args.output_dir, compression=args.compression, date_from=args.since, date_to=args.until,
+        message_types=args.message_type or None,
+        addresses=[a.strip() for a in args.addresses.split(",") if a.strip()] if args.addresses else None
+    )
+    if args.format in ("parquet", "arrow"):
+        config.csv_filename = config.json_filename = None
+        config.columnar_filename = f"sms_export.{args.format}"
+    elif args.format == "csv":
+        config.json_filename = None
+    elif args.format == "json":
+        config.csv_filename = None
+    if args.jsonl:
+        config.jsonl_filename = "sms_export.jsonl"
+    extractor = AndroidSMSExtractor(config)
+    tracer = tracing.start_trace("sms_extraction")
+    with tracer.stage("run_extraction"):
+        extractor.run_extraction()
+    tracer.write(os.path.join(config.output_dir, tracing.TRACE_FILENAME))
+    if extractor.export_errors:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""Per-session disk storage with quotas and garbage collection.
+
+Every browser session gets its own folder under each storage area
+(uploads, analysis outputs, ...).  Each access refreshes a ``.last_access``
+marker in the session folders; a background thread periodically removes
+session folders whose marker is older than the TTL, so abandoned sessions
+no longer accumulate on shared servers.  Uploads are streamed to disk in
+chunks and rejected once a session exceeds its byte quota.
+
+Only folders whose name is a UUID are considered session folders, so
+outputs written by the analysers when run from the command line (for
+example ``analysis_output/calls``) are never collected.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+LAST_ACCESS_MARKER = ".last_access"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class StorageQuotaExceeded(Exception):
+    pass
+
+
+def _is_session_name(name: str) -> bool:
+    try:
+        uuid.UUID(name)
+        return True
+    except ValueError:
+        return False
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                pass
+    return total
+
+
+class SessionStorage:
+    def __init__(self, areas: Dict[str, str], quota_bytes: int = 1024 ** 3,
+                 ttl_seconds: int = 24 * 3600, gc_interval: int = 600):
+        self.areas = {name: Path(root) for name, root in areas.items()}
+        self.quota_bytes = quota_bytes
+        self.ttl_seconds = ttl_seconds
+        self.gc_interval = gc_interval
+        self._gc_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def session_dir(self, area: str, session_id: str) -> Path:
+        path = self.areas[area] / session_id
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def touch(self, session_id: str) -> None:
+        """Mark the session as active in every area it already has a folder in."""
+        for root in self.areas.values():
+            path = root / session_id
+            if path.is_dir():
+                (path / LAST_ACCESS_MARKER).touch()
+
+    def usage(self, session_id: str) -> int:
+        return sum(_dir_size(root / session_id) for root in self.areas.values()
+                   if (root / session_id).is_dir())
+
+    def check_quota(self, session_id: str, extra_bytes: int = 0) -> None:
+        if self.usage(session_id) + extra_bytes > self.quota_bytes:
+            raise StorageQuotaExceeded(
+                f"Session storage quota of {self.quota_bytes / 1024 ** 2:.0f} MB exceeded"
+            )
+
+    def save_upload(self, session_id: str, uploaded_file, area: str = "uploads",
+                    subdir: Optional[str] = None) -> Path:
+        """Stream an uploaded file to the session folder in fixed-size chunks."""
+        target_dir = self.session_dir(area, session_id)
+        if subdir:
+            target_dir = target_dir / subdir
+            target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / Path(uploaded_file.name).name
+
+        size = getattr(uploaded_file, "size", 0) or 0
+        self.check_quota(session_id, size)
+
+        uploaded_file.seek(0)
+        tmp_path = target.with_name(target.name + ".part")
+        try:
+            with open(tmp_path, "wb") as f:
+                shutil.copyfileobj(uploaded_file, f, UPLOAD_CHUNK_SIZE)
+            os.replace(tmp_path, target)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        self.touch(session_id)
+        return target
+
+    def _last_access(self, path: Path) -> float:
+        marker = path / LAST_ACCESS_MARKER
+        try:
+            return marker.stat().st_mtime
+        except FileNotFoundError:
+            return path.stat().st_mtime
+
+    def gc(self, now: Optional[float] = None) -> List[str]:
+        """Delete expired session folders; returns the removed session ids."""
+        now = now or time.time()
+        removed = set()
+        for root in self.areas.values():
+            if not root.is_dir():
+                continue
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if not entry.is_dir() or not _is_session_name(entry.name):
+                        continue
+                    path = Path(entry.path)
+                    try:
+                        expired = now - self._last_access(path) > self.ttl_seconds
+                    except FileNotFoundError:
+                        continue
+                    if expired:
+                        shutil.rmtree(path, ignore_errors=True)
+                        removed.add(entry.name)
+        return sorted(removed)
+
+    def start_background_gc(self) -> None:
+        if self._gc_thread is not None and self._gc_thread.is_alive():
+            return
+
+        def loop():
+            while not self._stop.wait(self.gc_interval):
+                try:
+                    self.gc()
+                except OSError:
+                    pass
+
+        self._gc_thread = threading.Thread(target=loop, name="session-storage-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,92 @@
+"""Process-pool execution of analyser stages over DataFrame shards.
+
+Both analysers can split their input and run a stage on each piece in a
+spawn-context process pool (the same start method the app's job runner
+uses).  Two partitionings are offered:
+
+* ``row_shards``: contiguous row ranges, for stages where each row is
+  handled on its own (categorising, URL and keyword extraction);
+* ``hash_shards``: rows grouped by a stable hash of a key column, so every
+  row of a given number or sender lands in the same shard, for stages that
+  aggregate per key.
+
+``ShardPool.map`` returns results in shard order, and each shard keeps its
+original index, so callers can merge them back into exactly what a serial
+run would have produced.  When the calling process is tracing, each shard
+runs under a trace in its worker and the stages come back into the caller's
+trace, tagged with the shard number.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+
+from call_sms import tracing
+
+# Shards per worker; a few per worker keeps the pool busy when shards finish unevenly
+SHARDS_PER_WORKER = 4
+
+
+def row_shards(df, count: int) -> List:
+    """``count`` contiguous, near-equal row ranges of ``df`` (empty ranges dropped)."""
+    bounds = np.linspace(0, len(df), count + 1).astype(int)
+    return [df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def hash_shards(df, column: str, count: int) -> List:
+    """Rows of ``df`` split by a stable hash of ``column``, each shard in original row order."""
+    import pandas as pd
+
+    buckets = pd.util.hash_pandas_object(df[column], index=False).to_numpy() % np.uint64(count)
+    return [df[buckets == shard] for shard in range(count) if (buckets == shard).any()]
+
+
+def _run_shard(func, shard, args, trace_malloc):
+    """Worker side of ``ShardPool.map``: the result, and the shard's trace when the caller traces."""
+    if trace_malloc is None:
+        return func(shard, *args), None
+    tracer = tracing.start_trace(func.__name__, trace_malloc)
+    with tracer.stage(func.__name__, tracing.row_count(shard)) as record:
+        result = func(shard, *args)
+        record.rows_out = tracing.row_count(result)
+    return result, tracer.export()
+
+
+class ShardPool:
+    """Spawn-context process pool running one function over a list of shards."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    @property
+    def shard_count(self) -> int:
+        return self.workers * SHARDS_PER_WORKER
+
+    def map(self, func, shards, *args) -> List:
+        """``func(shard, *args)`` for every shard, in shard order."""
+        tracer = tracing.current_tracer()
+        trace_malloc = None if tracer is None else tracer.trace_malloc
+        futures = [self.executor.submit(_run_shard, func, shard, args, trace_malloc) for shard in shards]
+        results = []
+        for number, future in enumerate(futures):
+            result, trace = future.result()
+            tracing.merge_worker_trace(trace, shard=number)
+            results.append(result)
+        return results
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def open_pool(workers: int):
+    """A ShardPool for ``workers`` > 1, otherwise None (run in this process)."""
+    return ShardPool(workers) if workers and workers > 1 else None
@@ -0,0 +1,255 @@
+"""Unified, time-ordered timeline of calls and SMS.
+
+The analysers look at calls and messages separately; ``Timeline`` answers
+"who contacted the device, and how, around time X" across both.  Call log
+``number`` and SMS ``address`` values are normalised to E.164 through
+``phone.normalize_series`` (sender IDs such as ``VK-HDFCBK`` are kept as
+they are, upper-cased), so ``+91 98765 43210`` in the call log and
+``09876543210`` in the inbox are the same contact.
+
+The event store is a set of column arrays sorted by timestamp:
+
+* the int64 ``times`` array is the index: a time range is two
+  ``np.searchsorted`` calls, whatever the size of the store;
+* each contact has a posting list, the time-ordered positions of its events
+  (one stable argsort over the contact codes, sliced per contact), so a
+  contact's range query is a binary search inside its own list;
+* histograms bucket the selected times with integer division and
+  ``np.bincount``.
+
+Building the store is one sort; every query afterwards is logarithmic in the
+number of events plus the size of its answer.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from call_sms import columnar, phone
+
+KINDS = ("call", "sms")
+
+# android.provider.CallLog.Calls.TYPE
+CALL_DIRECTIONS = {1: "incoming", 2: "outgoing", 3: "missed", 4: "voicemail", 5: "rejected", 6: "blocked"}
+# android.provider.Telephony.TextBasedSmsColumns.TYPE, numeric or as exported by scrapers/sms.py
+SMS_DIRECTIONS = {
+    "1": "incoming", "2": "outgoing", "3": "draft", "4": "outgoing", "5": "outgoing", "6": "outgoing",
+    "received": "incoming", "sent": "outgoing", "draft": "draft", "outbox": "outgoing",
+    "failed": "outgoing", "queued": "outgoing",
+}
+
+# Histogram bucket widths
+BUCKETS = {"hour": np.timedelta64(1, "h"), "day": np.timedelta64(1, "D"), "week": np.timedelta64(7, "D")}
+
+PREVIEW_CHARS = 100
+
+# Contact key for blank numbers (private / unknown callers)
+UNKNOWN_CONTACT = "UNKNOWN"
+
+
+def parse_times(values):
+    """Naive local datetimes from epoch milliseconds or formatted dates (NaT when unparseable)."""
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(values):
+        return columnar.epoch_ms_to_local(values)
+    return pd.to_datetime(values, errors="coerce", format="mixed")
+
+
+def contact_keys(values, default_region: str = phone.DEFAULT_REGION):
+    """E.164 for dialable numbers, otherwise the stripped, upper-cased raw value (UNKNOWN_CONTACT if blank)."""
+    import pandas as pd
+
+    raw = pd.Series(values, dtype="string").str.strip()
+    e164 = phone.normalize_series(raw, default_region)["e164"]
+    keys = e164.fillna(raw.str.upper())
+    return keys.mask(keys.fillna("") == "", UNKNOWN_CONTACT)
+
+
+def _calls_frame(df, default_region):
+    import pandas as pd
+
+    call_type = pd.to_numeric(df.get("type"), errors="coerce")
+    return pd.DataFrame({
+        "time": parse_times(df["date"]),
+        "kind": "call",
+        "contact": contact_keys(df["number"], default_region),
+        "raw": df["number"].astype("string"),
+        "name": df["name"].astype("string") if "name" in df.columns else pd.NA,
+        "direction": call_type.map(CALL_DIRECTIONS).fillna("other"),
+        "duration": pd.to_numeric(df.get("duration"), errors="coerce"),
+        "text": pd.NA,
+    })
+
+
+def _sms_frame(df, default_region):
+    import pandas as pd
+
+    message_type = df["type"].astype("string").str.strip().str.lower() if "type" in df.columns else pd.NA
+    return pd.DataFrame({
+        "time": parse_times(df["date"]),
+        "kind": "sms",
+        "contact": contact_keys(df["address"], default_region),
+        "raw": df["address"].astype("string"),
+        "name": pd.NA,
+        "direction": pd.Series(message_type, index=df.index).map(SMS_DIRECTIONS).fillna("other"),
+        "duration": np.nan,
+        "text": df["body"].astype("string").str[:PREVIEW_CHARS] if "body" in df.columns else pd.NA,
+    })
+
+
+class Timeline:
+    """Time-sorted call + SMS events with a timestamp index and per-contact posting lists."""
+
+    def __init__(self, events, default_region: str = phone.DEFAULT_REGION):
+        import pandas as pd
+
+        self.default_region = default_region
+        events = events.dropna(subset=["time"])
+        events = events.sort_values("time", kind="stable").reset_index(drop=True)
+        self.events = events
+        self.times = events["time"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        self.kinds = pd.Categorical(events["kind"], categories=KINDS).codes
+
+        codes, self.contacts = pd.factorize(events["contact"])
+        self.contact_codes = codes
+        # Posting lists: the events of each contact, in time order
+        self._postings = np.argsort(codes, kind="stable")
+        self._bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(self.contacts)))))
+        self._contact_index: Dict[str, int] = {contact: code for code, contact in enumerate(self.contacts)}
+
+    @classmethod
+    def from_frames(cls, calls=None, sms=None, default_region: Optional[str] = None) -> "Timeline":
+        """Build from call log and/or SMS DataFrames; the home region defaults to the call log's."""
+        import pandas as pd
+
+        if default_region is None:
+            countryiso = calls["countryiso"] if calls is not None and "countryiso" in calls.columns else []
+            default_region = phone.home_region(countryiso)
+        frames = []
+        if calls is not None and len(calls):
+            frames.append(_calls_frame(calls, default_region))
+        if sms is not None and len(sms):
+            frames.append(_sms_frame(sms, default_region))
+        if not frames:
+            frames.append(_calls_frame(pd.DataFrame(columns=["number", "date"]), default_region))
+        return cls(pd.concat(frames, ignore_index=True), default_region)
+
+    @classmethod
+    def from_files(cls, calls_path=None, sms_path=None, default_region: Optional[str] = None) -> "Timeline":
+        """Build from call log and/or SMS exports (CSV, Parquet or Arrow)."""
+        calls = columnar.read_table(calls_path) if calls_path else None
+        sms = columnar.read_table(sms_path) if sms_path else None
+        return cls.from_frames(calls, sms, default_region)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    # -------------------------- #
+    #  INDEX LOOKUPS           #
+    # -------------------------- #
+
+    def contact_key(self, value: str) -> Optional[str]:
+        """The timeline's key for a number as typed (any format), or None if it never appears."""
+        if value in self._contact_index:
+            return value
+        key = contact_keys([value], self.default_region)[0]
+        return key if key in self._contact_index else None
+
+    def postings(self, contact: str) -> np.ndarray:
+        """Time-ordered event positions of one contact (empty if unknown)."""
+        code = self._contact_index.get(contact)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self._postings[self._bounds[code]:self._bounds[code + 1]]
+
+    def _positions(self, start=None, end=None, contact: Optional[str] = None,
+                   kinds: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Positions of the events in [start, end), optionally of one contact and/or some kinds."""
+        if contact is None:
+            lo = 0 if start is None else np.searchsorted(self.times, _ns(start), side="left")
+            hi = len(self.times) if end is None else np.searchsorted(self.times, _ns(end), side="left")
+            positions = np.arange(lo, hi)
+        else:
+            positions = self.postings(contact)
+            times = self.times[positions]
+            lo = 0 if start is None else np.searchsorted(times, _ns(start), side="left")
+            hi = len(positions) if end is None else np.searchsorted(times, _ns(end), side="left")
+            positions = positions[lo:hi]
+        if kinds is not None:
+            wanted = [KINDS.index(kind) for kind in kinds]
+            positions = positions[np.isin(self.kinds[positions], wanted)]
+        return positions
+
+    # -------------------------- #
+    #  QUERIES                 #
+    # -------------------------- #
+
+    def between(self, start=None, end=None, contact: Optional[str] = None,
+                kinds: Optional[Sequence[str]] = None, limit: Optional[int] = None):
+        """Events in [start, end) in time order, as a DataFrame."""
+        positions = self._positions(start, end, contact, kinds)
+        if limit is not None:
+            positions = positions[:limit]
+        return self.events.iloc[positions]
+
+    def count(self, start=None, end=None, contact: Optional[str] = None,
+              kinds: Optional[Sequence[str]] = None) -> int:
+        return len(self._positions(start, end, contact, kinds))
+
+    def around(self, when, minutes: float = 30, contact: Optional[str] = None,
+               kinds: Optional[Sequence[str]] = None):
+        """Events within ``minutes`` either side of ``when``."""
+        import pandas as pd
+
+        when = pd.Timestamp(when)
+        delta = pd.Timedelta(minutes=minutes)
+        return self.between(when - delta, when + delta + pd.Timedelta(1, "ns"), contact, kinds)
+
+    def histogram(self, bucket: str = "day", start=None, end=None, contact: Optional[str] = None):
+        """Event counts per ``bucket`` ("hour", "day", "week") and kind, with empty buckets kept."""
+        import pandas as pd
+
+        positions = self._positions(start, end, contact)
+        width = BUCKETS[bucket].astype("timedelta64[ns]").astype(np.int64)
+        if len(positions) == 0:
+            return pd.DataFrame(columns=list(KINDS), dtype="int64")
+
+        times = self.times[positions]
+        # Buckets start at midnight of the first selected event's day
+        origin = np.datetime64(pd.Timestamp(times[0]).normalize(), "ns").astype(np.int64)
+        bucket_ids = (times - origin) // width
+        n_buckets = int(bucket_ids[-1]) + 1
+        counts = {kind: np.bincount(bucket_ids[self.kinds[positions] == code], minlength=n_buckets)
+                  for code, kind in enumerate(KINDS)}
+        index = pd.DatetimeIndex(origin + np.arange(n_buckets) * width, name=bucket)
+        return pd.DataFrame(counts, index=index)
+
+    def contact_summary(self, start=None, end=None, top: Optional[int] = None):
+        """Per-contact call/SMS counts, first and last contact in the range, busiest first."""
+        import pandas as pd
+
+        positions = self._positions(start, end)
+        codes = self.contact_codes[positions]
+        kinds = self.kinds[positions]
+        n = len(self.contacts)
+        summary = pd.DataFrame({
+            "contact": self.contacts,
+            "calls": np.bincount(codes[kinds == KINDS.index("call")], minlength=n),
+            "sms": np.bincount(codes[kinds == KINDS.index("sms")], minlength=n),
+        })
+        summary["events"] = summary["calls"] + summary["sms"]
+        times = pd.Series(self.times[positions]).groupby(codes)
+        summary["first"] = pd.to_datetime(times.min().reindex(range(n)))
+        summary["last"] = pd.to_datetime(times.max().reindex(range(n)))
+        names = self.events["name"].iloc[positions].groupby(codes).first()
+        summary["name"] = names.reindex(range(n)).to_numpy()
+        summary = summary[summary["events"] > 0]
+        summary = summary.sort_values("events", ascending=False, kind="stable").reset_index(drop=True)
+        return summary.head(top) if top else summary
+
+
+def _ns(value) -> int:
+    import pandas as pd
+
+    return pd.Timestamp(value).as_unit("ns").value
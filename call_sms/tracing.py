@@ -0,0 +1,279 @@
+"""Stage timing and memory tracing for the scrapers and analysers.
+
+Each script run opens one trace with ``start_trace`` and wraps its pipeline
+stages in ``stage(...)`` blocks or ``@traced(...)`` functions.  Every stage
+records wall time, the process peak RSS when it finished, the rows it read
+and produced, and any exception raised inside it (the scrapers swallow most
+errors, so this is often the only place a failure is visible).  Setting
+``CALL_SMS_TRACEMALLOC=1`` additionally records the peak Python heap per
+stage via ``tracemalloc``; it is off by default because it slows pandas
+code down noticeably.
+
+Stages run in worker processes (``shards.ShardPool``) are traced there and
+merged back with ``merge_worker_trace`` under the stage that dispatched
+them, and the run's peak RSS adds each worker process's peak, so sharded
+runs report the same breakdown and memory as serial ones.
+
+``write_trace`` saves the run as JSON (``trace.json`` next to the outputs)
+and the Streamlit app renders it with ``load_trace``.  When no trace has
+been started the helpers do nothing, so importing the analysers as a
+library costs nothing.
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACE_FILENAME = "trace.json"
+TRACEMALLOC_ENV = "CALL_SMS_TRACEMALLOC"
+
+_MB = 1024 * 1024
+_STAGE_FIELDS = ("name", "depth", "seconds", "rows_in", "rows_out", "peak_rss_mb",
+                 "rss_growth_mb", "py_peak_mb", "error")
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def row_count(obj) -> Optional[int]:
+    """Rows in a DataFrame/Series/list result, or None for anything else."""
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    if isinstance(obj, list):
+        return len(obj)
+    return None
+
+
+class Stage:
+    def __init__(self, name: str, depth: int, rows_in: Optional[int] = None):
+        self.name = name
+        self.depth = depth
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.seconds = 0.0
+        self.peak_rss_mb: Optional[float] = None
+        self.rss_growth_mb: Optional[float] = None
+        self.py_peak_mb: Optional[float] = None
+        self.error: Optional[str] = None
+        self.extra: Dict[str, Any] = {}
+        self._child_py_peak = 0
+
+    def count(self, rows_out: int) -> None:
+        self.rows_out = (self.rows_out or 0) + rows_out
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], depth: int) -> "Stage":
+        """Rebuild a stage from ``to_dict`` output (a worker's), at ``depth`` in this trace."""
+        record = cls(data["name"], depth, data.get("rows_in"))
+        record.rows_out = data.get("rows_out")
+        record.seconds = data.get("seconds") or 0.0
+        record.peak_rss_mb = data.get("peak_rss_mb")
+        record.rss_growth_mb = data.get("rss_growth_mb")
+        record.py_peak_mb = data.get("py_peak_mb")
+        record.error = data.get("error")
+        record.extra = {key: value for key, value in data.items() if key not in _STAGE_FIELDS}
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "depth": self.depth,
+            "seconds": round(self.seconds, 4),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_rss_mb": self.peak_rss_mb,
+            "rss_growth_mb": self.rss_growth_mb,
+            "py_peak_mb": self.py_peak_mb,
+            "error": self.error,
+        }
+        data.update(self.extra)
+        return data
+
+
+class Tracer:
+    def __init__(self, run: str, trace_malloc: Optional[bool] = None):
+        self.run = run
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.stages: List[Stage] = []
+        self._stack: List[Stage] = []
+        # Peak RSS in bytes of each worker process that sent back a trace
+        self._worker_peaks: Dict[int, int] = {}
+        self._t0 = time.perf_counter()
+        if trace_malloc is None:
+            trace_malloc = os.environ.get(TRACEMALLOC_ENV, "") not in ("", "0")
+        self.trace_malloc = trace_malloc
+        if trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None):
+        record = Stage(name, len(self._stack), rows_in)
+        self.stages.append(record)
+        self._stack.append(record)
+        rss_before = peak_rss_bytes()
+        if self.trace_malloc:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exc:
+            record.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            record.seconds = time.perf_counter() - start
+            rss_after = peak_rss_bytes()
+            if rss_after is not None:
+                record.peak_rss_mb = round(rss_after / _MB, 1)
+                record.rss_growth_mb = round((rss_after - rss_before) / _MB, 1)
+            self._stack.pop()
+            if self.trace_malloc:
+                # reset_peak() in nested stages clears the parent's peak, so carry it up
+                py_peak = max(tracemalloc.get_traced_memory()[1], record._child_py_peak)
+                record.py_peak_mb = round(py_peak / _MB, 1)
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent._child_py_peak = max(parent._child_py_peak, py_peak)
+
+    def note_error(self, exc: BaseException) -> None:
+        """Attach an exception that is about to be swallowed to the current stage."""
+        if self._stack:
+            self._stack[-1].error = f"{type(exc).__name__}: {exc}"
+
+    def export(self) -> Dict[str, Any]:
+        """This process's stages and peak RSS, for ``merge`` in the parent process."""
+        return {
+            "pid": os.getpid(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def merge(self, worker: Dict[str, Any], **labels) -> None:
+        """Add a worker's exported stages under the innermost open stage, tagged with ``labels``."""
+        depth = len(self._stack)
+        for data in worker["stages"]:
+            record = Stage.from_dict(data, depth + data["depth"])
+            record.extra.update(labels, worker_pid=worker["pid"])
+            self.stages.append(record)
+        if worker.get("peak_rss_bytes") is not None:
+            pid = worker["pid"]
+            self._worker_peaks[pid] = max(self._worker_peaks.get(pid, 0), worker["peak_rss_bytes"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        peak = peak_rss_bytes()
+        workers_peak = sum(self._worker_peaks.values())
+        data = {
+            "run": self.run,
+            "started": self.started,
+            "total_seconds": round(time.perf_counter() - self._t0, 4),
+            # Workers run side by side, so their peaks add to this process's
+            "peak_rss_mb": round((peak + workers_peak) / _MB, 1) if peak is not None else None,
+            "tracemalloc": self.trace_malloc,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+        if self._worker_peaks:
+            data["workers"] = len(self._worker_peaks)
+            data["workers_peak_rss_mb"] = round(workers_peak / _MB, 1)
+        return data
+
+    def write(self, path) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+_current: Optional[Tracer] = None
+
+
+def start_trace(run: str, trace_malloc: Optional[bool] = None) -> Tracer:
+    global _current
+    _current = Tracer(run, trace_malloc)
+    return _current
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None):
+    """Trace a block as a stage of the current run (a no-op without one)."""
+    if _current is None:
+        yield Stage(name, 0, rows_in)
+        return
+    with _current.stage(name, rows_in) as record:
+        yield record
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of ``stage``; rows are taken from the first argument and the result."""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current is None:
+                return func(*args, **kwargs)
+            rows_in = row_count(args[0]) if args else None
+            with _current.stage(stage_name, rows_in) as record:
+                result = func(*args, **kwargs)
+                rows_out = row_count(result)
+                if rows_out is not None:
+                    record.rows_out = rows_out
+                return result
+        return wrapper
+    return decorator
+
+
+def count_rows(rows_out: int) -> None:
+    """Add to the output row count of the innermost open stage."""
+    if _current is not None and _current._stack:
+        _current._stack[-1].count(rows_out)
+
+
+def note_error(exc: BaseException) -> None:
+    if _current is not None:
+        _current.note_error(exc)
+
+
+def annotate(**values) -> None:
+    """Attach extra fields (e.g. a recovered failure) to the innermost open stage."""
+    if _current is not None and _current._stack:
+        _current._stack[-1].extra.update(values)
+
+
+def merge_worker_trace(worker: Optional[Dict[str, Any]], **labels) -> None:
+    """Merge a ``Tracer.export`` from a worker process into the current run."""
+    if _current is not None and worker is not None:
+        _current.merge(worker, **labels)
+
+
+def write_trace(path) -> None:
+    if _current is not None:
+        _current.write(path)
+
+
+def load_trace(path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from call_sms import timeline
+from call_sms.timeline import Timeline
+
+
+def test_blank_numbers_share_the_unknown_contact(tmp_path):
+    calls = pd.DataFrame({
+        "number": ["+919876543210", "", None, "  ", float("nan"), "09876543210"],
+        "date": [1704067200000 + i * 60_000 for i in range(6)],
+        "type": [1, 3, 3, 1, 2, 2],
+        "duration": [10, 0, 0, 5, 7, 3],
+    })
+    path = tmp_path / "calls.csv"
+    calls.to_csv(path, index=False)
+
+    tl = Timeline.from_files(calls_path=path, default_region="IN")
+
+    assert len(tl) == 6
+    assert tl.count(contact=timeline.UNKNOWN_CONTACT) == 4
+    assert tl.count(contact="+919876543210") == 2
+    summary = tl.contact_summary()
+    assert summary.set_index("contact").loc[timeline.UNKNOWN_CONTACT, "calls"] == 4